@@ -72,7 +72,8 @@ def main():
         if counter == 10:
             last_ibi.set()
 
-    device.on_notification(name="ibi", filter_func=is_ibi, handler_func=handle_ibi)
+    # Passing the notification name lets the device skip the filter for every other notification
+    device.on_notification(name="ibi", filter_func=is_ibi, handler_func=handle_ibi, notification_name="I3C IBI NOTIFICATION")
 
     # Supernova Controller SDK offers 3 ways of disabling IBIs:
     # - toggle_ibi method
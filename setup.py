@@ -28,6 +28,10 @@ setup(
       'transfer_controller==0.4.2',
       'BinhoSupernova==3.2.0',
     ] + dev_dependencies,
+    extras_require={
+      # Lets SupernovaDeviceWatcher scan as soon as Linux reports a USB event, instead of polling
+      'udev': ['pyudev; sys_platform == "linux"'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
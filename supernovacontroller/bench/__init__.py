@@ -0,0 +1,3 @@
+from .suite import BENCHMARKS, measure, run_benchmarks
+
+__all__ = ["BENCHMARKS", "measure", "run_benchmarks"]
@@ -0,0 +1,92 @@
+"""
+Benchmarks the interfaces of a Supernova, or of the simulator, and writes a JSON report.
+
+Usage:
+    python -m supernovacontroller.bench --simulator --output baseline.json
+    python -m supernovacontroller.bench --benchmarks i2c.write i2c.read_from --iterations 1000
+    python -m supernovacontroller.bench --simulator --dispatch both
+"""
+import argparse
+import json
+import sys
+
+from supernovacontroller.sequential import SupernovaDevice
+
+from .suite import (BENCHMARKS, DEFAULT_I2C_ADDRESS, DEFAULT_I3C_ADDRESS,
+                    DEFAULT_ITERATIONS, DEFAULT_WARMUP, run_benchmarks)
+
+# --dispatch choice -> direct_dispatch of the devices measured, in order
+DISPATCH_MODES = {"queued": [False], "direct": [True], "both": [False, True]}
+
+# Appended to the names of the benchmarks measured with direct dispatch when both modes are run
+DIRECT_DISPATCH_SUFFIX = " [direct]"
+
+def _iterations(value):
+    iterations = int(value)
+    if iterations < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return iterations
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m supernovacontroller.bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--simulator", action="store_true", help="run against BinhoSupernovaSimulator instead of a Supernova")
+    parser.add_argument("--usb-address", default=None, help="path of the Supernova to open, the first one found by default")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), metavar="NAME", help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--iterations", type=_iterations, default=DEFAULT_ITERATIONS, help="measured operations per benchmark")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="operations run before measuring each benchmark")
+    parser.add_argument("--i2c-address", type=lambda value: int(value, 0), default=DEFAULT_I2C_ADDRESS, help="address of the I2C target")
+    parser.add_argument("--i3c-address", type=lambda value: int(value, 0), default=DEFAULT_I3C_ADDRESS, help="dynamic address of the I3C target")
+    parser.add_argument("--dispatch", choices=list(DISPATCH_MODES), default="queued", help="dispatch of the responses: through the response queue (queued, the default), from the driver callback (direct), or both, side by side")
+    parser.add_argument("--output", default="supernova_bench.json", help="path of the JSON report, '-' for stdout")
+
+    return parser.parse_args(argv)
+
+def _benchmark(args, direct_dispatch):
+    device = SupernovaDevice(direct_dispatch=direct_dispatch)
+    if args.simulator:
+        try:
+            from binhosimulators import BinhoSupernovaSimulator
+        except ImportError:
+            sys.exit("The simulator is not installed, see the installation of the development dependencies")
+        device.driver = BinhoSupernovaSimulator()
+
+    device.open(args.usb_address)
+    try:
+        return run_benchmarks(device, args.benchmarks, args.iterations, args.warmup, args.i2c_address, args.i3c_address)
+    finally:
+        device.close()
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    report = None
+    for direct_dispatch in DISPATCH_MODES[args.dispatch]:
+        run = _benchmark(args, direct_dispatch)
+        if report is None:
+            report = run
+        else:
+            # Side by side: the direct dispatch results follow the queued ones, under suffixed names
+            for (name, result) in run["benchmarks"].items():
+                report["benchmarks"][name + DIRECT_DISPATCH_SUFFIX] = result
+    report["options"]["dispatch"] = args.dispatch
+
+    report["target"] = "simulator" if args.simulator else "device"
+
+    # The summary is for people, keep stdout valid JSON when the report goes there
+    summary = sys.stderr if args.output == "-" else sys.stdout
+    for (name, result) in report["benchmarks"].items():
+        if "error" in result:
+            print(f"{name:<29} skipped: {result['error']}", file=summary)
+        else:
+            print(f"{name:<29} {result['ops_per_sec']:>10.1f} ops/s   p50 {result['p50'] * 1e6:>9.1f} us   "
+                  f"p99 {result['p99'] * 1e6:>9.1f} us   errors {result['errors']}", file=summary)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import datetime
+import platform
+import statistics
+import time
+
+from BinhoSupernova.commands.definitions import (GpioFunctionality,
+                                                 GpioLogicLevel,
+                                                 GpioPinNumber,
+                                                 SpiControllerMode)
+
+# Iterations measured per benchmark, after the warm-up ones
+DEFAULT_ITERATIONS = 200
+DEFAULT_WARMUP = 10
+
+# Targets used by the benchmarks, those of the simulator by default
+DEFAULT_I2C_ADDRESS = 0x50
+DEFAULT_I3C_ADDRESS = 0x08
+
+def _i2c(device):
+    i2c = device.create_interface("i2c")
+    if not i2c.bus_voltage:
+        i2c.init_bus(3300)
+    return i2c
+
+def _i3c(device):
+    i3c = device.create_interface("i3c.controller")
+    if not i3c.bus_voltage:
+        i3c.init_bus(3300)
+    return i3c
+
+def _setup_i2c_write(device, options):
+    i2c = _i2c(device)
+    return lambda: i2c.write(options["i2c_address"], [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+
+def _setup_i2c_read_from(device, options):
+    i2c = _i2c(device)
+    return lambda: i2c.read_from(options["i2c_address"], [0x00,0x00], 4)
+
+def _setup_i3c_write(device, options):
+    i3c = _i3c(device)
+    return lambda: i3c.write(options["i3c_address"], i3c.TransferMode.I3C_SDR, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+
+def _setup_i3c_read(device, options):
+    i3c = _i3c(device)
+    return lambda: i3c.read(options["i3c_address"], i3c.TransferMode.I3C_SDR, [0x00,0x00], 4)
+
+def _setup_i3c_ccc(ccc_name):
+    def setup(device, options):
+        i3c = _i3c(device)
+        ccc = getattr(i3c, ccc_name)
+        return lambda: ccc(options["i3c_address"])
+
+    return setup
+
+def _setup_spi_transfer(device, options):
+    spi = device.create_interface("spi.controller")
+    spi.set_bus_voltage(3300)
+    spi.init_bus()
+    spi.set_parameters(mode=SpiControllerMode.MODE_0)
+    return lambda: spi.transfer([0x9F], 5)
+
+def _setup_uart_send(device, options):
+    uart = device.create_interface("uart")
+    uart.set_bus_voltage(3300)
+    uart.init_bus()
+    return lambda: uart.send([0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08])
+
+def _setup_gpio_digital_write(device, options):
+    gpio = device.create_interface("gpio")
+    gpio.set_pins_voltage(3300)
+    gpio.configure_pin(GpioPinNumber.GPIO_6, GpioFunctionality.DIGITAL_OUTPUT)
+
+    levels = [GpioLogicLevel.HIGH, GpioLogicLevel.LOW]
+    def toggle():
+        levels.reverse()
+        return gpio.digital_write(GpioPinNumber.GPIO_6, levels[0])
+
+    return toggle
+
+# Name -> (interface, setup). The setup receives the opened device and the options of the run, and returns the
+# operation to measure, which returns the (success, result) tuple of the interface methods.
+BENCHMARKS = {
+    "i2c.write": ("i2c", _setup_i2c_write),
+    "i2c.read_from": ("i2c", _setup_i2c_read_from),
+    "i3c.write": ("i3c.controller", _setup_i3c_write),
+    "i3c.read": ("i3c.controller", _setup_i3c_read),
+    "i3c.ccc_getpid": ("i3c.controller", _setup_i3c_ccc("ccc_getpid")),
+    "i3c.ccc_getbcr": ("i3c.controller", _setup_i3c_ccc("ccc_getbcr")),
+    "i3c.ccc_getdcr": ("i3c.controller", _setup_i3c_ccc("ccc_getdcr")),
+    "spi.transfer": ("spi.controller", _setup_spi_transfer),
+    "uart.send": ("uart", _setup_uart_send),
+    "gpio.digital_write": ("gpio", _setup_gpio_digital_write),
+}
+
+def _package_version(name):
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+def measure(operation, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP):
+    """
+    Calls an operation repeatedly and measures its latency.
+
+    Args:
+    operation (callable): The operation, returning a (success, result) tuple.
+    iterations (int, optional): The number of measured calls.
+    warmup (int, optional): The number of calls made before measuring.
+
+    Returns:
+    dict: The 'iterations', the calls that returned a failure ('errors'), the 'ops_per_sec' and the 'mean',
+          'min', 'max', 'p50' and 'p99' latencies in seconds.
+
+    Raises:
+    ValueError: If 'iterations' is lower than 1.
+    """
+    if iterations < 1:
+        raise ValueError(f"At least one iteration must be measured, got {iterations}")
+
+    for _ in range(warmup):
+        operation()
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        (success, _) = operation()
+        latencies.append(time.perf_counter() - call_start)
+        if not success:
+            errors += 1
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "ops_per_sec": iterations / elapsed if elapsed > 0 else None,
+        "mean": statistics.mean(latencies),
+        "min": min(latencies),
+        "max": max(latencies),
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+    }
+
+def run_benchmarks(device, names=None, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP,
+                   i2c_address=DEFAULT_I2C_ADDRESS, i3c_address=DEFAULT_I3C_ADDRESS):
+    """
+    Runs the benchmarks on an opened device.
+
+    Args:
+    device (SupernovaDevice): The opened device, backed by a Supernova or a simulator.
+    names (list, optional): The names of the benchmarks to run, all of BENCHMARKS by default.
+    iterations (int, optional): The number of measured operations per benchmark.
+    warmup (int, optional): The number of operations run before measuring each benchmark.
+    i2c_address (int, optional): The address of the I2C target.
+    i3c_address (int, optional): The dynamic address of the I3C target.
+
+    Returns:
+    dict: The report, with the 'created' date, the 'versions' of Python and the libraries, the 'device'
+          information, the run 'options' and the 'benchmarks' results by name, as returned by measure() plus
+          the 'interface' and the 'dispatch' of the responses ("direct" or "queued", see SupernovaDevice).
+          A benchmark that can't run on the device (e.g. GPIO on the simulator) has an 'error' instead of
+          measurements.
+
+    Raises:
+    ValueError: If 'iterations' is lower than 1, before running any benchmark.
+    """
+    if iterations < 1:
+        raise ValueError(f"At least one iteration must be measured, got {iterations}")
+
+    options = {"iterations": iterations, "warmup": warmup, "i2c_address": i2c_address, "i3c_address": i3c_address}
+    dispatch = "direct" if getattr(device, "direct_dispatch", False) else "queued"
+
+    try:
+        info = dict(device.info)
+    except Exception as e:
+        info = {"error": str(e)}
+
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "versions": {
+            "python": platform.python_version(),
+            "supernovacontroller": _package_version("supernovacontroller"),
+            "BinhoSupernova": _package_version("BinhoSupernova"),
+            "transfer_controller": _package_version("transfer_controller"),
+        },
+        "device": info,
+        "options": options,
+        "benchmarks": {},
+    }
+
+    for name in (names or BENCHMARKS):
+        (interface, setup) = BENCHMARKS[name]
+        result = {"interface": interface, "dispatch": dispatch}
+
+        try:
+            operation = setup(device, options)
+            result.update(measure(operation, iterations, warmup))
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        report["benchmarks"][name] = result
+
+    return report
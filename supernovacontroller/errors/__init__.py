@@ -5,6 +5,10 @@ from .exceptions import UnknownInterfaceError
 from .exceptions import BusVoltageError
 from .exceptions import BusNotInitializedError
 from .exceptions import BackendError
+from .exceptions import NoDeviceAvailableError
+from .exceptions import ReplayMismatchError
+from .exceptions import TransferTimeoutError
 
 __all__ = ['BusVoltageError', 'DeviceOpenError', 'DeviceNotMountedError',
-           'DeviceAlreadyMountedError', 'UnknownInterfaceError', 'BusNotInitializedError', 'BackendError']
+           'DeviceAlreadyMountedError', 'UnknownInterfaceError', 'BusNotInitializedError', 'BackendError',
+           'NoDeviceAvailableError', 'ReplayMismatchError', 'TransferTimeoutError']
@@ -46,4 +46,25 @@ class BackendError(Exception):
     def __init__(self, message="An error occurred in the backend", original_exception=None):
         self.message = f"{message}: {original_exception}" if original_exception else message
         self.original_exception = original_exception
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class NoDeviceAvailableError(Exception):
+    """Exception raised when no device of a pool can serve a lease or a job."""
+
+    def __init__(self, message="No device available"):
+        self.message = message
+        super().__init__(self.message)
+
+class ReplayMismatchError(Exception):
+    """Exception raised when a ReplayDriver is called differently than the recording it plays back."""
+
+    def __init__(self, message="The call doesn't match the recording"):
+        self.message = message
+        super().__init__(self.message)
+
+class TransferTimeoutError(BackendError):
+    """Exception raised when the device doesn't respond to a transfer in time. The transfer is cancelled."""
+
+    def __init__(self, message="The device did not respond in time", timeout=None):
+        self.timeout = timeout
+        super().__init__(message if timeout is None else f"{message} ({timeout} s)")
@@ -1 +1,19 @@
+from .retry import RetryPolicy
 from .supernova_device import SupernovaDevice
+
+# Imported on first use, they pull in asyncio and concurrent.futures, or aren't needed to use a device
+_LAZY_CLASSES = {
+    "AsyncSupernovaDevice": ".async_supernova_device",
+    "SupernovaDevicePool": ".device_pool",
+    "SupernovaDeviceWatcher": ".device_watcher",
+    "I2CEeprom": ".i2c_eeprom",
+}
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_CLASSES[name], __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["SupernovaDevice", "AsyncSupernovaDevice", "SupernovaDevicePool", "SupernovaDeviceWatcher", "I2CEeprom", "RetryPolicy"]
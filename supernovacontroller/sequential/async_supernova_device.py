@@ -0,0 +1,248 @@
+import asyncio
+import contextlib
+import itertools
+import types
+
+from supernovacontroller.errors import TransferTimeoutError
+
+from .deferred import DeferredCall
+from .retry import issued_by, no_retries
+from .supernova_device import SupernovaDevice
+
+_STREAM_CLOSED = object()
+
+class NotificationStream:
+    """
+    Async iterator over the notifications of a SupernovaDevice.
+
+    Notifications accepted by 'filter_func' are handed to the event loop with loop.call_soon_threadsafe as soon as
+    the device dispatches them, and are consumed with 'async for'. The stream stops receiving notifications
+    when it is closed, either explicitly or when leaving its 'async with' block.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, device: SupernovaDevice, loop, filter_func=None, notification_name=None, dynamic_address=None):
+        self.device = device
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.closed = False
+        self.name = f"notification stream {next(self._ids)}"
+
+        device.on_notification(self.name, filter_func or (lambda name, message: True), self.__handle_notification,
+                               notification_name=notification_name, dynamic_address=dynamic_address)
+
+    def __handle_notification(self, name, message):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # The event loop is already closed, nobody is listening anymore
+            pass
+
+    def close(self):
+        """
+        Stops receiving notifications. Pending 'async for' loops end after the notifications already received.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+        self.device.unsubscribe_notification(self.name)
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, _STREAM_CLOSED)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.queue.get()
+        if message is _STREAM_CLOSED:
+            raise StopAsyncIteration
+        return message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class AsyncSupernovaInterface:
+    """
+    Awaitable front-end of a Supernova interface.
+
+    It exposes the same methods as the wrapped interface, with the same arguments and results, as coroutines.
+    Requests are sent from the event loop thread and the responses resolve an asyncio future, so no thread
+    waits for an in-flight operation.
+    """
+
+    # Methods waiting for something other than a device response, run in the default executor
+    BLOCKING_METHODS = ("wait_for_notification",)
+
+    def __init__(self, interface, device: "AsyncSupernovaDevice"):
+        self.interface = interface
+        self.device = device
+
+    def __getattr__(self, name):
+        attribute = getattr(self.interface, name)
+        if name.startswith("_") or not isinstance(attribute, types.MethodType):
+            return attribute
+
+        if name in self.BLOCKING_METHODS:
+            async def method(*args, **kwargs):
+                return await asyncio.to_thread(attribute, *args, **kwargs)
+        else:
+            async def method(*args, **kwargs):
+                return await self.device._call(attribute, *args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attribute.__doc__
+
+        return method
+
+class AsyncSupernovaDevice:
+    """
+    asyncio front-end of SupernovaDevice.
+
+    Interfaces created with create_interface() return awaitables instead of blocking, so one event loop can drive
+    many outstanding operations, over one or several devices, without a thread per operation. Each operation is
+    driven with a DeferredCall: the method builds its requests, they are submitted to the transfer controller,
+    and its on_ready/on_error callbacks resolve an asyncio future through loop.call_soon_threadsafe. The method
+    then decodes the responses with its own logic. Notifications are consumed as async iterators created with
+    notifications().
+
+    Usage:
+        device = AsyncSupernovaDevice()
+        info = await device.open()
+        i2c = await device.create_interface("i2c")
+        (success, data) = await i2c.read_from(0x50, [0x00, 0x00], 4)
+        await device.close()
+
+    Note:
+    - open(), close() and create_interface() run once per session and are executed in the default executor.
+    - A method submitting several sequences (e.g. update_bits) is run again for each of them, answering the
+      submissions already made with their responses. Requests are never sent twice, but the method must not
+      depend on anything but its arguments, the interface state and the responses.
+    - Configuration methods take the lock of their interface while building their requests and decoding the
+      responses, not while the requests are in flight.
+    """
+
+    def __init__(self, start_id=0, device: SupernovaDevice=None):
+        self.device = device or SupernovaDevice(start_id)
+        self.interfaces = {}
+
+    @property
+    def driver(self):
+        return self.device.driver
+
+    @driver.setter
+    def driver(self, newDriver):
+        self.device.driver = newDriver
+
+    @property
+    def controller(self):
+        return self.device.controller
+
+    async def open(self, usb_address=None):
+        # The strings of the information not cached yet are requested here, not on the event loop thread
+        return await asyncio.to_thread(lambda: self.device.open(usb_address).load())
+
+    async def close(self):
+        return await asyncio.to_thread(self.device.close)
+
+    async def create_interface(self, interface_name):
+        if interface_name not in self.interfaces:
+            interface = await asyncio.to_thread(self.device.create_interface, interface_name)
+            self.interfaces[interface_name] = AsyncSupernovaInterface(interface, self)
+
+        return self.interfaces[interface_name]
+
+    async def measure_analog_signal(self, timeout=None):
+        return await self._call(self.device.measure_analog_signal, timeout=timeout)
+
+    async def get_hardware_version(self, timeout=None):
+        return await self._call(self.device.get_hardware_version, timeout=timeout)
+
+    def notifications(self, filter_func=None, notification_name=None, dynamic_address=None):
+        """
+        Creates an async iterator over the notifications of the device.
+
+        Args:
+        filter_func (callable, optional): Receives (name, message) and returns True for the notifications the
+                                          stream should deliver. All notifications are delivered by default.
+        notification_name (str, optional): Only deliver the notifications with this name.
+        dynamic_address (int, optional): Along with notification_name, only deliver the notifications sent by
+                                         the I3C target with this dynamic address.
+
+        Returns:
+        NotificationStream: The stream, to be consumed with 'async for' and closed with close() or 'async with'.
+        """
+        return NotificationStream(self.device, asyncio.get_running_loop(), filter_func, notification_name, dynamic_address)
+
+    async def _call(self, method, *args, **kwargs):
+        call = DeferredCall(method, *args, **kwargs)
+        timeout = kwargs.get("timeout")
+        if timeout is None:
+            timeout = self.device.timeout
+
+        sequence = call.prepare()
+        while sequence is not None:
+            try:
+                if call.pipelined:
+                    responses = await self._pipelined_submit(sequence, call.window, timeout, call.retries_enabled,
+                                                             call.issuing_interface)
+                else:
+                    responses = await self._submit(sequence, timeout, call.retries_enabled, call.issuing_interface)
+            except Exception as e:
+                sequence = call.advance(error=e)
+            else:
+                sequence = call.advance(responses)
+
+        return call.result
+
+    def _submit(self, sequence, timeout=None, retries=True, interface=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(responses):
+            if not future.done():
+                future.set_result(responses)
+
+        def fail(error):
+            if not future.done():
+                future.set_exception(error)
+
+        # The method has left its no_retries() block, and its interface, by now
+        with issued_by(interface), contextlib.nullcontext() if retries else no_retries():
+            sequence_id = self.device.controller.submit(
+                sequence=sequence,
+                on_ready=lambda responses: loop.call_soon_threadsafe(resolve, list(responses)),
+                on_error=lambda responses, error: loop.call_soon_threadsafe(fail, error),
+            )
+
+        if timeout is not None:
+            # The cancellation fails the future through on_error, like a blocking call would fail
+            expiry = loop.call_later(timeout, self.device.controller.cancel, sequence_id, TransferTimeoutError(timeout=timeout))
+            future.add_done_callback(lambda _: expiry.cancel())
+
+        return future
+
+    async def _pipelined_submit(self, sequence, window=None, timeout=None, retries=True, interface=None):
+        # As controller.pipelined_submit: up to 'window' requests in flight, sent in order, none after a failure
+        slots = asyncio.Semaphore(window or max(len(sequence), 1))
+        errors = []
+
+        async def send(func):
+            async with slots:
+                if errors:
+                    return None
+                try:
+                    return (await self._submit([func], timeout, retries, interface))[0]
+                except Exception as e:
+                    errors.append(e)
+                    return None
+
+        responses = await asyncio.gather(*[send(func) for func in sequence])
+        if errors:
+            raise errors[0]
+
+        return responses
@@ -0,0 +1,93 @@
+from supernovacontroller.errors import BackendError
+
+from .controller import DEFAULT_PIPELINE_WINDOW
+from .deferred import DeferredCall
+
+
+class SupernovaBatch:
+    """
+    Collects operations from any interface of a SupernovaDevice and submits all their requests at once.
+
+    Each interface method normally waits for the response of its request before returning, so a script of N
+    operations costs N round trips to the device. A batch sends the requests of all the collected operations
+    back to back, keeping up to 'window' of them in flight, and then decodes every response with the same
+    logic the interface methods use when called directly.
+
+    Usage:
+        with device.batch() as batch:
+            batch.add(i2c.write, 0x50, [0x00, 0x00], [0xDE, 0xAD])
+            batch.add(i2c.read_from, 0x50, [0x00, 0x00], 2)
+            batch.add(spi.transfer, [0x9F, 0x00, 0x00], 3)
+
+        (write_result, read_result, transfer_result) = batch.results
+
+    Note:
+    - Operations are prepared before any of them is executed, so an operation can't rely on interface state
+      (e.g. the bus voltage) changed by a previous operation of the same batch.
+    - Operations issuing more than one submission (e.g. init_bus with a voltage) only batch their first one,
+      the rest are sent once the batch completes.
+    """
+
+    def __init__(self, controller, window=DEFAULT_PIPELINE_WINDOW):
+        self.controller = controller
+        self.window = window
+        self.calls = []
+        self.results = None
+
+    def add(self, method, *args, **kwargs):
+        """
+        Adds an operation to the batch.
+
+        Args:
+        method: The bound interface method to call, e.g. i2c.write.
+        *args, **kwargs: The arguments of the method.
+
+        Returns:
+        int: The index of the operation result in the list returned by submit().
+        """
+        self.calls.append(DeferredCall(method, *args, **kwargs))
+
+        return len(self.calls) - 1
+
+    def submit(self):
+        """
+        Submits the requests of all the collected operations and decodes their responses.
+
+        Returns:
+        list: The return value of every operation, in the order they were added.
+
+        Raises:
+        BackendError: If the requests could not be submitted.
+        """
+        calls, self.calls = self.calls, []
+
+        sequence = []
+        spans = []
+        # The retry policy of each request is the one of the interface of its operation
+        interfaces = []
+        for call in calls:
+            requests = call.prepare() or []
+            spans.append((len(sequence), len(requests)))
+            sequence.extend(requests)
+            interfaces.extend([call.issuing_interface] * len(requests))
+
+        try:
+            responses = self.controller.pipelined_submit(sequence, self.window, interfaces)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        results = []
+        for call, (start, length) in zip(calls, spans):
+            results.append(call.result if call.done else call.complete(responses[start:start + length]))
+
+        self.results = results
+
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.submit()
+        return False
@@ -0,0 +1,355 @@
+import threading
+
+from transfer_controller import TransferController
+
+from supernovacontroller.errors import TransferTimeoutError
+
+from .retry import DEVICE, current_interface, is_success, issued_by, retries_enabled
+from .timeouts import get_call_timeout
+
+# Maximum number of requests kept in flight by pipelined submissions
+DEFAULT_PIPELINE_WINDOW = 8
+
+class SupernovaTransferController(TransferController):
+    """
+    TransferController used by SupernovaDevice.
+
+    It keeps the submission API of TransferController (submit, sync_submit, wait_for, handle_response) and:
+    - sends the first request of a sequence from the calling thread, instead of spawning a thread per submission,
+    - finds the sequence a response belongs to through an index by transfer id, instead of scanning every
+      sequence ever submitted,
+    - forgets the state of the sequences once they complete,
+    - adds pipelined_submit, which keeps several requests in flight at the same time,
+    - optionally times every transfer, from sending its request to handling its response, into 'stats',
+    - cancels the sequences that are not answered in time, see wait_for,
+    - sends again the requests failing with a transient error, as decided by the RetryPolicy of their
+      interface, see set_retry_policy, unless they were submitted inside a no_retries() block. The interface of
+      a sequence is the one whose method submitted it, see retry.issued_by().
+    """
+
+    def __init__(self, id_generator, stats=None, timeout=None):
+        super().__init__(id_generator)
+        # TransferStats, or None to skip timing the transfers
+        self.stats = stats
+        # Default time to wait for a sequence, in seconds, None to wait forever
+        self.timeout = timeout
+        # Interface (e.g. "i2c") or None for all of them -> RetryPolicy
+        self.retry_policies = {}
+        # Interface, or DEVICE -> {"retries", "recovered", "exhausted", "failed"}
+        self.retry_counters = {}
+        # A response can complete a sequence on the same thread that is sending its requests
+        self.global_lock = threading.RLock()
+        # Protects request_states and transfer_index
+        self.state_lock = threading.Lock()
+        self.transfer_index = {}
+
+    def _get_transfer_id(self):
+        transfer_id = self._get_unique_id()
+        if transfer_id > 65535:
+            transfer_id = (transfer_id % 65534) + 1 # Ensures all ids are in range of 1 - 65535
+        return transfer_id
+
+    def _submit_sequence(self, sequence=None, on_ready=None, on_error=None, wait_for=None):
+        with self.state_lock:
+            sequence_id = self.sequence_counter
+            self.sequence_counter += 1
+
+        request_state = {
+            'current_index': 0,
+            'transfer_ids': [self._get_transfer_id() for _ in range(len(sequence))],
+            'responses': [],
+            'sequence': sequence,
+            'on_ready': on_ready,
+            'on_error': on_error,
+            'complete_event': threading.Event(),
+            'sequence_id': sequence_id,
+            'completed': False,
+            # Times the current request was sent
+            'attempt': 1,
+            'retries_enabled': retries_enabled(),
+            # The interface whose retry policy applies, None for the transfers of the device itself
+            'interface': current_interface(),
+        }
+
+        with self.state_lock:
+            self.request_states[sequence_id] = request_state
+            for transfer_id in request_state['transfer_ids']:
+                self.transfer_index[transfer_id] = sequence_id
+
+        if len(sequence) == 0:
+            self._complete_sequence(request_state)
+        elif wait_for is None:
+            self._send_current(request_state)
+        else:
+            def sequence_runner():
+                self.wait_for(wait_for)
+                self._send_current(request_state)
+
+            threading.Thread(target=sequence_runner, daemon=True).start()
+
+        return sequence_id
+
+    def _send_current(self, request_state):
+        current_index = request_state['current_index']
+        func = request_state['sequence'][current_index]
+        transfer_id = request_state['transfer_ids'][current_index]
+        with self.global_lock:
+            if request_state['completed']:
+                # Cancelled while the previous response was being handled
+                return
+            if self.stats is not None:
+                self.stats.sent(transfer_id)
+            try:
+                func(transfer_id)
+            except Exception as e:
+                # We are assuming that the exception was raised before triggering the
+                # downstream operation that eventually generates an asynchronous response
+                if self.stats is not None:
+                    self.stats.discard(transfer_id)
+                self._complete_sequence(request_state, e)
+
+    def _complete_sequence(self, request_state, error=None):
+        # A sequence is completed once, either by its last response, an error or its cancellation
+        with self.state_lock:
+            if request_state['completed']:
+                return False
+            request_state['completed'] = True
+
+        if error is None:
+            if request_state['on_ready']:
+                request_state['on_ready'](request_state['responses'])
+        elif request_state['on_error']:
+            request_state['on_error'](request_state['responses'], error)
+
+        request_state['complete_event'].set()
+
+        sequence_id = request_state['sequence_id']
+        with self.state_lock:
+            self.request_states.pop(sequence_id, None)
+            for transfer_id in request_state['transfer_ids']:
+                if self.transfer_index.get(transfer_id) == sequence_id:
+                    del self.transfer_index[transfer_id]
+
+        return True
+
+    def effective_timeout(self):
+        """
+        Returns:
+        float: The time to wait for a sequence on the current thread: the timeout of the call in progress, or the
+               default timeout of the controller. None to wait forever.
+        """
+        timeout = get_call_timeout()
+        return self.timeout if timeout is None else timeout
+
+    def wait_for(self, sequence_id, timeout=None):
+        """
+        Waits for a sequence to complete. A sequence not completed in time is cancelled with TransferTimeoutError,
+        which sync_submit raises.
+
+        Args:
+        sequence_id (int): The sequence, as returned by submit().
+        timeout (float, optional): The time to wait, in seconds. Defaults to effective_timeout().
+        """
+        request_state = self.request_states.get(sequence_id)
+        if request_state is None:
+            return
+
+        if timeout is None:
+            timeout = self.effective_timeout()
+
+        if not request_state['complete_event'].wait(timeout):
+            self.cancel(sequence_id, TransferTimeoutError(timeout=timeout))
+
+    def cancel(self, sequence_id, error):
+        """
+        Cancels a sequence waiting for a response. Its on_error callback receives 'error', its pending requests
+        are not sent, and late responses to its transfers are ignored.
+
+        Args:
+        sequence_id (int): The sequence, as returned by submit().
+        error (Exception): The error the sequence fails with.
+
+        Returns:
+        bool: False if the sequence had already completed.
+        """
+        with self.state_lock:
+            request_state = self.request_states.get(sequence_id)
+        if request_state is None:
+            return False
+
+        if not self._complete_sequence(request_state, error):
+            return False
+
+        if self.stats is not None:
+            for transfer_id in request_state['transfer_ids'][request_state['current_index']:]:
+                self.stats.discard(transfer_id)
+
+        return True
+
+    def wait_for_all(self):
+        for request_state in list(self.request_states.values()):
+            request_state['complete_event'].wait()
+
+    def handle_response(self, *, transfer_id, response):
+        with self.state_lock:
+            request_state = self.request_states.get(self.transfer_index.get(transfer_id))
+
+        if request_state is None:
+            return False
+
+        current_index = request_state['current_index']
+        if request_state['completed'] or transfer_id != request_state['transfer_ids'][current_index]:
+            return True
+
+        if self.retry_policies and request_state['retries_enabled'] and self._retry(request_state, transfer_id, response):
+            return True
+
+        if self.stats is not None:
+            self.stats.handled(transfer_id, response)
+
+        request_state['responses'].append(response)
+        current_index += 1
+        request_state['current_index'] = current_index
+        request_state['attempt'] = 1
+
+        if current_index < len(request_state['sequence']):
+            self._send_current(request_state)
+        else:
+            self._complete_sequence(request_state)
+
+        return True
+
+    def set_retry_policy(self, policy, interface=None):
+        """
+        Args:
+        policy (RetryPolicy): The policy, or None to remove it.
+        interface (str, optional): The interface the policy applies to, by its name in create_interface() (e.g.
+                                   "i3c.controller"). By default, the policy applies to the transfers of the
+                                   interfaces without one, and to those of the device itself.
+        """
+        if policy is None:
+            self.retry_policies.pop(interface, None)
+        else:
+            self.retry_policies[interface] = policy
+
+    def _retry(self, request_state, transfer_id, response):
+        interface = request_state['interface']
+        policy = self.retry_policies.get(interface, self.retry_policies.get(None))
+        if policy is None:
+            return False
+        interface = interface or DEVICE
+
+        attempt = request_state['attempt']
+        retry = policy.should_retry(response, attempt)
+
+        with self.state_lock:
+            counters = self.retry_counters.get(interface)
+            if counters is None:
+                counters = self.retry_counters[interface] = {"retries": 0, "recovered": 0, "exhausted": 0, "failed": 0}
+
+            if retry:
+                counters["retries"] += 1
+                # The retry gets a new transfer id, a late response to this attempt is ignored
+                current_index = request_state['current_index']
+                new_transfer_id = self._get_transfer_id()
+                request_state['transfer_ids'][current_index] = new_transfer_id
+                request_state['attempt'] = attempt + 1
+                if self.transfer_index.get(transfer_id) == request_state['sequence_id']:
+                    del self.transfer_index[transfer_id]
+                self.transfer_index[new_transfer_id] = request_state['sequence_id']
+            elif attempt > 1:
+                counters[self.__retry_outcome(policy, response)] += 1
+
+        if not retry:
+            return False
+
+        if self.stats is not None:
+            self.stats.discard(transfer_id)
+
+        delay = policy.delay(attempt)
+        if delay > 0:
+            timer = threading.Timer(delay, self._send_current, args=(request_state,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._send_current(request_state)
+
+        return True
+
+    @staticmethod
+    def __retry_outcome(policy, response):
+        if policy.is_retryable(response):
+            return "exhausted"
+
+        # Responses to unknown commands without a transient error count as successful
+        return "failed" if is_success(response) is False else "recovered"
+
+    def retry_stats(self):
+        """
+        Returns:
+        dict: Per interface (or DEVICE for the transfers of the device itself), the number of 'retries' sent, of
+              requests that succeeded after being retried ('recovered'), of requests that still failed with a
+              transient error after the last attempt ('exhausted') and of retried requests that failed with an
+              error that is not retried ('failed').
+        """
+        with self.state_lock:
+            return {interface: dict(counters) for interface, counters in self.retry_counters.items()}
+
+    def pipelined_submit(self, sequence, window=DEFAULT_PIPELINE_WINDOW, interfaces=None):
+        """
+        Submits a sequence of requests without waiting for the response of a request before sending the next one.
+
+        Unlike sync_submit, which sends each request once the previous one was answered, this method keeps up to
+        'window' requests in flight. Requests are sent in the order of the sequence, from the calling thread.
+
+        Args:
+        sequence (list): Functions receiving a transfer id and sending one request to the device.
+        window (int, optional): Maximum number of requests waiting for a response at any time. None means no limit.
+        interfaces (list, optional): The interface whose retry policy applies to each request, for sequences
+                                     gathering the requests of several interfaces. By default, the interface
+                                     submitting the sequence.
+
+        Returns:
+        list: The response of every request, in the same order as the sequence.
+
+        Raises:
+        Exception: The first exception raised while sending a request. The requests after it are not sent.
+        TransferTimeoutError: If a request is not answered in time. The requests in flight are cancelled.
+        """
+        responses = [None] * len(sequence)
+        errors = []
+        slots = threading.BoundedSemaphore(window or max(len(sequence), 1))
+        sequence_ids = []
+        timeout = self.effective_timeout()
+
+        for index, func in enumerate(sequence):
+            if not slots.acquire(timeout=timeout):
+                # No request of the window was answered in time
+                for sequence_id in sequence_ids:
+                    self.cancel(sequence_id, TransferTimeoutError(timeout=timeout))
+                break
+            if errors:
+                slots.release()
+                break
+
+            def on_ready(result, index=index):
+                responses[index] = result[0]
+                slots.release()
+
+            def on_error(result, error):
+                errors.append(error)
+                slots.release()
+
+            if interfaces is None:
+                sequence_ids.append(self.submit(func, on_ready=on_ready, on_error=on_error))
+            else:
+                with issued_by(interfaces[index]):
+                    sequence_ids.append(self.submit(func, on_ready=on_ready, on_error=on_error))
+
+        for sequence_id in sequence_ids:
+            self.wait_for(sequence_id, timeout)
+
+        if errors:
+            raise errors[0]
+
+        return responses
@@ -0,0 +1,177 @@
+import types
+
+from .retry import current_interface, retries_enabled
+
+
+class _DeferredSubmission(BaseException):
+    """
+    Raised by the scripted controller to stop an interface method at a submission with no outcome yet.
+
+    It derives from BaseException so the 'except Exception' blocks around sync_submit in the interface
+    methods let it through instead of wrapping it into a BackendError.
+    """
+
+    def __init__(self, sequence, pipelined=False, window=None):
+        super().__init__()
+        self.sequence = sequence
+        # Whether the method submitted it with pipelined_submit, and the window it asked for
+        self.pipelined = pipelined
+        self.window = window
+        # Whether it was submitted outside of a no_retries() block, and by which interface
+        self.retries_enabled = retries_enabled()
+        self.interface = current_interface()
+
+class _ScriptedController:
+    """
+    Answers the submissions of an interface method with outcomes collected beforehand, in order.
+
+    Each outcome is a (responses, error) tuple: the responses are returned to the method, or the error is raised
+    as sync_submit would raise it. Once the outcomes run out, submissions are forwarded to 'controller', or
+    deferred if there is none.
+    """
+
+    # The method is run again from the start for each outcome, so it must make the same submissions every time
+    replays_submissions = True
+
+    def __init__(self, outcomes, controller=None):
+        self.outcomes = iter(outcomes)
+        self.controller = controller
+
+    def sync_submit(self, sequence):
+        outcome = next(self.outcomes, None)
+
+        if outcome is None:
+            if self.controller is None:
+                raise _DeferredSubmission(list(sequence))
+            return self.controller.sync_submit(sequence)
+
+        (responses, error) = outcome
+        if error is not None:
+            raise error
+
+        return responses
+
+    def pipelined_submit(self, sequence, window=None):
+        # Deferred like any other submission, whoever sends it decides how many requests are in flight
+        outcome = next(self.outcomes, None)
+
+        if outcome is None:
+            if self.controller is None:
+                raise _DeferredSubmission(list(sequence), pipelined=True, window=window)
+            return self.controller.pipelined_submit(sequence, window)
+
+        (responses, error) = outcome
+        if error is not None:
+            raise error
+
+        return responses
+
+    def __getattr__(self, name):
+        return getattr(self.controller, name)
+
+class _InterfaceView:
+    """
+    Stands for an interface while one of its methods runs against another controller.
+    Every attribute other than 'controller' is read from and written to the interface itself.
+    """
+
+    def __init__(self, interface, controller):
+        object.__setattr__(self, "_interface", interface)
+        object.__setattr__(self, "controller", controller)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._interface, name)
+        if isinstance(attribute, types.MethodType) and attribute.__self__ is self._interface:
+            # Calls between methods of the interface must also see the replacement controller
+            return types.MethodType(attribute.__func__, self)
+        return attribute
+
+    def __setattr__(self, name, value):
+        setattr(self._interface, name, value)
+
+class DeferredCall:
+    """
+    A call to a method of an interface (or of the SupernovaDevice itself) split in two steps: building the
+    requests it submits, and decoding their responses with the method's own logic.
+
+    prepare() runs the method until its first call to controller.sync_submit and keeps the submitted sequence
+    instead of sending it. complete() runs the method again, handing it the given responses as the result of
+    that first submission, so the return value is exactly the one the method returns when called directly.
+    Methods submitting several sequences can be driven one submission at a time with advance().
+    """
+
+    def __init__(self, method, *args, **kwargs):
+        if not isinstance(method, types.MethodType) or not hasattr(method.__self__, "controller"):
+            raise TypeError("Expected a method of a Supernova interface")
+
+        self.interface = method.__self__
+        self.function = method.__func__
+        self.args = args
+        self.kwargs = kwargs
+        self.outcomes = []
+        self.sequence = None
+        # How the pending sequence was submitted, see _DeferredSubmission
+        self.pipelined = False
+        self.window = None
+        self.retries_enabled = True
+        self.issuing_interface = None
+        self.result = None
+        self.done = False
+
+    def _run(self, controller):
+        try:
+            self.result = self.function(_InterfaceView(self.interface, controller), *self.args, **self.kwargs)
+            self.done = True
+            self.sequence = None
+        except _DeferredSubmission as submission:
+            self.sequence = submission.sequence
+            self.pipelined = submission.pipelined
+            self.window = submission.window
+            self.retries_enabled = submission.retries_enabled
+            self.issuing_interface = submission.interface
+
+        return self.sequence
+
+    def prepare(self):
+        """
+        Runs the method up to its first submission.
+
+        Returns:
+        list: The sequence of requests the method submits, or None if the method returned without submitting
+              anything. In that case its return value is already available in 'result'.
+        """
+        return self._run(_ScriptedController(self.outcomes))
+
+    def advance(self, responses=None, error=None):
+        """
+        Hands the method the outcome of its pending submission and runs it up to its next one.
+
+        Args:
+        responses (list, optional): The responses to the pending sequence.
+        error (Exception, optional): The error raised while submitting the pending sequence, if any.
+
+        Returns:
+        list: The next sequence of requests the method submits, or None if the method returned. In that case
+              its return value is available in 'result'.
+        """
+        self.outcomes.append((responses, error))
+
+        return self._run(_ScriptedController(self.outcomes))
+
+    def complete(self, responses):
+        """
+        Runs the method handing it the responses to the sequence returned by prepare().
+
+        Args:
+        responses (list): One response per request of the prepared sequence.
+
+        Returns:
+        The return value of the method.
+
+        Note:
+        - If the method submits more requests after the first ones, they are sent to the device right away.
+        """
+        self.outcomes.append((responses, None))
+        self._run(_ScriptedController(self.outcomes, self.interface.controller))
+
+        return self.result
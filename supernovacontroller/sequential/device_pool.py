@@ -0,0 +1,421 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+from supernovacontroller.errors import BackendError, NoDeviceAvailableError
+
+from ..utils.logging import logging
+from .supernova_device import DEFAULT_OPEN_WORKERS, SupernovaDevice
+
+logger = logging.getLogger("supernovacontroller")
+
+# Consecutive failures after which an adapter stops being leased
+DEFAULT_MAX_FAILURES = 3
+
+class _Adapter:
+    def __init__(self, device, info):
+        self.device = device
+        self.info = info
+        self.serial_number = info.get("serial_number")
+        self.hw_version = info.get("hw_version")
+        self.healthy = True
+        self.busy = False
+        self.busy_since = None
+        # The thread using the adapter: the one holding its lease or running a job on it
+        self.holder = None
+        self.busy_time = 0.0
+        self.added_at = time.perf_counter()
+        self.leases = 0
+        self.jobs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def matches(self, serial_number, hw_version):
+        return ((serial_number is None or self.serial_number == serial_number) and
+                (hw_version is None or self.hw_version == hw_version))
+
+class SupernovaLease:
+    """
+    An adapter of a SupernovaDevicePool reserved for the exclusive use of its holder until it is released.
+
+    Used as a context manager, the lease is released when leaving the 'with' block. A BackendError raised in the
+    block counts as a failure of the adapter.
+    """
+
+    def __init__(self, pool, adapter):
+        self.pool = pool
+        self.adapter = adapter
+        self.released = False
+
+    @property
+    def device(self) -> SupernovaDevice:
+        return self.adapter.device
+
+    @property
+    def info(self):
+        return self.adapter.info
+
+    @property
+    def serial_number(self):
+        return self.adapter.serial_number
+
+    @property
+    def hw_version(self):
+        return self.adapter.hw_version
+
+    def release(self, failed=False):
+        """
+        Returns the adapter to the pool.
+
+        Args:
+        failed (bool, optional): Whether the adapter failed while leased. Adapters failing too many times in a row
+                                 are no longer leased until check_health() finds them working again.
+        """
+        if not self.released:
+            self.released = True
+            self.pool._release(self.adapter, failed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release(failed=isinstance(exc_value, BackendError))
+        return False
+
+class SupernovaDevicePool:
+    """
+    A set of opened Supernovas shared by several jobs.
+
+    Adapters are handed out for exclusive use, either explicitly with lease() or by running a job with submit().
+    Both can ask for a specific adapter by serial number, or for any adapter of a hardware version. Jobs are
+    queued until a matching adapter is free, so every adapter is kept busy while there is work for it. Jobs run
+    on worker threads reused from one job to the next, never more than there are adapters.
+
+    An adapter failing (i.e. raising BackendError) 'max_failures' times in a row is considered unhealthy and is
+    no longer handed out, until check_health() finds it working again.
+
+    Usage:
+        with SupernovaDevicePool.open_all() as pool:
+            futures = [pool.submit(run_test, hw_version="C") for run_test in tests]
+            results = [future.result() for future in futures]
+            print(pool.utilization())
+    """
+
+    def __init__(self, devices=(), max_failures=DEFAULT_MAX_FAILURES):
+        """
+        Args:
+        devices (iterable, optional): (SupernovaDevice, info) tuples, with opened devices and the information
+                                      returned by their open() method. The pool closes them when it is closed,
+                                      or right away if it can't be created.
+        max_failures (int, optional): Consecutive failures after which an adapter is considered unhealthy.
+        """
+        self.condition = threading.Condition()
+        self.adapters = []
+        self.jobs = collections.deque()
+        # Jobs with an adapter, waiting for a worker thread
+        self.ready = collections.deque()
+        self.workers = []
+        self.idle_workers = 0
+        self.max_failures = max_failures
+        self.open_failures = []
+        self.closed = False
+
+        devices = list(devices)
+        try:
+            adapters = [_Adapter(device, info) for (device, info) in devices]
+        except Exception:
+            for (device, _) in devices:
+                device.close()
+            raise
+
+        with self.condition:
+            self.adapters.extend(adapters)
+
+    @classmethod
+    def open_all(cls, max_workers=DEFAULT_OPEN_WORKERS, max_failures=DEFAULT_MAX_FAILURES):
+        """
+        Creates a pool with all the connected Supernovas.
+
+        The devices that could not be opened are listed in the 'open_failures' attribute of the pool, as
+        reported by SupernovaDevice.openAllConnectedSupernovaDevicesWithReport().
+        """
+        report = SupernovaDevice.openAllConnectedSupernovaDevicesWithReport(max_workers)
+
+        pool = cls([(opened["device"], opened["info"]) for opened in report["opened"]], max_failures)
+        pool.open_failures = report["failed"]
+
+        return pool
+
+    def add(self, device: SupernovaDevice, info):
+        """
+        Adds an opened device to the pool.
+
+        Args:
+        device (SupernovaDevice): The device.
+        info (dict): The information returned by its open() method.
+        """
+        # Built before taking the lock, leases and jobs don't wait for it
+        adapter = _Adapter(device, info)
+
+        with self.condition:
+            self.adapters.append(adapter)
+            self.__schedule()
+            self.condition.notify_all()
+
+    def __find_free(self, serial_number, hw_version):
+        # Must be called with the lock held
+        candidates = [adapter for adapter in self.adapters if adapter.healthy and adapter.matches(serial_number, hw_version)]
+        if not candidates:
+            raise NoDeviceAvailableError(f"No healthy device with serial number {serial_number} and hardware version {hw_version}")
+
+        # The least used adapter, to spread the work
+        free = [adapter for adapter in candidates if not adapter.busy]
+        return min(free, key=lambda adapter: adapter.busy_time) if free else None
+
+    def __acquire(self, adapter):
+        # Must be called with the lock held
+        adapter.busy = True
+        adapter.busy_since = time.perf_counter()
+        adapter.holder = threading.get_ident()
+
+    def _release(self, adapter, failed):
+        with self.condition:
+            adapter.busy = False
+            adapter.busy_time += time.perf_counter() - adapter.busy_since
+            adapter.busy_since = None
+            adapter.holder = None
+
+            if failed:
+                adapter.failures += 1
+                adapter.consecutive_failures += 1
+                if adapter.healthy and adapter.consecutive_failures >= self.max_failures:
+                    adapter.healthy = False
+                    logger.warning("Device %s failed %d times in a row, it won't be used until it passes a health check",
+                                   adapter.serial_number, adapter.consecutive_failures)
+            else:
+                adapter.consecutive_failures = 0
+
+            self.__schedule()
+            self.condition.notify_all()
+
+    def lease(self, serial_number=None, hw_version=None, timeout=None):
+        """
+        Reserves an adapter, waiting until one is free.
+
+        Args:
+        serial_number (str, optional): The serial number of the adapter.
+        hw_version (str, optional): The hardware version of the adapter, as returned by SupernovaDevice.open().
+        timeout (float, optional): Maximum time to wait for a free adapter, in seconds. No limit by default.
+
+        Returns:
+        SupernovaLease: The lease, to be released with release() or by using it as a context manager.
+
+        Raises:
+        NoDeviceAvailableError: If no healthy adapter matches the request, or none became free in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise NoDeviceAvailableError("The device pool is closed")
+
+                adapter = self.__find_free(serial_number, hw_version)
+                if adapter is not None:
+                    self.__acquire(adapter)
+                    adapter.leases += 1
+                    return SupernovaLease(self, adapter)
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise NoDeviceAvailableError("Timed out waiting for a free device")
+
+                self.condition.wait(remaining)
+
+    def submit(self, job, serial_number=None, hw_version=None):
+        """
+        Runs a job on an adapter as soon as a matching one is free. Jobs waiting for an adapter start in the order
+        they were submitted, unless an adapter matching a later job frees up first.
+
+        Args:
+        job (callable): Receives the SupernovaDevice to work with. A BackendError raised by the job counts as a
+                        failure of the adapter.
+        serial_number (str, optional): The serial number of the adapter to run the job on.
+        hw_version (str, optional): The hardware version of the adapter to run the job on.
+
+        Returns:
+        concurrent.futures.Future: The future of the value returned by the job. It fails with
+                                   NoDeviceAvailableError if no healthy adapter matches the job.
+        """
+        future = Future()
+
+        with self.condition:
+            if self.closed:
+                raise NoDeviceAvailableError("The device pool is closed")
+
+            self.jobs.append((job, serial_number, hw_version, future))
+            self.__schedule()
+
+        return future
+
+    def __schedule(self):
+        # Must be called with the lock held
+        for entry in list(self.jobs):
+            (job, serial_number, hw_version, future) = entry
+
+            try:
+                adapter = self.__find_free(serial_number, hw_version)
+            except NoDeviceAvailableError as e:
+                self.jobs.remove(entry)
+                future.set_exception(e)
+                continue
+
+            if adapter is None:
+                continue
+
+            self.jobs.remove(entry)
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self.__acquire(adapter)
+            adapter.jobs += 1
+            self.ready.append((job, adapter, future))
+
+        # Every running job holds an adapter, so there is no need for more workers than adapters
+        while len(self.ready) > self.idle_workers and len(self.workers) < len(self.adapters):
+            worker = threading.Thread(target=self.__work, daemon=True)
+            self.workers.append(worker)
+            self.idle_workers += 1
+            worker.start()
+        self.condition.notify_all()
+
+    def __work(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.ready or self.closed)
+                self.idle_workers -= 1
+                if not self.ready:
+                    self.workers.remove(threading.current_thread())
+                    return
+
+                (job, adapter, future) = self.ready.popleft()
+                adapter.holder = threading.get_ident()
+
+            try:
+                result = job(adapter.device)
+            except BaseException as e:
+                (result, error) = (None, e)
+            else:
+                error = None
+
+            # The adapter is accounted for by the time the job is seen finished. The worker is idle again before
+            # the adapter is released, so the next job for it doesn't start another worker.
+            with self.condition:
+                self.idle_workers += 1
+                self._release(adapter, isinstance(error, BackendError))
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def check_health(self):
+        """
+        Checks every free adapter by asking for its hardware version. Adapters answering are healthy again,
+        the others are marked unhealthy. Busy adapters keep their state.
+
+        Returns:
+        list: One {"serial_number", "healthy"} dictionary per checked adapter.
+        """
+        with self.condition:
+            adapters = [adapter for adapter in self.adapters if not adapter.busy]
+            for adapter in adapters:
+                self.__acquire(adapter)
+
+        results = []
+        for adapter in adapters:
+            try:
+                adapter.device.get_hardware_version()
+                healthy = True
+            except Exception:
+                healthy = False
+
+            with self.condition:
+                adapter.healthy = healthy
+                if healthy:
+                    adapter.consecutive_failures = 0
+
+            self._release(adapter, False)
+            results.append({"serial_number": adapter.serial_number, "healthy": healthy})
+
+        return results
+
+    def utilization(self):
+        """
+        Reports how each adapter was used since it was added to the pool.
+
+        Returns:
+        list: One dictionary per adapter with its 'serial_number', 'hw_version', whether it is 'healthy' and
+              'busy', the number of 'leases' and 'jobs' it served and their 'failures', the 'busy_time' in seconds
+              and the 'utilization', the fraction of the time it was busy.
+        """
+        now = time.perf_counter()
+
+        with self.condition:
+            report = []
+            for adapter in self.adapters:
+                busy_time = adapter.busy_time + (now - adapter.busy_since if adapter.busy else 0.0)
+                elapsed = now - adapter.added_at
+                report.append({
+                    "serial_number": adapter.serial_number,
+                    "hw_version": adapter.hw_version,
+                    "healthy": adapter.healthy,
+                    "busy": adapter.busy,
+                    "leases": adapter.leases,
+                    "jobs": adapter.jobs,
+                    "failures": adapter.failures,
+                    "busy_time": busy_time,
+                    "utilization": busy_time / elapsed if elapsed > 0 else 0.0,
+                })
+
+        return report
+
+    def pending_jobs(self):
+        """
+        Returns:
+        int: The number of jobs waiting for an adapter.
+        """
+        with self.condition:
+            return len(self.jobs)
+
+    def close(self):
+        """
+        Cancels the jobs waiting for an adapter, waits for the leases and running jobs to be released, and closes
+        all the devices.
+
+        Raises:
+        RuntimeError: If called from a job of the pool or while holding one of its leases, which would wait for
+                      itself forever. The pool is left open.
+        """
+        with self.condition:
+            if any(adapter.busy and adapter.holder == threading.get_ident() for adapter in self.adapters):
+                raise RuntimeError("The device pool can't be closed from one of its jobs or while holding a lease")
+
+            self.closed = True
+            while self.jobs:
+                self.jobs.popleft()[3].cancel()
+
+            self.condition.wait_for(lambda: not any(adapter.busy for adapter in self.adapters))
+            adapters, self.adapters = self.adapters, []
+            self.condition.notify_all()
+
+        for adapter in adapters:
+            adapter.device.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
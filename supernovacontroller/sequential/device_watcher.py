@@ -0,0 +1,246 @@
+import threading
+
+from ..utils.logging import logging
+from .supernova_device import SupernovaDevice
+
+logger = logging.getLogger("supernovacontroller")
+
+ATTACH = "attach"
+DETACH = "detach"
+
+# Seconds between two scans when the system doesn't report USB events
+DEFAULT_POLL_INTERVAL = 1.0
+
+class _SystemEvents:
+    """
+    Wakes the watcher up when the system reports a HID device being added or removed, so it scans right away
+    instead of at the next poll. Only available on Linux with pyudev installed.
+    """
+
+    def __init__(self, callback):
+        import pyudev
+
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by(subsystem="hidraw")
+        self.observer = pyudev.MonitorObserver(monitor, callback=lambda device: callback())
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.send_stop()
+
+class SupernovaDeviceWatcher:
+    """
+    Keeps track of the connected Supernovas and reports every attach and detach.
+
+    The connected devices are listed as getAllConnectedSupernovaDevices() does, and indexed by USB path and serial
+    number. A background thread lists them again every 'poll_interval' seconds and compares the result with the
+    previous one, so handlers only receive the changes. When the system can report USB events (Linux, with
+    pyudev installed), devices are listed again as soon as one is plugged or unplugged, and polling is only a
+    fallback. notify() asks for a scan right away as well.
+
+    Handlers run on the thread of the watcher, in the order the changes are found: detaches before attaches.
+
+    Usage:
+        def handle(event, device):
+            print(event, device["serial_number"], device["path"])
+
+        watcher = SupernovaDeviceWatcher(poll_interval=2)
+        watcher.subscribe(handle)
+        watcher.start()
+        ...
+        watcher.stop()
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL, use_system_events=True, enumerate_func=None):
+        """
+        Args:
+        poll_interval (float, optional): Seconds between two scans, when nothing else triggers one.
+        use_system_events (bool, optional): Whether to scan as soon as the system reports a USB event. Ignored
+                                            where they are not available.
+        enumerate_func (callable, optional): Lists the connected devices. Defaults to
+                                             SupernovaDevice.getAllConnectedSupernovaDevices(), looked up on
+                                             every scan.
+        """
+        self.poll_interval = poll_interval
+        self.use_system_events = use_system_events
+        self.enumerate_func = enumerate_func or (lambda: SupernovaDevice.getAllConnectedSupernovaDevices())
+
+        self.lock = threading.Lock()
+        # Serializes scans, so the events of two scans are never interleaved
+        self.scan_lock = threading.Lock()
+        self.by_path = {}
+        self.by_serial = {}
+        self.handlers = {}
+        self.next_subscription = 0
+
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = None
+        self.system_events = None
+
+    def subscribe(self, handler_func):
+        """
+        Registers a handler for the attach and detach events.
+
+        Args:
+        handler_func (callable): Called with (event, device) for every change, where event is ATTACH or DETACH
+                                 and device the dictionary listing the device.
+
+        Returns:
+        int: The subscription, to be passed to unsubscribe().
+        """
+        with self.lock:
+            self.next_subscription += 1
+            self.handlers[self.next_subscription] = handler_func
+            return self.next_subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Removes a handler.
+
+        Returns:
+        bool: True if the handler was registered.
+        """
+        with self.lock:
+            return self.handlers.pop(subscription, None) is not None
+
+    def start(self):
+        """
+        Lists the connected devices and starts watching for changes. The devices already connected are reported
+        as attached to the handlers subscribed by then.
+        """
+        if self.thread is not None:
+            return
+
+        self.stopping = False
+        self.scan()
+
+        if self.use_system_events:
+            try:
+                self.system_events = _SystemEvents(self.notify)
+                self.system_events.start()
+            except Exception as e:
+                # No pyudev or no udev at all, polling does the job
+                logger.debug("USB events not available, polling every %s s: %s", self.poll_interval, e)
+                self.system_events = None
+
+        self.thread = threading.Thread(target=self.__run, name="SupernovaDeviceWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops watching, waiting for the handlers being run to return.
+        """
+        if self.thread is None:
+            return
+
+        self.stopping = True
+        self.wake.set()
+        if self.system_events is not None:
+            self.system_events.stop()
+            self.system_events = None
+
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def notify(self):
+        """
+        Asks the watcher to list the devices right away.
+        """
+        self.wake.set()
+
+    def __run(self):
+        while True:
+            self.wake.wait(self.poll_interval)
+            self.wake.clear()
+            if self.stopping:
+                return
+
+            try:
+                self.scan()
+            except Exception as e:
+                logger.warning("Could not list the connected Supernovas: %s", e)
+
+    def scan(self):
+        """
+        Lists the connected devices, updates the view of the watcher and calls the handlers with the changes.
+
+        Returns:
+        list: The (event, device) changes found, detaches first.
+        """
+        with self.scan_lock:
+            devices = {device["path"]: device for device in self.enumerate_func()}
+
+            with self.lock:
+                detached = [device for (path, device) in self.by_path.items()
+                            if path not in devices or devices[path].get("serial_number") != device.get("serial_number")]
+                attached = [device for (path, device) in devices.items()
+                            if path not in self.by_path or self.by_path[path].get("serial_number") != device.get("serial_number")]
+
+                for device in detached:
+                    del self.by_path[device["path"]]
+                    if self.by_serial.get(device.get("serial_number")) is device:
+                        del self.by_serial[device.get("serial_number")]
+                for device in attached:
+                    self.by_path[device["path"]] = device
+                    self.by_serial[device.get("serial_number")] = device
+
+                changes = [(DETACH, device) for device in detached] + [(ATTACH, device) for device in attached]
+                handlers = list(self.handlers.values())
+
+            for (event, device) in changes:
+                logger.debug("Supernova %s %sed at %s", device.get("serial_number"), event, device["path"])
+                for handler_func in handlers:
+                    try:
+                        handler_func(event, device)
+                    except Exception:
+                        logger.exception("Device watcher handler failed on %s of %s", event, device["path"])
+
+        return changes
+
+    def devices(self):
+        """
+        Returns:
+        list: The dictionaries listing the connected devices, as of the last scan.
+        """
+        with self.lock:
+            return list(self.by_path.values())
+
+    def find(self, serial_number=None, path=None):
+        """
+        Looks a connected device up, as of the last scan.
+
+        Args:
+        serial_number (str, optional): The serial number of the device.
+        path (str, optional): The USB path of the device.
+
+        Returns:
+        dict: The dictionary listing the device, or None if it is not connected.
+        """
+        with self.lock:
+            if path is not None:
+                device = self.by_path.get(path)
+                if device is None or (serial_number is not None and device.get("serial_number") != serial_number):
+                    return None
+                return device
+
+            return self.by_serial.get(serial_number) if serial_number is not None else None
+
+    def __contains__(self, path):
+        with self.lock:
+            return path in self.by_path
+
+    def __len__(self):
+        with self.lock:
+            return len(self.by_path)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
@@ -1,10 +1,21 @@
+import threading
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import (
     GpioPinNumber, GpioLogicLevel, GpioFunctionality, GpioTriggerType,
+    GPIO_CONFIGURE_PIN, GPIO_DIGITAL_WRITE, GPIO_DIGITAL_READ, GPIO_SET_INTERRUPT, GPIO_DISABLE_INTERRUPT,
+    SET_I3C_BUS_VOLTAGE, SET_I2C_SPI_UART_BUS_VOLTAGE, USE_EXT_SRC_I3C_BUS_VOLTAGE,
+    USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE,
 )
 from supernovacontroller.errors import BackendError
+from .locking import serialized
+from .retry import submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
 
+@submits_for("gpio")
+@timeout_argument
 class SupernovaGPIOInterface:
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription, hardware_version):
         """
@@ -12,10 +23,13 @@ class SupernovaGPIOInterface:
         """
         self.driver = driver
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
         self.configured_pins = {}
         self.pins_voltage = None
         self.hardware_version = hardware_version
 
+    @serialized
     def set_pins_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the GPIO interface to a specified value.
@@ -39,10 +53,10 @@ class SupernovaGPIOInterface:
 
         if self.hardware_version.startswith("HW-B"):
             set_voltage_method = self.driver.setI3cBusVoltage
-            expected_command_name = "SET I3C BUS VOLTAGE"
+            expected_command = SET_I3C_BUS_VOLTAGE
         elif self.hardware_version.startswith("HW-C"):
             set_voltage_method = self.driver.setI2cSpiUartBusVoltage
-            expected_command_name = "SET I2C-SPI-UART BUS VOLTAGE"
+            expected_command = SET_I2C_SPI_UART_BUS_VOLTAGE
         else:
             raise BackendError(f"Unsupported hardware version: {self.hardware_version}")
 
@@ -54,7 +68,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == expected_command_name and responses[0]["result"] == "SYS_NO_ERROR"
+        response_success = VALIDATORS[expected_command].is_success(responses[0])
 
         if not response_success:
             return (False, responses[0]["result"])
@@ -63,6 +77,7 @@ class SupernovaGPIOInterface:
 
         return (True, voltage_mv)
 
+    @serialized
     def use_external_gpio_power_source(self):
         """
         Sets the bus to utilize the external power source voltage 
@@ -82,8 +97,10 @@ class SupernovaGPIOInterface:
 
         if self.hardware_version.startswith("HW-B"):
             set_voltage_method = self.driver.useExternalSourceForI3cBusVoltage
+            expected_command = USE_EXT_SRC_I3C_BUS_VOLTAGE
         elif self.hardware_version.startswith("HW-C"):
             set_voltage_method = self.driver.useExternalSourceForI2cSpiUartBusVoltage
+            expected_command = USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE
         else:
             raise BackendError(f"Unsupported hardware version: {self.hardware_version}")
 
@@ -95,36 +112,14 @@ class SupernovaGPIOInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "DAC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[expected_command].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
 
         return (True, response["external_voltage_mV"])
 
-    def __check_if_response_is_successful(self, response):
-        """
-        Checks if the response received from the Supernova indicates successful execution of the GPIO method.
-
-        Args:
-        response (dict): A dictionary containing response data from the Supernova GPIO request.
-
-        Returns:
-        bool: True if the response indicates successful, False otherwise.
-        """
-        return all([
-            response["usb_error"] == "CMD_SUCCESSFUL",
-            response["manager_error"] == "GPIO_NO_ERROR",
-            response["driver_error"] == "GPIO_DRIVER_NO_ERROR"
-        ])
-
+    @serialized
     def configure_pin(self, pin_number: GpioPinNumber, functionality: GpioFunctionality):
         """
         Configures a GPIO pin with the specified functionality.
@@ -152,7 +147,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == "CONFIGURE GPIO PIN" and self.__check_if_response_is_successful(responses[0])
+        response_success = VALIDATORS[GPIO_CONFIGURE_PIN].is_success(responses[0])
 
         if not response_success:
             return (False, "Configuration failed, error from the Supernova")
@@ -182,7 +177,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == "GPIO DIGITAL WRITE" and self.__check_if_response_is_successful(responses[0])
+        response_success = VALIDATORS[GPIO_DIGITAL_WRITE].is_success(responses[0])
 
         if not response_success:
             return (False, "Digital write failed, error from the Supernova")
@@ -209,7 +204,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == "GPIO DIGITAL READ" and self.__check_if_response_is_successful(responses[0])
+        response_success = VALIDATORS[GPIO_DIGITAL_READ].is_success(responses[0])
 
         if not response_success:
             return (False, "Digital read failed, error from the Supernova")
@@ -240,7 +235,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == "GPIO SET INTERRUPT" and self.__check_if_response_is_successful(responses[0])
+        response_success = VALIDATORS[GPIO_SET_INTERRUPT].is_success(responses[0])
 
         if not response_success:
             return (False, "Set interrupt failed, error from the Supernova")
@@ -267,7 +262,7 @@ class SupernovaGPIOInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_success = responses[0]["name"] == "GPIO DISABLE INTERRUPT" and self.__check_if_response_is_successful(responses[0])
+        response_success = VALIDATORS[GPIO_DISABLE_INTERRUPT].is_success(responses[0])
 
         if not response_success:
             return (False, "Disable interrupt failed, error from the Supernova")
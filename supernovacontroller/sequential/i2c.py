@@ -1,10 +1,33 @@
+import threading
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import I2cPullUpResistorsValue
+from BinhoSupernova.commands.definitions import (
+    I2C_SET_PARAMETERS, I2C_WRITE, I2C_WRITE_NO_STOP, I2C_READ, I2C_READ_FROM, I2C_SET_PULL_UP_RESISTORS,
+    SET_I2C_SPI_UART_BUS_VOLTAGE, USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE,
+)
 from supernovacontroller.errors import BackendError
 from supernovacontroller.errors import BusVoltageError
+from .controller import DEFAULT_PIPELINE_WINDOW
+from .locking import serialized
+from .register_cache import RegisterCache, cached_registers
+from .retry import no_retries, submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
+
+# Limits of a single I2C transfer of the Supernova
+I2C_MAX_TRANSFER_LENGTH = 1024
+I2C_MAX_REGISTER_LENGTH = 4
+
+# 7-bit addresses not reserved by the I2C specification
+I2C_SCAN_ADDRESSES = range(0x08, 0x78)
+# Probes of a scan in flight at the same time, enough for all the addresses
+I2C_SCAN_WINDOW = len(I2C_SCAN_ADDRESSES)
 
 
+@submits_for("i2c")
+@timeout_argument
 class SupernovaI2CBlockingInterface:
     """
     The SupernovaI2CBlockingInterface class provides methods to interact with I2C devices.
@@ -20,6 +43,18 @@ class SupernovaI2CBlockingInterface:
     - read_from(target_static_address, register_address, length):
         Reads data from the specified I2C target device, indicating the address of the internal register from which the data is read.
 
+    - read_registers(target_static_address, registers) and write_registers(target_static_address, registers):
+        Read or write many registers of the same I2C target at once, keeping several transfers in flight.
+
+    - read_large(target_static_address, register_address, length) and write_large(target_static_address, register_address, data):
+        Read or write more data than fits in one transfer, splitting it in chunks at consecutive register addresses.
+
+    - scan(addresses, probe):
+        Finds the I2C targets responding on the bus, probing all the addresses back to back.
+
+    - update_bits(target_static_address, register_address, mask, value):
+        Changes some bits of a register. With enable_register_cache(), registers already read or written aren't read again.
+
     Clarification on I2C Interface:
 
     The signature of the I2C interface methods (i.e., write, read, and read_from) is as follows:
@@ -64,10 +99,15 @@ class SupernovaI2CBlockingInterface:
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
         self.driver = driver
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
 
         self.bus_voltage = None
         self.clock_frequency_hz = 1000000
+        # Shadow of the registers of the targets, see enable_register_cache()
+        self.register_cache = None
 
+    @serialized
     def set_parameters(self, clock_frequency_hz: int = 1000000):
         """
         Sets the I2C clock frequency to a specified value. The operation's success or failure
@@ -100,7 +140,7 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "I2C SET PARAMETERS" and responses[0]["completed"] == 0
+        response_ok = VALIDATORS[I2C_SET_PARAMETERS].is_success(responses[0])
         if response_ok:
             result = (True, clock_frequency_hz)
         else:
@@ -108,6 +148,7 @@ class SupernovaI2CBlockingInterface:
 
         return result
 
+    @serialized
     def get_parameters(self):
         """
         Retrieves the current I2C clock frequency setting from the interface.
@@ -128,6 +169,7 @@ class SupernovaI2CBlockingInterface:
         """
         return (True, self.clock_frequency_hz)
 
+    @serialized
     def set_bus_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the I2C interface to a specified value.
@@ -161,7 +203,7 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+        response_ok = VALIDATORS[SET_I2C_SPI_UART_BUS_VOLTAGE].is_success(responses[0])
         if response_ok:
             result = (True, voltage_mv)
             self.bus_voltage = voltage_mv
@@ -171,6 +213,7 @@ class SupernovaI2CBlockingInterface:
 
         return result
 
+    @serialized
     def use_external_i2c_power_source(self):
         """
         Sets the bus to utilize the external power source voltage 
@@ -190,20 +233,14 @@ class SupernovaI2CBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "DAC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
 
         return (True, response["external_voltage_mV"])
 
+    @serialized
     def init_bus(self, voltage: int=None):
         """
         Initializes the bus with a specified voltage, or uses the existing bus voltage if none is provided.
@@ -257,13 +294,7 @@ class SupernovaI2CBlockingInterface:
         "10000" : I2cPullUpResistorsValue.I2C_PULLUP_10kOhm,
     }
 
-    def __get_set_pullup_response_errors(self, response):
-        result = []
-        if response["usb_error"] != "CMD_SUCCESSFUL": result.append(response["usb_error"])
-        if response["manager_error"] != "I2C_NO_ERROR": result.append(response["manager_error"])
-        if response["driver_error"] != "POTENTIOMETER_SET_VALUE_NO_ERROR": result.append(response["driver_error"])
-        return result
-
+    @serialized
     def set_pull_up_resistors(self, resistor_value_in_ohm: int):
         """
         Configures the Supernova's I2C Pull-Up Resistor values for SDA and SCL signals  
@@ -302,13 +333,45 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        errors = self.__get_set_pullup_response_errors(responses[0])
-        success = responses[0]["name"].strip() == "I2C SET PULL UP RESISTORS" and len(errors) == 0
-        if not success:
-           return (False, errors)
+        validator = VALIDATORS[I2C_SET_PULL_UP_RESISTORS]
+        if not validator.is_success(responses[0]):
+           return (False, validator.errors(responses[0]))
 
         return (True, resistor_value_in_ohm)
 
+    @serialized
+    def enable_register_cache(self):
+        """
+        Starts keeping a write-through shadow of the registers of the targets.
+
+        Once enabled, the values written with write(), write_non_stop(), write_registers() and write_large() and
+        the ones read with read_from(), read_registers() and read_large() are kept, and read_from() answers from
+        the cache when all the bytes read are known, without a transfer. Registers the targets change on their
+        own must be excluded with the exclude() method of the cache.
+
+        Returns:
+        RegisterCache: The cache, kept if it was already enabled.
+        """
+        if self.register_cache is None:
+            self.register_cache = RegisterCache()
+
+        return self.register_cache
+
+    @serialized
+    def disable_register_cache(self):
+        """
+        Stops keeping the shadow of the registers, and drops it.
+        """
+        self.register_cache = None
+
+    def __cache_write(self, address, register, data, success):
+        if self.register_cache is not None:
+            if success:
+                self.register_cache.store(address, register, data)
+            else:
+                # The target may have received part of the data
+                self.register_cache.invalidate(address, register, len(data))
+
     def write(self, address, register, data):
         """
         Performs a write operation to a specified register on an I2C device.
@@ -344,7 +407,8 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "I2C WRITE" and responses[0]["status"] == "NO_TRANSFER_ERROR"
+        response_ok = VALIDATORS[I2C_WRITE].is_success(responses[0])
+        self.__cache_write(address, register, data, response_ok)
         if response_ok:
             result = (True, None)
         else:
@@ -387,7 +451,8 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "I2C WRITE WITHOUT STOP" and responses[0]["status"] == "NO_TRANSFER_ERROR"
+        response_ok = VALIDATORS[I2C_WRITE_NO_STOP].is_success(responses[0])
+        self.__cache_write(address, register, data, response_ok)
         
         if response_ok:
             result = (True, None)
@@ -430,7 +495,7 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "I2C READ" and responses[0]["status"] == "NO_TRANSFER_ERROR"
+        response_ok = VALIDATORS[I2C_READ].is_success(responses[0])
         if response_ok:
             result = (True, responses[0]["data"])
         else:
@@ -465,7 +530,12 @@ class SupernovaI2CBlockingInterface:
           as the correct voltage is essential for proper I2C communication.
         - The method does not perform any validation on the input parameters (address, register, length). Users
           should ensure these parameters are correct and within the acceptable range for the intended device.
+        - With enable_register_cache(), registers whose value is known are not read again.
         """
+        data = cached_registers(self, address, register, length)
+        if data is not None:
+            return (True, data)
+
         try:
             responses = self.controller.sync_submit([
                 lambda transfer_id: self.driver.i2cReadFrom(transfer_id, address, register, length),
@@ -473,10 +543,339 @@ class SupernovaI2CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "I2C READ FROM" and responses[0]["status"] == "NO_TRANSFER_ERROR"
+        response_ok = VALIDATORS[I2C_READ_FROM].is_success(responses[0])
         if response_ok:
+            if self.register_cache is not None:
+                self.register_cache.store(address, register, responses[0]["data"])
             result = (True, responses[0]["data"])
         else:
             result = (False, responses[0]["status"])
 
         return result
+
+    def read_registers(self, address, registers, window=DEFAULT_PIPELINE_WINDOW):
+        """
+        Reads several registers of an I2C device, sending the reads back to back instead of waiting for the
+        response of each read before sending the next one.
+
+        Args:
+        address (int): The I2C address of the device to read from.
+        registers (list): (register, length) tuples, with the register address as an int (one byte) or a list
+                          of bytes, as in read_from(), and the number of bytes to read from it.
+        window (int, optional): Maximum number of reads waiting for a response at any time.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean, True if every read succeeded.
+            - The second element is a dictionary with the result of every read, keyed by register address (an
+              int, or a tuple of bytes when given as a list). Each result is the tuple read_from() returns: (True,
+              data) or (False, status).
+
+        Note:
+        - All the reads are sent even if some of them fail.
+        - A register listed more than once is read every time, its last result is kept.
+        """
+        registers = list(registers)
+        if not registers:
+            return (True, {})
+
+        try:
+            responses = self.controller.pipelined_submit([
+                lambda transfer_id, register=register, length=length: self.driver.i2cReadFrom(
+                    transfer_id, address, self.__register_bytes(register), length)
+                for (register, length) in registers
+            ], window)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        validator = VALIDATORS[I2C_READ_FROM]
+        results = {}
+        for ((register, _), response) in zip(registers, responses):
+            if validator.is_success(response):
+                if self.register_cache is not None:
+                    self.register_cache.store(address, register, response["data"])
+                results[self.__register_key(register)] = (True, response["data"])
+            else:
+                results[self.__register_key(register)] = (False, response["status"])
+
+        return (all(success for (success, _) in results.values()), results)
+
+    def write_registers(self, address, registers, window=DEFAULT_PIPELINE_WINDOW):
+        """
+        Writes several registers of an I2C device, sending the writes back to back instead of waiting for the
+        response of each write before sending the next one. The writes are sent in the order they are listed.
+
+        Args:
+        address (int): The I2C address of the device to write to.
+        registers (list): (register, data) tuples, with the register address as an int (one byte) or a list of
+                          bytes, as in write(), and the data to write to it.
+        window (int, optional): Maximum number of writes waiting for a response at any time.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean, True if every write succeeded.
+            - The second element is a dictionary with the result of every write, keyed by register address (an
+              int, or a tuple of bytes when given as a list). Each result is the tuple write() returns: (True,
+              None) or (False, status).
+
+        Note:
+        - All the writes are sent even if some of them fail.
+        """
+        registers = list(registers)
+        if not registers:
+            return (True, {})
+
+        try:
+            responses = self.controller.pipelined_submit([
+                lambda transfer_id, register=register, data=data: self.driver.i2cWrite(
+                    transfer_id, address, self.__register_bytes(register), data)
+                for (register, data) in registers
+            ], window)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        validator = VALIDATORS[I2C_WRITE]
+        results = {}
+        for ((register, data), response) in zip(registers, responses):
+            success = validator.is_success(response)
+            self.__cache_write(address, register, list(data), success)
+            if success:
+                results[self.__register_key(register)] = (True, None)
+            else:
+                results[self.__register_key(register)] = (False, response["status"])
+
+        return (all(success for (success, _) in results.values()), results)
+
+    def read_large(self, address, register, length, chunk_size=I2C_MAX_TRANSFER_LENGTH, window=DEFAULT_PIPELINE_WINDOW):
+        """
+        Reads any amount of data from an I2C device, in chunks of up to 'chunk_size' bytes sent back to back.
+
+        Each chunk is read from the register address following the last byte of the previous chunk, as the
+        targets auto-incrementing their register address (e.g. EEPROMs) expect. Without register address, the
+        chunks are plain reads, continuing where the previous one stopped.
+
+        Args:
+        address (int): The I2C address of the device to read from.
+        register (list): The register address of the first byte, as in read_from(). Up to 4 bytes, big endian.
+        length (int): The number of bytes to read.
+        chunk_size (int, optional): The number of bytes read by each transfer, up to 1024.
+        window (int, optional): Maximum number of chunks waiting for a response at any time.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the read.
+            - The second element is the data read, as bytes, if the operation is successful, or the status of
+              the first chunk that failed.
+
+        Raises:
+        ValueError: If the chunk size is out of range, or the data goes past the last register address.
+        """
+        chunks = self.__chunks(register, length, chunk_size)
+        if not chunks:
+            return (True, b"")
+
+        if register:
+            sequence = [
+                lambda transfer_id, chunk_register=chunk_register, size=size: self.driver.i2cReadFrom(
+                    transfer_id, address, chunk_register, size)
+                for (chunk_register, _, size) in chunks
+            ]
+        else:
+            sequence = [
+                lambda transfer_id, size=size: self.driver.i2cRead(transfer_id, address, size)
+                for (_, _, size) in chunks
+            ]
+
+        try:
+            responses = self.controller.pipelined_submit(sequence, window)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        validator = VALIDATORS[I2C_READ_FROM if register else I2C_READ]
+        data = bytearray()
+        for ((chunk_register, _, _), response) in zip(chunks, responses):
+            if not validator.is_success(response):
+                return (False, response["status"])
+            if self.register_cache is not None and register:
+                self.register_cache.store(address, chunk_register, response["data"])
+            data.extend(response["data"])
+
+        return (True, bytes(data))
+
+    def write_large(self, address, register, data, chunk_size=I2C_MAX_TRANSFER_LENGTH, window=DEFAULT_PIPELINE_WINDOW):
+        """
+        Writes any amount of data to an I2C device, in chunks of up to 'chunk_size' bytes sent back to back.
+
+        Each chunk is written to the register address following the last byte of the previous chunk.
+
+        Args:
+        address (int): The I2C address of the device to write to.
+        register (list): The register address of the first byte, as in write(). From 1 to 4 bytes, big endian.
+        data (bytes): The data to write, as bytes or a list of bytes.
+        chunk_size (int, optional): The number of bytes written by each transfer, up to 1024.
+        window (int, optional): Maximum number of chunks waiting for a response at any time.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the write.
+            - The second element is None if the operation is successful, or the status of the first chunk that
+              failed.
+
+        Raises:
+        ValueError: If there is no register address, the chunk size is out of range, or the data goes past the
+                    last register address.
+
+        Note:
+        - All the chunks are sent even if one of them fails.
+        - Targets writing to memory in pages, like EEPROMs, need chunks that don't cross a page and time to
+          complete each write, which this method doesn't wait for. Use I2CEeprom for them.
+        """
+        if not register:
+            raise ValueError("write_large needs a register address to write each chunk to")
+
+        data = list(data)
+        chunks = self.__chunks(register, len(data), chunk_size)
+        if not chunks:
+            return (True, None)
+
+        try:
+            responses = self.controller.pipelined_submit([
+                lambda transfer_id, chunk_register=chunk_register, offset=offset, size=size: self.driver.i2cWrite(
+                    transfer_id, address, chunk_register, data[offset:offset + size])
+                for (chunk_register, offset, size) in chunks
+            ], window)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        validator = VALIDATORS[I2C_WRITE]
+        status = None
+        for ((chunk_register, offset, size), response) in zip(chunks, responses):
+            success = validator.is_success(response)
+            self.__cache_write(address, chunk_register, data[offset:offset + size], success)
+            if not success and status is None:
+                status = response["status"]
+
+        if status is not None:
+            return (False, status)
+
+        return (True, None)
+
+    def update_bits(self, address, register, mask, value, force=False):
+        """
+        Changes the bits of a register selected by a mask, reading the register and writing it back.
+
+        With enable_register_cache(), a register whose value is known is not read, and a register already
+        holding the new value is not written.
+
+        Args:
+        address (int): The I2C address of the device.
+        register (list): The register address, as in read_from().
+        mask (int): The bits to change, a byte.
+        value (int): The new value of the bits in the mask. The other bits are ignored.
+        force (bool, optional): Whether to write the register even if its value doesn't change.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the new value of the register, or the status of the transfer that failed.
+        """
+        (success, data) = self.read_from(address, register, 1)
+        if not success:
+            return (False, data)
+
+        new_value = (data[0] & ~mask & 0xFF) | (value & mask)
+        if new_value != data[0] or force:
+            (success, status) = self.write(address, register, [new_value])
+            if not success:
+                return (False, status)
+
+        return (True, new_value)
+
+    def scan(self, addresses=I2C_SCAN_ADDRESSES, probe="read", window=I2C_SCAN_WINDOW):
+        """
+        Finds the I2C targets acknowledging their address, sending the probes of all the addresses back to back
+        instead of waiting for the response of each probe before sending the next one.
+
+        Args:
+        addresses (iterable, optional): The 7-bit addresses to probe. All the addresses not reserved by the I2C
+                                        specification (0x08 to 0x77) by default.
+        probe (str, optional): How each address is probed:
+            - "read": reads 1 byte. Safe for most targets, the read only moves their internal address pointer.
+            - "write0": writes no data. Some targets don't accept reads, but a write without data may be taken
+              as the start of a command by others.
+        window (int, optional): Maximum number of probes waiting for a response at any time. By default all
+                                the probes of a scan of the whole address range are in flight at once.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the scan.
+            - The second element is the list of the responding addresses, in the order they were given, or the
+              status of the first probe that failed for another reason than a NACK of the address.
+
+        Raises:
+        ValueError: If the probe is unknown.
+        """
+        if probe == "read":
+            request = lambda transfer_id, address: self.driver.i2cRead(transfer_id, address, 1)
+            validator = VALIDATORS[I2C_READ]
+        elif probe == "write0":
+            request = lambda transfer_id, address: self.driver.i2cWrite(transfer_id, address, [], [])
+            validator = VALIDATORS[I2C_WRITE]
+        else:
+            raise ValueError(f"Unknown probe {probe!r}, expected 'read' or 'write0'")
+
+        addresses = list(addresses)
+        if not addresses:
+            return (True, [])
+
+        try:
+            # A missing target is what the probes look for, not a transient error
+            with no_retries():
+                responses = self.controller.pipelined_submit([
+                    lambda transfer_id, address=address: request(transfer_id, address) for address in addresses
+                ], window)
+        except Exception as e:
+            raise BackendError(original_exception=e) from e
+
+        found = []
+        for (address, response) in zip(addresses, responses):
+            if validator.is_success(response):
+                found.append(address)
+            elif response["status"] != "I2C_NACK_ADDRESS":
+                return (False, response["status"])
+
+        return (True, found)
+
+    @staticmethod
+    def __chunks(register, length, chunk_size):
+        """
+        Splits a transfer of 'length' bytes starting at 'register' in chunks.
+
+        Returns:
+        list: (register, offset, size) tuples, one per chunk, with the register address of the chunk as a list of
+              bytes as wide as the given one (empty if the given one is), and the offset of the chunk in the data.
+        """
+        if not 0 < chunk_size <= I2C_MAX_TRANSFER_LENGTH:
+            raise ValueError(f"The chunk size must be between 1 and {I2C_MAX_TRANSFER_LENGTH} bytes")
+
+        register = list(register)
+        if len(register) > I2C_MAX_REGISTER_LENGTH:
+            raise ValueError(f"The register address can't be longer than {I2C_MAX_REGISTER_LENGTH} bytes")
+
+        width = len(register)
+        start = int.from_bytes(bytes(register), "big")
+        if width and start + length > 1 << (8 * width):
+            raise ValueError(f"{length} bytes from register {register} go past the last register address")
+
+        return [
+            (list((start + offset).to_bytes(width, "big")) if width else [], offset, min(chunk_size, length - offset))
+            for offset in range(0, length, chunk_size)
+        ]
+
+    @staticmethod
+    def __register_bytes(register):
+        return [register] if isinstance(register, int) else list(register)
+
+    @staticmethod
+    def __register_key(register):
+        return register if isinstance(register, int) else tuple(register)
@@ -0,0 +1,214 @@
+import time
+
+from .i2c import I2C_MAX_TRANSFER_LENGTH, SupernovaI2CBlockingInterface
+from .retry import no_retries
+
+# Size, page size and memory address width of common 24xx EEPROMs, in bytes. Page sizes vary between vendors,
+# the smallest one is listed: writing in smaller pages is always safe, only slower.
+EEPROM_24XX_PARTS = {
+    "24C01": (128, 8, 1),
+    "24C02": (256, 8, 1),
+    "24C04": (512, 16, 1),
+    "24C08": (1024, 16, 1),
+    "24C16": (2048, 16, 1),
+    "24C32": (4096, 32, 2),
+    "24C64": (8192, 32, 2),
+    "24C128": (16384, 64, 2),
+    "24C256": (32768, 64, 2),
+    "24C512": (65536, 128, 2),
+    "24C1024": (131072, 128, 2),
+}
+
+# Longest write cycle of the 24xx EEPROMs in their datasheets is 10 ms, leave some margin
+DEFAULT_WRITE_CYCLE_TIMEOUT = 0.05
+
+class I2CEeprom:
+    """
+    Reads and programs a 24xx I2C EEPROM through a SupernovaI2CBlockingInterface.
+
+    Writes are split on page boundaries, as an EEPROM write can't cross a page. After each page the EEPROM is
+    busy writing it and doesn't acknowledge its address: instead of sleeping for the longest write cycle, the
+    EEPROM is polled with 1 byte reads until it acknowledges (ACK polling), so every page takes the time it
+    really needs. Reads, including the verification of writes, use i2c.read_large() and keep several
+    transfers in flight.
+
+    EEPROMs with more memory than their address bytes can reach (e.g. 24C16 or 24C1024) select the block with
+    the lower bits of the I2C address, which is handled here: 'address' is the address of the first block.
+
+    Usage:
+        eeprom = I2CEeprom.for_part(i2c, "24C256", address=0x50)
+        (success, status) = eeprom.write(0x0000, firmware)
+        (success, data) = eeprom.read(0x0000, len(firmware))
+    """
+
+    def __init__(self, i2c: SupernovaI2CBlockingInterface, address, size, page_size, address_width=2,
+                 write_cycle_timeout=DEFAULT_WRITE_CYCLE_TIMEOUT, poll_interval=0.0):
+        """
+        Args:
+        i2c (SupernovaI2CBlockingInterface): The I2C interface the EEPROM is connected to.
+        address (int): The I2C address of the EEPROM, or of its first block.
+        size (int): The size of the memory, in bytes.
+        page_size (int): The size of a write page, in bytes.
+        address_width (int, optional): The number of bytes of a memory address, 1 or 2.
+        write_cycle_timeout (float, optional): Maximum time a page write may take, in seconds.
+        poll_interval (float, optional): Time to wait between two polls of a busy EEPROM, in seconds. By default
+                                         the EEPROM is polled back to back.
+        """
+        if page_size > I2C_MAX_TRANSFER_LENGTH:
+            raise ValueError(f"Pages longer than {I2C_MAX_TRANSFER_LENGTH} bytes can't be written in one transfer")
+
+        self.i2c = i2c
+        self.address = address
+        self.size = size
+        self.page_size = page_size
+        self.address_width = address_width
+        self.write_cycle_timeout = write_cycle_timeout
+        self.poll_interval = poll_interval
+        # Bytes reached by the memory address sent on the bus, the rest is selected by the I2C address
+        self.block_size = 1 << (8 * address_width)
+
+    @classmethod
+    def for_part(cls, i2c: SupernovaI2CBlockingInterface, part, address=0x50, **kwargs):
+        """
+        Creates the helper of a common 24xx EEPROM.
+
+        Args:
+        i2c (SupernovaI2CBlockingInterface): The I2C interface the EEPROM is connected to.
+        part (str): The part number without vendor prefix and suffixes, as listed in EEPROM_24XX_PARTS, e.g.
+                    "24C256" for a 24LC256 or an AT24C256.
+        address (int, optional): The I2C address of the EEPROM, or of its first block.
+        **kwargs: Other arguments of the constructor.
+        """
+        (size, page_size, address_width) = EEPROM_24XX_PARTS[part]
+
+        return cls(i2c, address, size, page_size, address_width, **kwargs)
+
+    def __locate(self, offset):
+        """
+        Returns:
+        tuple: The I2C address of the block holding 'offset' and the memory address within it, as a list of bytes.
+        """
+        (block, address) = divmod(offset, self.block_size)
+        return (self.address | block, list(address.to_bytes(self.address_width, "big")))
+
+    def __check_range(self, offset, length):
+        if offset < 0 or length < 0 or offset + length > self.size:
+            raise ValueError(f"{length} bytes at {offset:#x} don't fit in a {self.size} bytes EEPROM")
+
+    def read(self, offset, length):
+        """
+        Reads data from the EEPROM.
+
+        Args:
+        offset (int): The memory address of the first byte.
+        length (int): The number of bytes to read.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the read.
+            - The second element is the data read, as bytes, or the status of the transfer that failed.
+
+        Raises:
+        ValueError: If the data doesn't fit in the EEPROM.
+        """
+        self.__check_range(offset, length)
+
+        data = bytearray()
+        end = offset + length
+        while offset < end:
+            # Reads can't go past the block reached with one I2C address
+            size = min(end, (offset // self.block_size + 1) * self.block_size) - offset
+            (address, register) = self.__locate(offset)
+            (success, result) = self.i2c.read_large(address, register, size)
+            if not success:
+                return (False, result)
+
+            data.extend(result)
+            offset += size
+
+        return (True, bytes(data))
+
+    def wait_ready(self, address=None, timeout=None):
+        """
+        Waits for the EEPROM to complete its write cycle, polling it until it acknowledges its address.
+
+        Args:
+        address (int, optional): The I2C address to poll, the one of the first block by default.
+        timeout (float, optional): Maximum time to wait, in seconds. 'write_cycle_timeout' by default.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean, True if the EEPROM is ready.
+            - The second element is the number of polls the EEPROM didn't acknowledge, or an error message if
+              the EEPROM never became ready or the poll failed for another reason.
+        """
+        address = self.address if address is None else address
+        deadline = time.monotonic() + (self.write_cycle_timeout if timeout is None else timeout)
+
+        busy_polls = 0
+        while True:
+            # Polled here, a retry policy retrying the NACKs of the busy EEPROM would only delay the next poll
+            with no_retries():
+                (success, status) = self.i2c.read(address, 1)
+            if success:
+                return (True, busy_polls)
+            if status != "I2C_NACK_ADDRESS":
+                return (False, status)
+
+            busy_polls += 1
+            if time.monotonic() >= deadline:
+                return (False, "Write cycle not completed in time")
+            if self.poll_interval:
+                time.sleep(self.poll_interval)
+
+    def write(self, offset, data, verify=True):
+        """
+        Writes data to the EEPROM, one page at a time, waiting for the write cycle of each page with ACK polling.
+
+        Args:
+        offset (int): The memory address of the first byte.
+        data (bytes): The data to write, as bytes or a list of bytes.
+        verify (bool, optional): Whether to read the data back and compare it once written.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the write.
+            - The second element is None if the operation is successful, or the status of the transfer that
+              failed, or an error message if a write cycle didn't complete or the data read back differs.
+
+        Raises:
+        ValueError: If the data doesn't fit in the EEPROM.
+
+        Note:
+        - Pages written before a failure keep their new data.
+        """
+        data = list(data)
+        self.__check_range(offset, len(data))
+
+        position = 0
+        while position < len(data):
+            start = offset + position
+            # Up to the end of the page, which never crosses a block
+            size = min(len(data) - position, self.page_size - start % self.page_size)
+            (address, register) = self.__locate(start)
+
+            (success, status) = self.i2c.write(address, register, data[position:position + size])
+            if not success:
+                return (False, status)
+
+            (ready, result) = self.wait_ready(address)
+            if not ready:
+                return (False, result)
+
+            position += size
+
+        if verify and data:
+            (success, result) = self.read(offset, len(data))
+            if not success:
+                return (False, result)
+
+            if result != bytes(data):
+                mismatch = next(index for (index, (written, read)) in enumerate(zip(data, result)) if written != read)
+                return (False, f"Verification failed at {offset + mismatch:#x}")
+
+        return (True, None)
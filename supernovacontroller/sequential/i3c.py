@@ -1,3 +1,5 @@
+import threading
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import TransferMode
@@ -8,10 +10,21 @@ from BinhoSupernova.commands.definitions import I3cClearFeatureSelector
 from BinhoSupernova.commands.definitions import I3cPushPullTransferRate
 from BinhoSupernova.commands.definitions import I3cOpenDrainTransferRate
 from BinhoSupernova.commands.definitions import I3cChangeDynAddrError
+from BinhoSupernova.commands.definitions import (
+    I3C_INIT_BUS, I3C_TRANSFER, I3C_TRIGGER_TARGET_RESET_PATTERN, I3C_TRIGGER_EXIT_PATTERN,
+    SET_I3C_BUS_VOLTAGE, USE_EXT_SRC_I3C_BUS_VOLTAGE, GET_I3C_CONNECTORS_STATUS,
+)
 from supernovacontroller.errors import BusVoltageError
 from supernovacontroller.errors import BackendError
+from .locking import serialized
+from .register_cache import RegisterCache, cached_registers, invalidates_register_cache
+from .retry import submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
 
 
+@submits_for("i3c.controller")
+@timeout_argument
 class SupernovaI3CBlockingInterface:
     # TODO: Replicate definitions (TransferMode, I3cCommandType, TransferDirection)
 
@@ -24,24 +37,18 @@ class SupernovaI3CBlockingInterface:
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
         self.driver = driver
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
 
         self.push_pull_clock_freq_mhz = I3cPushPullTransferRate.PUSH_PULL_3_75_MHZ
         self.open_drain_clock_freq_mhz = I3cOpenDrainTransferRate.OPEN_DRAIN_100_KHZ
         self.bus_voltage = None
+        # Shadow of the registers of the targets, see enable_register_cache()
+        self.register_cache = None
 
         self.controller_init()
     
-    @staticmethod
-    def __get_error_from_response(response : dict):
-        errors = []
-        if response["usb_result"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_result"]) 
-        if response["manager_result"] != "I3C_CONTROLLER_MGR_NO_ERROR":
-            errors.append(response["manager_result"]) 
-        if "NO_TRANSFER_ERROR" not in response["driver_result"]:
-            errors.extend(response["driver_result"]) 
-        return errors
-
+    @serialized
     def set_parameters(self, push_pull_clock_freq_mhz: I3cPushPullTransferRate, open_drain_clock_freq_mhz: I3cOpenDrainTransferRate):
         """
         Sets the clock frequencies for push-pull and open-drain configurations using enumerated values.
@@ -65,6 +72,7 @@ class SupernovaI3CBlockingInterface:
 
         return (True, (self.push_pull_clock_freq_mhz, self.open_drain_clock_freq_mhz))
 
+    @serialized
     def get_parameters(self):
         """
         Retrieves the current clock frequencies for push-pull and open-drain configurations.
@@ -78,6 +86,7 @@ class SupernovaI3CBlockingInterface:
         """
         return (True, (self.push_pull_clock_freq_mhz, self.open_drain_clock_freq_mhz))
 
+    @serialized
     def set_bus_voltage(self, voltage: int):
         """
         Sets the bus voltage to a specified value.
@@ -103,7 +112,7 @@ class SupernovaI3CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "SET I3C BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+        response_ok = VALIDATORS[SET_I3C_BUS_VOLTAGE].is_success(responses[0])
         if response_ok:
             result = (True, voltage)
             # We want to set the bus_voltage when we know the operation was successful
@@ -134,6 +143,8 @@ class SupernovaI3CBlockingInterface:
 
         return (status == "I3C_CONTROLLER_INIT_SUCCESS", status)
 
+    @serialized
+    @invalidates_register_cache
     def init_bus(self, voltage: int=None, targets=None):
         """
         Initialize the bus with a given voltage (in mV) and target devices.
@@ -185,14 +196,14 @@ class SupernovaI3CBlockingInterface:
 
         # TODO: Toggle IBIs off
 
-        status = responses[0]["result"]
-        if status == "DAA_SUCCESS" and "NO_TRANSFER_ERROR" in responses[0]["errors"]:
+        if VALIDATORS[I3C_INIT_BUS].accepts(responses[0]):
             result = (True, voltage)
         else:
             result = (False, {"errors": responses[0]["result"]})
 
         return result
 
+    @serialized
     def use_external_i3c_power_source(self):
         """
         Sets the bus to utilize the external power source voltage 
@@ -218,14 +229,7 @@ class SupernovaI3CBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "DAC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[USE_EXT_SRC_I3C_BUS_VOLTAGE].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
@@ -236,6 +240,8 @@ class SupernovaI3CBlockingInterface:
             "external_low_voltage_mV": response["external_low_voltage_mV"],
         })
 
+    @serialized
+    @invalidates_register_cache
     def reset_bus(self):
         """
         Resets the I3C bus to its default state.
@@ -291,13 +297,7 @@ class SupernovaI3CBlockingInterface:
             raise BackendError(original_exception=e) from e
         
         response = responses[0]
-        errors = []
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"]) 
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"]) 
-        if response["driver_error"] != "DRIVER_NO_ERROR":
-            errors.append(response["driver_error"]) 
+        errors = VALIDATORS[GET_I3C_CONNECTORS_STATUS].errors(response)
         
         if len(errors) > 0:
             return (False, errors)
@@ -433,6 +433,7 @@ class SupernovaI3CBlockingInterface:
 
         return result
 
+    @invalidates_register_cache
     def target_update_address(self, current_address, new_address):
         """
         Updates the dynamic address of a target device on the I3C bus.
@@ -469,6 +470,7 @@ class SupernovaI3CBlockingInterface:
 
         return result
 
+    @invalidates_register_cache
     def trigger_target_reset_pattern(self):
         """
         Triggers the target reset pattern on the I3C bus.
@@ -489,7 +491,7 @@ class SupernovaI3CBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = self.__get_error_from_response(response)
+        errors = VALIDATORS[I3C_TRIGGER_TARGET_RESET_PATTERN].errors(response)
 
         if len(errors) == 0: # manager, usb and driver are without error
             result = (True, None)
@@ -516,13 +518,39 @@ class SupernovaI3CBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = self.__get_error_from_response(response)
+        errors = VALIDATORS[I3C_TRIGGER_EXIT_PATTERN].errors(response)
 
         if len(errors) != 0: # manager, usb and/or driver have error
             return (False, errors)
 
         return (True, None)
 
+    @serialized
+    def enable_register_cache(self):
+        """
+        Starts keeping a write-through shadow of the registers of the targets, keyed by dynamic address and
+        subaddress.
+
+        Once enabled, the values written with write() and read with read() are kept, and read() answers from the
+        cache when all the bytes read are known, without a transfer. Registers the targets change on their own
+        must be excluded with the exclude() method of the cache. The cache is dropped by the operations that may
+        reset the targets or change their dynamic addresses, like init_bus() or ccc_rstdaa().
+
+        Returns:
+        RegisterCache: The cache, kept if it was already enabled.
+        """
+        if self.register_cache is None:
+            self.register_cache = RegisterCache()
+
+        return self.register_cache
+
+    @serialized
+    def disable_register_cache(self):
+        """
+        Stops keeping the shadow of the registers, and drops it.
+        """
+        self.register_cache = None
+
     def _process_response(self, command_name, responses, extra_data=None):
         def format_successful_response_payload(command_name, response):
             if command_name == "write":
@@ -588,7 +616,7 @@ class SupernovaI3CBlockingInterface:
             return response["descriptor"]["errors"][0]
 
         response = responses[0]
-        success = response["header"]["result"] == "I3C_TRANSFER_SUCCESS" or response["header"]["result"] == "DAA_SUCCESS"
+        success = VALIDATORS[I3C_TRANSFER].accepts(response)
 
         if success:
             data = format_successful_response_payload(command_name, response)
@@ -636,7 +664,16 @@ class SupernovaI3CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("write", responses)
+        result = self._process_response("write", responses)
+
+        if self.register_cache is not None:
+            if result[0]:
+                self.register_cache.store(target_address, subaddress, buffer)
+            else:
+                # The target may have received part of the data
+                self.register_cache.invalidate(target_address, subaddress, len(buffer))
+
+        return result
 
     def read(self, target_address, mode: TransferMode, subaddress: [], length):
         """
@@ -658,7 +695,14 @@ class SupernovaI3CBlockingInterface:
             - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
             - The second element is either a dictionary containing the read data and its length, indicating
                 success, or an error message detailing the failure.
+
+        Note:
+        - With enable_register_cache(), registers whose value is known are not read again.
         """
+        data = cached_registers(self, target_address, subaddress, length)
+        if data is not None:
+            return (True, data)
+
         try:
             responses = self.controller.sync_submit([
                 lambda id: self.driver.i3cRead(
@@ -674,7 +718,44 @@ class SupernovaI3CBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        return self._process_response("read", responses)
+        result = self._process_response("read", responses)
+
+        if self.register_cache is not None and result[0]:
+            self.register_cache.store(target_address, subaddress, result[1])
+
+        return result
+
+    def update_bits(self, target_address, subaddress: [], mask, value, mode: TransferMode = TransferMode.I3C_SDR, force=False):
+        """
+        Changes the bits of a register of a target selected by a mask, reading the register and writing it back.
+
+        With enable_register_cache(), a register whose value is known is not read, and a register already
+        holding the new value is not written.
+
+        Args:
+        target_address: The address of the target device on the I3C bus.
+        subaddress (list): The subaddress of the register, as in read().
+        mask (int): The bits to change, a byte.
+        value (int): The new value of the bits in the mask. The other bits are ignored.
+        mode (TransferMode, optional): The transfer mode of the read and the write. SDR by default.
+        force (bool, optional): Whether to write the register even if its value doesn't change.
+
+        Returns:
+        tuple: A tuple containing two elements:
+            - The first element is a Boolean indicating the success (True) or failure (False) of the operation.
+            - The second element is the new value of the register, or the error of the transfer that failed.
+        """
+        (success, data) = self.read(target_address, mode, subaddress, 1)
+        if not success:
+            return (False, data)
+
+        new_value = (data[0] & ~mask & 0xFF) | (value & mask)
+        if new_value != data[0] or force:
+            (success, error) = self.write(target_address, mode, subaddress, [new_value])
+            if not success:
+                return (False, error)
+
+        return (True, new_value)
 
     def ccc_getbcr(self, target_address):
         try:
@@ -1020,6 +1101,7 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("ccc_getcaps", responses)
 
+    @invalidates_register_cache
     def ccc_rstdaa(self):
         """
         Performs a RSTDAA (Reset Dynamic Address Assignment) operation on a target device on the I3C bus.
@@ -1047,6 +1129,7 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("ccc_rstdaa", responses)
 
+    @invalidates_register_cache
     def ccc_entdaa(self, device_table : dict):
         """
         Performs a broadcast ENTDAA (Enter Dynamic Address Assignment) operation on the I3C Bus.
@@ -1234,6 +1317,7 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("ccc_unicast_disec", responses)
 
+    @invalidates_register_cache
     def ccc_setdasa(self, static_address, dynamic_address):
         """
         Performs a SETDASA (Set Dynamic Address for Static Address) operation on the I3C bus.
@@ -1267,6 +1351,7 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("ccc_setdasa", responses)
 
+    @invalidates_register_cache
     def ccc_setnewda(self, current_address, new_address):
         """
         Performs a SETNEWDA (Set New Dynamic Address) operation on the I3C bus.
@@ -1490,6 +1575,7 @@ class SupernovaI3CBlockingInterface:
 
         return self._process_response("ccc_broadcast_setmrl", responses)
 
+    @invalidates_register_cache
     def ccc_setaasa(self, static_addresses : list[int]):
         """
         Performs a broadcast SETAASA (Set All Agents to Static Address) operation on the I3C bus.
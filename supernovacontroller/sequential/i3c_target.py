@@ -2,9 +2,15 @@ from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import (I3cTargetMemoryLayout_t, I3cTargetMaxDataSpeedLimit_t, I3cTargetIbiCapable_t, I3cTargetIbiPayload_t, 
                                                  I3cTargetOfflineCap_t, I3cTargetVirtSupport_t, I3cTargetDeviceRole_t, I3cTargetDcr_t)
+from BinhoSupernova.commands.definitions import SET_I3C_BUS_VOLTAGE
 from supernovacontroller.errors import BusVoltageError
 from supernovacontroller.errors import BusNotInitializedError
 from supernovacontroller.errors import BackendError
+from .locking import serialized
+from .retry import submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
+import threading
 from threading import Event
 import queue
 
@@ -25,7 +31,8 @@ class I3CTargetNotificationHandler:
         self.notification = Event()
         self.notification_message = None
         self.modified = False
-        notification_subscription("I3C TARGET NOTIFICATION", filter_func=self.is_i3c_target_notification, handler_func=self.handle_i3c_target_notification)
+        notification_subscription("I3C TARGET NOTIFICATION", filter_func=self.is_i3c_target_notification, handler_func=self.handle_i3c_target_notification,
+                                  notification_name="I3C TARGET NOTIFICATION")
         # High level notification handling queue to pass message from handle_i3c_target_notification to wait_for_notification
         self.high_notification_queue = queue.SimpleQueue()
 
@@ -98,17 +105,22 @@ class I3CTargetNotificationHandler:
         self.high_notification_queue.put(message)
         self.notification.set()
         
+@submits_for("i3c.target")
+@timeout_argument
 class SupernovaI3CTargetBlockingInterface:
     
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
         self.driver = driver
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
         self.mem_layout = I3cTargetMemoryLayout_t.MEM_2_BYTES
         # I3C target notification handler
         self.i3c_notification = I3CTargetNotificationHandler(notification_subscription)
         self.voltage = None
 
  
+    @serialized
     def target_init(self, memory_layout: I3cTargetMemoryLayout_t, useconds_to_wait_for_ibi, max_read_length, max_write_length, features):
         """
         Initialize the I3C peripheral in target mode.
@@ -143,6 +155,7 @@ class SupernovaI3CTargetBlockingInterface:
         status = responses[0]["result"]
         return (status == "I3C_TARGET_INIT_SUCCESS", status)
 
+    @serialized
     def set_voltage(self, voltage: int):
         """
         Sets the voltage to a specified value.
@@ -168,7 +181,7 @@ class SupernovaI3CTargetBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        response_ok = responses[0]["name"] == "SET I3C BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+        response_ok = VALIDATORS[SET_I3C_BUS_VOLTAGE].is_success(responses[0])
         if response_ok:
             result = (True, voltage)
             # We want to set the bus_voltage when we know the operation was successful
@@ -179,6 +192,7 @@ class SupernovaI3CTargetBlockingInterface:
 
         return result
 
+    @serialized
     def set_pid(self, pid: list):
         """
         Modifies the PID of the I3C target via USB.
@@ -205,6 +219,7 @@ class SupernovaI3CTargetBlockingInterface:
         status = responses[0]["result"]
         return (status == "I3C_TARGET_SET_PID_SUCCESS", status)    
 
+    @serialized
     def set_bcr(self, max_data_speed_limit: I3cTargetMaxDataSpeedLimit_t, ibi_req_capable: I3cTargetIbiCapable_t, ibi_payload: I3cTargetIbiPayload_t, offline_capable: I3cTargetOfflineCap_t, virt_targ_support: I3cTargetVirtSupport_t, device_role: I3cTargetDeviceRole_t):
         """
         Modifies the BCR of the I3C target via USB. 
@@ -243,6 +258,7 @@ class SupernovaI3CTargetBlockingInterface:
         status = "I3C_TARGET_SET_BCR_SUCCESS" if result else "I3C_TARGET_SET_BCR_FAILED"
         return (result, status)    
 
+    @serialized
     def set_dcr(self, dcr_value: I3cTargetDcr_t):
         """
         Modifies the DCR of the I3C target via USB
@@ -270,6 +286,7 @@ class SupernovaI3CTargetBlockingInterface:
         status = "I3C_TARGET_SET_DCR_SUCCESS" if result else "I3C_TARGET_SET_DCR_FAILED"
         return (result, status)    
 
+    @serialized
     def set_static_address(self, staticAddr):
         """
         Modifies the static address of the I3C target via USB
@@ -297,6 +314,7 @@ class SupernovaI3CTargetBlockingInterface:
         status = "I3C_TARGET_SET_STATIC_ADDRESS_SUCCESS" if result else "I3C_TARGET_SET_STATIC_ADDRESS_FAILED"
         return (result, status)    
 
+    @serialized
     def set_configuration(self, useconds_to_wait_for_ibi, max_read_length, max_write_length, features):
         """
         Configures the I3C peripheral in target mode.
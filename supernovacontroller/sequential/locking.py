@@ -0,0 +1,24 @@
+import functools
+
+def serialized(method):
+    """
+    Runs a method of an interface holding the interface's 'lock'.
+
+    Applied to the methods changing or reading the configuration an interface keeps (e.g. bus_voltage or the
+    bus parameters), so they run one at a time: the configuration kept by the interface is always the last one
+    applied to the device, and is never read half updated. Transfers don't take the lock and can overlap with
+    each other and with these methods.
+
+    The lock must be reentrant, as configuration methods call each other (e.g. init_bus calls set_bus_voltage).
+
+    The lock is held while the method waits for the device, so another thread calling a configuration method of
+    the same interface blocks until the device answers, or the call times out. A method added to a batch, or
+    called through the asyncio front-end, takes the lock while its requests are prepared and again while its
+    responses are decoded, but not while they are in flight.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
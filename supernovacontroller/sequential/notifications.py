@@ -0,0 +1,512 @@
+import collections
+import functools
+import itertools
+import queue
+import threading
+import time
+
+from ..utils.logging import logging
+
+logger = logging.getLogger("supernovacontroller")
+
+# Handler execution modes
+INLINE = "inline"                   # On the notification dispatcher thread, before the next notification
+DEDICATED_THREAD = "thread"         # On a thread of its own, in arrival order
+THREAD_POOL = "pool"                # On the thread pool shared by the handlers of the device, in no particular order
+
+EXECUTION_MODES = (INLINE, DEDICATED_THREAD, THREAD_POOL)
+
+DEFAULT_POOL_WORKERS = 4
+
+# Overflow policies of a bounded NotificationQueue
+BLOCK = "block"                     # Wait for room, holding up the driver thread that delivers the notification
+DROP_OLDEST = "drop-oldest"         # Discard the oldest queued notification to make room
+DROP_NEWEST = "drop-newest"         # Discard the incoming notification
+COALESCE = "coalesce"               # Replace the queued notification with the same key, if any, else drop the oldest
+
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+# Queued to a dedicated handler thread to make it exit
+_STOP = object()
+
+def notification_key(message):
+    """
+    Default coalescing key of a notification: its name and, for I3C notifications, the address of the target.
+    """
+    header = message.get("header")
+    address = header.get("address") if isinstance(header, dict) else None
+
+    return (message.get("name", "").strip(), address)
+
+class NotificationQueue:
+    """
+    Queue of the notifications waiting for the notification dispatcher thread, with an optional bound.
+
+    It holds (supernova_response, system_message) items, as SupernovaDevice.notification_queue always did.
+    When 'maxsize' items are waiting, the overflow policy decides what happens with a new one:
+    - BLOCK: put() waits until there is room. This holds up the driver thread, and with it the responses.
+      While a handler runs inline on the dispatcher thread, the new notification is discarded instead: the
+      handler may be waiting for a response that the held up driver thread would never deliver.
+    - DROP_OLDEST: the oldest waiting notification is discarded.
+    - DROP_NEWEST: the new notification is discarded.
+    - COALESCE: a waiting notification with the same key (see notification_key) is replaced by the new one,
+      keeping its place in the queue. If there is none, the oldest waiting notification is discarded.
+      With this policy notifications are coalesced even before the queue is full.
+
+    Control items that aren't tuples, like the shutdown sentinel, are always accepted.
+    """
+
+    def __init__(self, maxsize=0, policy=BLOCK, key_func=notification_key):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy}, expected one of {OVERFLOW_POLICIES}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key_func = key_func
+        self.condition = threading.Condition()
+        # Entries are [key, item] lists, so a coalesced item can be replaced in place
+        self.entries = collections.deque()
+        self.pending_keys = {}
+        self.max_depth = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # Whether the dispatcher thread is running a handler inline, see set_inline_handler_running()
+        self.inline_handler_running = False
+        self.warned = False
+
+    def set_inline_handler_running(self, running):
+        """
+        Tells the queue whether the dispatcher thread is running a handler inline, during which BLOCK discards
+        the notifications that don't fit instead of waiting.
+        """
+        with self.condition:
+            self.inline_handler_running = running
+            self.condition.notify_all()
+
+    def put(self, item):
+        with self.condition:
+            key = None
+            if isinstance(item, tuple):
+                if self.policy == COALESCE:
+                    key = self.key_func(item[0])
+                    entry = self.pending_keys.get(key)
+                    if entry is not None:
+                        entry[1] = item
+                        self.coalesced += 1
+                        return
+
+                if self.maxsize > 0 and len(self.entries) >= self.maxsize:
+                    if self.policy == DROP_NEWEST:
+                        self.dropped += 1
+                        return
+
+                    if self.policy == BLOCK:
+                        self.condition.wait_for(
+                            lambda: len(self.entries) < self.maxsize or self.inline_handler_running)
+                        if len(self.entries) >= self.maxsize:
+                            self.dropped += 1
+                            if not self.warned:
+                                self.warned = True
+                                logger.warning("Notification queue full while a handler runs on the dispatcher "
+                                               "thread, dropping notifications instead of blocking")
+                            return
+                    else:
+                        self.__pop()
+                        self.dropped += 1
+
+            entry = [key, item]
+            self.entries.append(entry)
+            if key is not None:
+                self.pending_keys[key] = entry
+
+            self.max_depth = max(self.max_depth, len(self.entries))
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.entries)
+            item = self.__pop()
+            self.condition.notify_all()
+
+        return item
+
+    def __pop(self):
+        (key, item) = entry = self.entries.popleft()
+        if key is not None and self.pending_keys.get(key) is entry:
+            del self.pending_keys[key]
+
+        return item
+
+    def qsize(self):
+        return len(self.entries)
+
+    def empty(self):
+        return not self.entries
+
+    def stats(self):
+        """
+        Returns:
+        dict: The current 'depth' of the queue, its 'max_depth' so far, and the number of notifications
+              'dropped' and 'coalesced' because of the bound.
+        """
+        with self.condition:
+            return {
+                "depth": len(self.entries),
+                "max_depth": self.max_depth,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+            }
+
+class HandlerStats:
+    """
+    Backlog of a handler running away from the notification dispatcher thread.
+
+    The lag of a notification is the time it waits, once routed, until its handler starts running.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.depth = 0
+        self.max_depth = 0
+        self.handled = 0
+        self.errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def queued(self):
+        with self.lock:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+
+        return time.perf_counter()
+
+    def started(self, queued_at):
+        lag = time.perf_counter() - queued_at
+
+        with self.lock:
+            self.depth -= 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+
+    def finished(self, failed):
+        with self.lock:
+            self.handled += 1
+            self.errors += failed
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "queue_depth": self.depth,
+                "max_queue_depth": self.max_depth,
+                "handled": self.handled,
+                "errors": self.errors,
+                "last_lag": self.last_lag,
+                "max_lag": self.max_lag,
+                "mean_lag": self.total_lag / self.handled if self.handled else 0.0,
+            }
+
+class _QueuedHandler:
+    """
+    Hands the notifications of a handler to 'submit', which runs them elsewhere, keeping track of the backlog.
+    """
+
+    def __init__(self, name, handler_func, submit):
+        self.name = name
+        self.handler_func = handler_func
+        self.submit = submit
+        self.stats = HandlerStats()
+
+    def __call__(self, name, message):
+        self.submit(self._run, name, message, self.stats.queued())
+
+    def _run(self, name, message, queued_at):
+        self.stats.started(queued_at)
+
+        failed = False
+        try:
+            self.handler_func(name, message)
+        except Exception:
+            failed = True
+            logger.exception("Error in notification handler %s", self.name)
+
+        self.stats.finished(failed)
+
+    def close(self):
+        pass
+
+class _DedicatedThreadHandler(_QueuedHandler):
+    """
+    Runs the notifications of a handler in order, on a thread of its own.
+    """
+
+    def __init__(self, name, handler_func):
+        self.queue = queue.SimpleQueue()
+        super().__init__(name, handler_func, lambda *item: self.queue.put(item))
+
+        self.thread = threading.Thread(target=self.__work, name=f"notification handler {name}", daemon=True)
+        self.thread.start()
+
+    def __work(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+
+            (run, name, message, queued_at) = item
+            run(name, message, queued_at)
+
+    def close(self):
+        self.queue.put(_STOP)
+        # A handler may unsubscribe itself
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+
+class NotificationRouter:
+    """
+    Dispatches the notifications of a SupernovaDevice to their handlers.
+
+    Handlers subscribed to a notification name (e.g. "I3C IBI NOTIFICATION"), and optionally to the dynamic
+    address of the I3C target that sent it, are looked up in an index, so each notification only costs calls
+    to the handlers interested in it. Handlers registered with just a filter function are evaluated one by one
+    for every notification, after the indexed ones.
+
+    Filters are evaluated on the routing thread. Handlers run there too by default (INLINE), or are handed to a
+    thread of their own (DEDICATED_THREAD) or to a thread pool shared by all the handlers (THREAD_POOL), so a
+    slow handler doesn't delay the notifications of the others.
+
+    The index is replaced as a whole on every change, so routing a notification never takes a lock.
+    """
+
+    def __init__(self, pool_workers=DEFAULT_POOL_WORKERS, notification_queue=None):
+        """
+        Args:
+        pool_workers (int, optional): The number of threads of the pool running the THREAD_POOL handlers.
+        notification_queue (NotificationQueue, optional): The queue the routed notifications come from. It is
+                                                          told when INLINE handlers run, so its BLOCK policy
+                                                          doesn't wait for them.
+        """
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        # (notification name, dynamic address or None) -> tuple of (label, filter_func, handler_func, subscription)
+        self.routes = {}
+        # Notification names with at least one subscription to a specific dynamic address
+        self.addressed_names = frozenset()
+        # subscription -> route key
+        self.subscriptions = {}
+        # Handler name -> subscription, for the indexed handlers registered by name
+        self.named_subscriptions = {}
+        # Handler name -> (filter_func, handler_func), for the handlers without notification name
+        self.filters = {}
+        # Subscription or handler name -> handler not running inline
+        self.queued_handlers = {}
+        self.pool_workers = pool_workers
+        self.pool = None
+        self.notification_queue = notification_queue
+        # Set by close(), notifications are no longer routed
+        self.closed = False
+
+    @staticmethod
+    def __get_address(message):
+        header = message.get("header")
+        return header.get("address") if isinstance(header, dict) else None
+
+    def __update_routes(self, routes):
+        self.routes = routes
+        self.addressed_names = frozenset(name for (name, address) in routes if address is not None)
+
+    def __submit_to_pool(self, function, *args):
+        pool = self.pool
+        if pool is None:
+            with self.lock:
+                if self.closed:
+                    # Routed while the router was closing, there is no one left to run it
+                    return
+                if self.pool is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self.pool = ThreadPoolExecutor(self.pool_workers, thread_name_prefix="notification handler")
+                pool = self.pool
+
+        pool.submit(function, *args)
+
+    def __prepare_handler(self, key, name, handler_func, execution):
+        # Must be called with the lock held
+        if execution == INLINE:
+            if self.notification_queue is None:
+                return handler_func
+            return functools.partial(self.__run_inline, self.notification_queue, handler_func)
+
+        if self.closed:
+            raise RuntimeError(f"Handler {name} can't run on a thread, the notification router is closed")
+
+        if execution == DEDICATED_THREAD:
+            handler = _DedicatedThreadHandler(name, handler_func)
+        elif execution == THREAD_POOL:
+            handler = _QueuedHandler(name, handler_func, self.__submit_to_pool)
+        else:
+            raise ValueError(f"Unknown execution mode {execution}, expected one of {EXECUTION_MODES}")
+
+        self.queued_handlers[key] = handler
+
+        return handler
+
+    def __add_route(self, key, notification_name, handler_func, dynamic_address, filter_func, label, execution):
+        # Must be called with the lock held
+        route = (notification_name.strip(), dynamic_address)
+        subscription = next(self.ids)
+        label = label or route[0]
+        handler_func = self.__prepare_handler(key or subscription, label, handler_func, execution)
+
+        routes = dict(self.routes)
+        routes[route] = routes.get(route, ()) + ((label, filter_func, handler_func, subscription),)
+        self.__update_routes(routes)
+        self.subscriptions[subscription] = route
+
+        return subscription
+
+    def subscribe(self, notification_name, handler_func, dynamic_address=None, filter_func=None, execution=INLINE):
+        """
+        Subscribes a handler to the notifications with a given name.
+
+        Args:
+        notification_name (str): The name of the notification, e.g. "I3C IBI NOTIFICATION".
+        handler_func (callable): Called with (notification_name, message) for every matching notification.
+        dynamic_address (int, optional): Only deliver the notifications whose header address is this one.
+        filter_func (callable, optional): Additional check receiving (notification_name, message), evaluated
+                                          only for the notifications with the given name (and address).
+        execution (str, optional): Where handler_func runs: INLINE, DEDICATED_THREAD or THREAD_POOL.
+
+        Returns:
+        int: The subscription, to be passed to unsubscribe().
+        """
+        with self.lock:
+            return self.__add_route(None, notification_name, handler_func, dynamic_address, filter_func, None, execution)
+
+    def add_handler(self, name, filter_func, handler_func, notification_name=None, dynamic_address=None, execution=INLINE):
+        """
+        Registers a named handler, as SupernovaDevice.on_notification does.
+
+        Handlers with a notification name are indexed, the others are evaluated for every notification.
+        A name that is already registered is ignored.
+
+        Returns:
+        bool: True if the handler was registered.
+        """
+        with self.lock:
+            if name in self.filters or name in self.named_subscriptions:
+                return False
+
+            if notification_name is None:
+                self.filters[name] = (filter_func, self.__prepare_handler(name, name, handler_func, execution))
+            else:
+                self.named_subscriptions[name] = self.__add_route(name, notification_name, handler_func, dynamic_address,
+                                                                  filter_func, name, execution)
+
+        return True
+
+    def unsubscribe(self, subscription):
+        """
+        Removes a handler. A handler running on a dedicated thread finishes the notifications it already received.
+
+        Args:
+        subscription (int or str): The subscription returned by subscribe(), or the name of a handler
+                                   registered with add_handler().
+
+        Returns:
+        bool: True if a handler was removed.
+        """
+        with self.lock:
+            handler = self.queued_handlers.pop(subscription, None)
+
+            if isinstance(subscription, str):
+                removed = self.filters.pop(subscription, None) is not None
+                subscription = self.named_subscriptions.pop(subscription, None)
+            else:
+                removed = False
+
+            route = self.subscriptions.pop(subscription, None)
+            if route is not None:
+                routes = dict(self.routes)
+                entries = tuple(entry for entry in routes[route] if entry[3] != subscription)
+                if entries:
+                    routes[route] = entries
+                else:
+                    del routes[route]
+                self.__update_routes(routes)
+                removed = True
+
+        if handler is not None:
+            handler.close()
+
+        return removed
+
+    def stats(self):
+        """
+        Returns:
+        dict: For every handler not running inline, keyed by its subscription or name, a dictionary with the
+              number of notifications waiting for it ('queue_depth', and 'max_queue_depth' so far), the number
+              of notifications it 'handled' and the 'errors' it raised, and its 'last_lag', 'max_lag' and
+              'mean_lag' in seconds.
+        """
+        with self.lock:
+            handlers = dict(self.queued_handlers)
+
+        return {key: handler.stats.as_dict() for key, handler in handlers.items()}
+
+    def route(self, message):
+        """
+        Calls the handlers interested in a notification.
+        An exception raised by a handler is logged and does not prevent the other handlers from running.
+        Notifications routed after close() are dropped.
+        """
+        if self.closed:
+            return
+
+        # Hot-Fix to solve extra space in the firmware release
+        notification_name = message.get("name", "").strip()
+
+        routes = self.routes
+        entries = routes.get((notification_name, None), ())
+        if notification_name in self.addressed_names:
+            entries += routes.get((notification_name, self.__get_address(message)), ())
+
+        for (label, filter_func, handler_func, _) in entries:
+            self.__call(label, filter_func, handler_func, message)
+
+        for name, (filter_func, handler_func) in list(self.filters.items()):
+            self.__call(name, filter_func, handler_func, message)
+
+    @staticmethod
+    def __run_inline(notification_queue, handler_func, name, message):
+        notification_queue.set_inline_handler_running(True)
+        try:
+            handler_func(name, message)
+        finally:
+            notification_queue.set_inline_handler_running(False)
+
+    @staticmethod
+    def __call(name, filter_func, handler_func, message):
+        try:
+            if filter_func is None or filter_func(name, message):
+                handler_func(name, message)
+        except Exception:
+            # A failing handler must not keep the notification from the other handlers
+            logger.exception("Error in notification handler %s", name)
+
+    def close(self):
+        """
+        Stops the handler threads. Notifications already handed to them are handled before they exit, the ones
+        routed afterwards are dropped.
+        """
+        with self.lock:
+            self.closed = True
+            handlers = list(self.queued_handlers.values())
+            self.queued_handlers.clear()
+            pool, self.pool = self.pool, None
+
+        for handler in handlers:
+            handler.close()
+
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,196 @@
+import functools
+import threading
+
+def _location(register):
+    """
+    Returns:
+    tuple: The width in bytes and the value of a register address given as an int (one byte) or a list of bytes
+           (big endian). None for an empty register address.
+    """
+    if isinstance(register, int):
+        return (1, register)
+    if not register:
+        return None
+
+    return (len(register), int.from_bytes(bytes(register), "big"))
+
+class RegisterCache:
+    """
+    A write-through shadow of the registers of the targets on a bus, kept by an I2C or I3C interface.
+
+    The values written to, and read from, registers are kept byte by byte, keyed by target address and register
+    address, assuming the targets auto-increment the register address on multi-byte transfers. Reads of
+    registers whose every byte is known are answered from the cache, without a transfer. Writes always go to
+    the target, and update the cache when they succeed.
+
+    Registers changed by the target itself (status, FIFO or counter registers, ...) must be excluded, as must be
+    targets without a register map. The I3C interface drops the whole cache when targets may have been reset or
+    their dynamic addresses changed. invalidate() drops values that are known to be stale for any other reason.
+
+    The cache assumes each register is only written through this interface, and by one thread at a time.
+
+    Usage:
+        cache = i2c.enable_register_cache()
+        cache.exclude(0x48, [0x00])  # Status register of the target at 0x48
+        i2c.update_bits(0x48, [0x10], mask=0x0C, value=0x04)
+        print(cache.stats())
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (target address, register width, register address) -> byte
+        self.values = {}
+        self.volatile_targets = set()
+        self.volatile_registers = set()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def exclude(self, address, register=None, length=1):
+        """
+        Excludes registers from the cache: their reads always go to the target.
+
+        Args:
+        address (int): The address of the target.
+        register (int or list, optional): The address of the first excluded register. All the registers of the
+                                          target are excluded by default.
+        length (int, optional): The number of consecutive registers to exclude.
+        """
+        with self.lock:
+            if register is None:
+                self.volatile_targets.add(address)
+                self.values = {key: value for (key, value) in self.values.items() if key[0] != address}
+                return
+
+            (width, start) = _location(register)
+            for offset in range(start, start + length):
+                self.volatile_registers.add((address, width, offset))
+                self.values.pop((address, width, offset), None)
+
+    def __cacheable(self, address, location, length):
+        # Must be called with the lock held
+        if location is None or address in self.volatile_targets:
+            return None
+
+        (width, start) = location
+        keys = [(address, width, offset) for offset in range(start, start + length)]
+        if self.volatile_registers and not self.volatile_registers.isdisjoint(keys):
+            return None
+
+        return keys
+
+    def lookup(self, address, register, length):
+        """
+        Looks up the value of registers, counting a hit or a miss.
+
+        Returns:
+        list: The bytes of the 'length' registers starting at 'register', or None if any of them is not cached or
+              is excluded from the cache.
+        """
+        location = _location(register)
+
+        with self.lock:
+            keys = self.__cacheable(address, location, length)
+            if keys is None:
+                self.bypassed += 1
+                return None
+
+            try:
+                data = [self.values[key] for key in keys]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return data
+
+    def store(self, address, register, data):
+        """
+        Records the bytes written to, or read from, the registers starting at 'register'. A transfer without
+        register address drops the values of the target, as the registers it changed are not known.
+        """
+        location = _location(register)
+
+        with self.lock:
+            if location is None:
+                self.values = {key: value for (key, value) in self.values.items() if key[0] != address}
+                return
+
+            if address in self.volatile_targets:
+                return
+
+            (width, start) = location
+            for (offset, value) in enumerate(data, start):
+                key = (address, width, offset)
+                if key not in self.volatile_registers:
+                    self.values[key] = value
+
+    def invalidate(self, address=None, register=None, length=1):
+        """
+        Drops cached values, so the next reads of the registers go to the target.
+
+        Args:
+        address (int, optional): The address of the target. All the targets by default.
+        register (int or list, optional): The address of the first register. All the registers of the target by
+                                          default.
+        length (int, optional): The number of consecutive registers to drop.
+        """
+        with self.lock:
+            if address is None:
+                self.values.clear()
+                return
+
+            location = _location(register) if register is not None else None
+            if location is None:
+                self.values = {key: value for (key, value) in self.values.items() if key[0] != address}
+                return
+
+            (width, start) = location
+            for offset in range(start, start + length):
+                self.values.pop((address, width, offset), None)
+
+    def stats(self):
+        """
+        Returns:
+        dict: The number of reads answered by the cache ('hits'), of reads of registers not cached yet ('misses')
+              and of reads of excluded registers ('bypassed'), and the number of registers cached ('entries').
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed, "entries": len(self.values)}
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+            self.bypassed = 0
+
+def cached_registers(interface, address, register, length):
+    """
+    Looks up registers in the cache of the interface, if it is enabled.
+
+    Methods run through a DeferredCall are replayed from the start for each submission, and a value cached by
+    an earlier replay would skip a submission the replayed outcomes account for. The cache isn't looked up
+    then, reads go to the target and only update it.
+
+    Returns:
+    list: The bytes of the registers, or None if they must be read from the target.
+    """
+    if interface.register_cache is None or getattr(interface.controller, "replays_submissions", False):
+        return None
+
+    return interface.register_cache.lookup(address, register, length)
+
+def invalidates_register_cache(method):
+    """
+    Drops the register cache of the interface once the method returns, for the methods after which the cached
+    values can't be trusted (e.g. bus resets or dynamic address changes).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            if self.register_cache is not None:
+                self.register_cache.invalidate()
+
+    return wrapper
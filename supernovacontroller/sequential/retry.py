@@ -0,0 +1,184 @@
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+
+# Whether retries are disabled for the transfers submitted by each thread, see no_retries(), and the interface
+# submitting them, see issued_by()
+_call = threading.local()
+
+# Key of the retry counters of the transfers not submitted by an interface (e.g. get_hardware_version)
+DEVICE = "device"
+
+# Error codes of transient failures, worth retrying, as reported in the responses of the Supernova
+RETRYABLE_ERRORS = frozenset([
+    # I2C 'status'
+    "I2C_NACK_ADDRESS",
+    "I2C_NACK_BYTE",
+    "I2C_BUSY",
+    "I2C_ARBITRATION_LOST",
+    "I2C_TIMEOUT_CONTINUE_TRANSFER",
+    # I3C header 'result' and descriptor 'errors'
+    "I3C_TRANSFER_DRIVER_TIMEOUT",
+    "I3C_TRANSFER_SOFTWARE_TIMEOUT",
+    "NACK_ERROR",
+    "TIMEOUT_ERROR",
+    # SPI 'driver_error'
+    "SPI_DRIVER_BUSY",
+    "SPI_DRIVER_TIMEOUT",
+])
+
+# Fields of the responses holding error codes
+_ERROR_FIELDS = ("status", "result", "usb_error", "manager_error", "driver_error")
+
+def error_codes(response):
+    """
+    Returns:
+    set: The codes found in the status and error fields of a response, successful ones included.
+    """
+    codes = {response.get(field) for field in _ERROR_FIELDS}
+
+    header = response.get("header")
+    if isinstance(header, dict):
+        codes.add(header.get("result"))
+
+    descriptor = response.get("descriptor")
+    if isinstance(descriptor, dict):
+        codes.update(descriptor.get("errors") or ())
+
+    codes.discard(None)
+    return codes
+
+def retries_enabled():
+    """
+    Returns:
+    bool: False if the current thread is inside a no_retries() block.
+    """
+    return not getattr(_call, "no_retries", False)
+
+@contextmanager
+def no_retries():
+    """
+    Sends the transfers submitted by the current thread, inside the 'with' block, only once whatever the retry
+    policies of the device. For the operations expecting transient errors, like probing or polling a target
+    that may not acknowledge.
+    """
+    previous = getattr(_call, "no_retries", False)
+    _call.no_retries = True
+    try:
+        yield
+    finally:
+        _call.no_retries = previous
+
+def current_interface():
+    """
+    Returns:
+    str: The name of the interface (e.g. "i3c.controller") whose method is submitting transfers on the current
+         thread, or None outside of the interface methods.
+    """
+    return getattr(_call, "interface", None)
+
+@contextmanager
+def issued_by(interface):
+    """
+    Makes the transfers submitted by the current thread, inside the 'with' block, use the retry policy of
+    'interface'. The innermost block wins, so an interface used by another one (e.g. I2CEeprom) keeps its own.
+    """
+    previous = getattr(_call, "interface", None)
+    _call.interface = interface
+    try:
+        yield
+    finally:
+        _call.interface = previous
+
+def _issued_by(interface, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with issued_by(interface):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+def submits_for(interface):
+    """
+    Class decorator making the transfers submitted by the public methods of an interface class use the retry
+    policy set for 'interface', its name in SupernovaDevice.create_interface().
+    """
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.isfunction(attribute):
+                setattr(cls, name, _issued_by(interface, attribute))
+
+        return cls
+
+    return decorate
+
+def is_success(response):
+    """
+    Returns:
+    bool: True if the response reports a successful transfer, or None if its command is unknown.
+    """
+    # Imported here, the command definitions are only needed once a device is used
+    from .validators import VALIDATORS, command_of
+
+    validator = VALIDATORS.get(command_of(response))
+    return None if validator is None else validator.is_success(response)
+
+class RetryPolicy:
+    """
+    Decides which failed transfers are sent again, how many times and after how long.
+
+    A transfer whose response reports one of the 'retry_on' error codes is sent again, with a new transfer id,
+    up to 'max_attempts' times in total. The n-th retry waits backoff * backoff_factor^(n-1) seconds, at most
+    'max_backoff'. The operation only sees the response of the last attempt.
+
+    Usage:
+        device.set_retry_policy(RetryPolicy(max_attempts=3, backoff=0.001), interface="i2c")
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.0, backoff_factor=2.0, max_backoff=1.0, retry_on=RETRYABLE_ERRORS):
+        """
+        Args:
+        max_attempts (int, optional): The number of times a transfer is sent at most, 1 disables the retries.
+        backoff (float, optional): The time to wait before the first retry, in seconds. 0 retries right away.
+        backoff_factor (float, optional): The factor applied to the wait of every further retry.
+        max_backoff (float, optional): The longest wait between two attempts, in seconds.
+        retry_on (iterable, optional): The error codes to retry. Defaults to RETRYABLE_ERRORS.
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_on = frozenset(retry_on)
+
+    def is_retryable(self, response):
+        """
+        Returns:
+        bool: True if the response reports one of the error codes to retry.
+        """
+        return not self.retry_on.isdisjoint(error_codes(response))
+
+    def should_retry(self, response, attempt):
+        """
+        Args:
+        response (dict): The response to the last attempt.
+        attempt (int): The number of times the transfer was sent, starting at 1.
+
+        Returns:
+        bool: True if the transfer must be sent again.
+        """
+        return attempt < self.max_attempts and self.is_retryable(response)
+
+    def delay(self, attempt):
+        """
+        Returns:
+        float: The time to wait before sending the transfer again after 'attempt' attempts, in seconds.
+        """
+        if self.backoff <= 0:
+            return 0.0
+
+        return min(self.backoff * self.backoff_factor ** (attempt - 1), self.max_backoff)
+
+    def __repr__(self):
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, backoff={self.backoff}, "
+                f"backoff_factor={self.backoff_factor}, max_backoff={self.max_backoff})")
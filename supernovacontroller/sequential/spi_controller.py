@@ -1,12 +1,21 @@
+import threading
+
 from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from supernovacontroller.errors import BackendError, BusVoltageError
+from .locking import serialized
+from .retry import submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
 from BinhoSupernova.commands.definitions import (
     SpiControllerBitOrder, SpiControllerMode, SpiControllerDataWidth,
-    SpiControllerChipSelect, SpiControllerChipSelectPolarity, COMMANDS_DICTIONARY,
-    SPI_CONTROLLER_INIT, SPI_CONTROLLER_SET_PARAMETERS, SPI_CONTROLLER_TRANSFER
+    SpiControllerChipSelect, SpiControllerChipSelectPolarity,
+    SPI_CONTROLLER_INIT, SPI_CONTROLLER_SET_PARAMETERS, SPI_CONTROLLER_TRANSFER,
+    SET_I2C_SPI_UART_BUS_VOLTAGE, USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE
 )
 
+@submits_for("spi.controller")
+@timeout_argument
 class SupernovaSPIControllerBlockingInterface:
     # Private Methods
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
@@ -26,6 +35,8 @@ class SupernovaSPIControllerBlockingInterface:
         self.driver = driver
         # Transfer controller instance
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
         # SPI controller communication parameters
         self.bit_order = SpiControllerBitOrder.MSB                        # MSB first
         self.mode = SpiControllerMode.MODE_0                             # Mode 0
@@ -80,24 +91,7 @@ class SupernovaSPIControllerBlockingInterface:
             self.frequency is not None
         ])
     
-    def __check_if_response_is_correct(self, response):
-        """
-        Checks if the response received from the Supernova indicates successful execution of the SPI controller method.
-
-        Args:
-        response (dict): A dictionary containing response data from the Supernova SPI controller request.
-
-        Returns:
-        bool: True if the response indicates successful, False otherwise.
-        """
-
-        # Check if the USB, manager or driver had issues handling the SPI controller request
-        return all([
-            response["usb_error"] == "CMD_SUCCESSFUL",
-            response["manager_error"] == "SPI_NO_ERROR" or response["manager_error"] == "SPI_ALREADY_INITIALIZED_ERROR",
-            response["driver_error"] == "SPI_DRIVER_NO_TRANSFER_ERROR"
-        ])
-    
+    @serialized
     def set_bus_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the SPI controller interface to a specified value.
@@ -133,8 +127,8 @@ class SupernovaSPIControllerBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[SET_I2C_SPI_UART_BUS_VOLTAGE].is_success(responses[0])
 
         # If successful, update the bus voltage
         if response_success:
@@ -147,6 +141,7 @@ class SupernovaSPIControllerBlockingInterface:
 
         return result
     
+    @serialized
     def use_external_spi_power_source(self):
         """
         Sets the bus to utilize the external power source voltage 
@@ -166,20 +161,14 @@ class SupernovaSPIControllerBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "DAC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
 
         return (True, response["external_voltage_mV"])
 
+    @serialized
     def init_bus(self, bit_order: SpiControllerBitOrder=None, mode: SpiControllerMode=None,
                  chip_select: SpiControllerChipSelect=None, chip_select_pol: SpiControllerChipSelectPolarity=None, frequency: int=None):
         """
@@ -226,11 +215,12 @@ class SupernovaSPIControllerBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_INIT]["name"] and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[SPI_CONTROLLER_INIT].is_success(responses[0])
 
         return (response_success, "Success" if response_success else "Init failed, error from the Supernova")
      
+    @serialized
     def set_parameters(self, bit_order: SpiControllerBitOrder=None, mode: SpiControllerMode=None,
                        chip_select: SpiControllerChipSelect=None, chip_select_pol: SpiControllerChipSelectPolarity=None, frequency: int=None):
         """
@@ -277,11 +267,12 @@ class SupernovaSPIControllerBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_SET_PARAMETERS]["name"] and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[SPI_CONTROLLER_SET_PARAMETERS].is_success(responses[0])
 
         return (response_success, "Success" if response_success else "Set Parameters failed, error from the Supernova")
 
+    @serialized
     def get_parameters(self):
         """
         Retrieves the current SPI controller communication parameters.
@@ -327,7 +318,7 @@ class SupernovaSPIControllerBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success =  responses[0]["name"] == COMMANDS_DICTIONARY[SPI_CONTROLLER_TRANSFER]["name"] and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[SPI_CONTROLLER_TRANSFER].is_success(responses[0])
             
         return (response_success, responses[0]["payload"] if response_success else None)
\ No newline at end of file
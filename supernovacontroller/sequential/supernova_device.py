@@ -1,29 +1,139 @@
-import inspect
+import importlib
 import os
 import queue
 import threading
+import time
 
 from BinhoSupernova import getConnectedSupernovaDevicesList
-from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
-from BinhoSupernova.Supernova import Supernova
-from BinhoSupernova.utils.system_message import SystemOpcode
-from transfer_controller import TransferController
 
 from supernovacontroller.errors import (BackendError,
                                         DeviceAlreadyMountedError,
                                         DeviceNotMountedError, DeviceOpenError,
                                         UnknownInterfaceError)
 
-from ..utils.logging import log_instance_method_calls, logging
-from .gpio import SupernovaGPIOInterface
-from .i2c import SupernovaI2CBlockingInterface
-from .i3c import SupernovaI3CBlockingInterface
-from .i3c_target import SupernovaI3CTargetBlockingInterface
-from .spi_controller import SupernovaSPIControllerBlockingInterface
-from .uart import SupernovaUARTBlockingInterface
+from ..utils.logging import log_instance_method_calls, logging, setup_logging
+from ..utils.stats import TransferStats
+from .batch import SupernovaBatch
+from .controller import DEFAULT_PIPELINE_WINDOW, SupernovaTransferController
+from .notifications import (BLOCK, DEFAULT_POOL_WORKERS, INLINE,
+                            NotificationQueue, NotificationRouter)
+from .timeouts import accepts_timeout
 
 logger = logging.getLogger("supernovacontroller")
 
+# Queued by close() to wake up the dispatcher threads and make them exit
+_SHUTDOWN = object()
+
+# Maximum number of devices opened at the same time by openAllConnectedSupernovaDevices
+DEFAULT_OPEN_WORKERS = 8
+
+# Interface classes, as "module:class", imported by the first create_interface() asking for them
+INTERFACE_CLASSES = {
+    "i2c": ".i2c:SupernovaI2CBlockingInterface",
+    "i3c.controller": ".i3c:SupernovaI3CBlockingInterface",
+    "uart": ".uart:SupernovaUARTBlockingInterface",
+    "i3c.target": ".i3c_target:SupernovaI3CTargetBlockingInterface",
+    "spi.controller": ".spi_controller:SupernovaSPIControllerBlockingInterface",
+    "gpio": ".gpio:SupernovaGPIOInterface",
+}
+
+# Keys of the device information and the GetUsbStringSubCommand with their value
+DEVICE_INFO_STRINGS = (
+    ("hw_version", "HW_VERSION"),
+    ("fw_version", "FW_VERSION"),
+    ("serial_number", "SERIAL_NUMBER"),
+    ("manufacturer", "MANUFACTURER"),
+    ("product_name", "PRODUCT_NAME"),
+)
+
+class DeviceInfo(dict):
+    """
+    The information of an opened SupernovaDevice, as returned by its open() method.
+
+    It is a dict holding the serial number, requested when the device is opened, and the strings already known
+    for it in SupernovaDevice.info_cache. The other strings are requested on first access: only the one read
+    with info[key] or info.get(key), all of them when the whole information is read (iteration, len(), items(),
+    dict(info), json.dumps(info), ...). Nothing is requested once the device is closed, the strings not read by
+    then are left out.
+    """
+
+    def __init__(self, device):
+        super().__init__()
+        self.device = device
+        self.__update(device.usb_strings)
+
+    def __update(self, strings):
+        for (key, name) in DEVICE_INFO_STRINGS:
+            if name in strings:
+                # The firmware prefixes every string, e.g. "HW-C"
+                dict.__setitem__(self, key, strings[name][3:])
+
+    def __fetch(self, keys):
+        names = [name for (key, name) in DEVICE_INFO_STRINGS if key in keys and not dict.__contains__(self, key)]
+        if names and self.device.mounted and self.device.running:
+            self.__update(self.device._get_usb_strings(names))
+
+    def load(self):
+        """
+        Requests the strings not known yet.
+
+        Returns:
+        DeviceInfo: The information itself.
+        """
+        self.__fetch([key for (key, _) in DEVICE_INFO_STRINGS])
+        return self
+
+    def __missing__(self, key):
+        self.__fetch([key])
+        if not dict.__contains__(self, key):
+            raise KeyError(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return dict.__iter__(self.load())
+
+    def __len__(self):
+        return dict.__len__(self.load())
+
+    def keys(self):
+        return dict.keys(self.load())
+
+    def values(self):
+        return dict.values(self.load())
+
+    def items(self):
+        return dict.items(self.load())
+
+    def copy(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.load(), other)
+
+    def __ne__(self, other):
+        return dict.__ne__(self.load(), other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return dict.__repr__(self.load())
+
+def _load_interface_class(interface_class):
+    if isinstance(interface_class, str):
+        (module_name, class_name) = interface_class.split(":")
+        interface_class = getattr(importlib.import_module(module_name, __package__), class_name)
+
+    return interface_class
+
 def id_gen(start=0):
     i = start
     while True:
@@ -31,32 +141,100 @@ def id_gen(start=0):
         yield i
 
 class SupernovaDevice:
-    def __init__(self, start_id=0):
-        self.controller = TransferController(id_gen(start_id))
+    """
+    A Supernova and the interfaces created on it.
+
+    A device can be used from several threads at once: requests are sent one at a time and every call gets the
+    response to its own request, calls from one thread keep their order, and the methods changing the
+    configuration of an interface run one at a time. See 'Using a Device from Several Threads' in the README.
+    """
+
+    # Serial number -> strings of the device information, shared by all the instances so opening the same
+    # Supernova again only needs to ask for its serial number. See clear_info_cache().
+    info_cache = {}
+    info_cache_lock = threading.Lock()
+
+    def __init__(self, start_id=0, direct_dispatch=False, notification_workers=DEFAULT_POOL_WORKERS,
+                 notification_queue_size=0, notification_overflow=BLOCK, collect_stats=False, timeout=None,
+                 retry_policy=None):
+        """
+        Args:
+        start_id (int, optional): The transfer id the id generator starts from.
+        direct_dispatch (bool, optional): If True, responses complete their transfer directly on the thread of the
+                                          driver callback, skipping the hop through the response queue and its
+                                          dispatcher thread. The next request of a sequence, and the retries,
+                                          are then also sent from the driver thread, which stops receiving while
+                                          another thread holds the controller lock to send. Notifications are
+                                          always queued. Defaults to False.
+        notification_workers (int, optional): The number of threads shared by the notification handlers
+                                              registered with execution="pool".
+        notification_queue_size (int, optional): The maximum number of notifications waiting to be dispatched.
+                                                 Defaults to 0, no limit.
+        notification_overflow (str, optional): What to do with a notification arriving when the queue is full:
+                                               "block" (default) waits for room, holding up the driver thread,
+                                               except while a handler runs inline, when the notification is
+                                               discarded so the handler can still get responses,
+                                               "drop-oldest" and "drop-newest" discard a notification, and
+                                               "coalesce" replaces the waiting notification with the same name
+                                               and target address. The discarded and replaced notifications are
+                                               counted by notification_queue_stats().
+        collect_stats (bool, optional): If True, the latency of every transfer is recorded and reported by
+                                        stats(). Defaults to False, transfers aren't timed.
+        timeout (float, optional): The default time to wait for the device to respond, in seconds. A transfer not
+                                   answered in time is cancelled and TransferTimeoutError is raised. Every
+                                   interface method also accepts a 'timeout' argument overriding it. Defaults to
+                                   None, wait forever.
+        retry_policy (RetryPolicy, optional): The policy retrying the transfers of every interface that fail
+                                              with a transient error, see set_retry_policy(). No retries by
+                                              default.
+        """
+        self.direct_dispatch = direct_dispatch
+        self.transfer_stats = TransferStats() if collect_stats else None
+        self.controller = SupernovaTransferController(id_gen(start_id), self.transfer_stats, timeout)
+        if retry_policy is not None:
+            self.controller.set_retry_policy(retry_policy)
         self.response_queue = queue.SimpleQueue()
-        self.notification_queue = queue.SimpleQueue()
-        self.notification_handlers = {}
+        self.notification_queue = NotificationQueue(notification_queue_size, notification_overflow)
+        self.notification_router = NotificationRouter(notification_workers, self.notification_queue)
+        # Handlers registered without notification name, evaluated for every notification
+        self.notification_handlers = self.notification_router.filters
 
         self.process_response_thread = threading.Thread(target=self._pull_sdk_response, daemon=True)
         self.process_notifications_thread = threading.Thread(target=self._pull_sdk_notification, daemon=True)
 
         self.running = True
+        self.shutdown_latency = None
 
         self.process_response_thread.start()
         self.process_notifications_thread.start()
 
+        # Imported here, it takes longer to import than the rest of the package
+        from BinhoSupernova.Supernova import Supernova
         self.driver = Supernova()
 
-        self.interfaces = {
-            "i2c": [None, SupernovaI2CBlockingInterface],
-            "i3c.controller": [None, SupernovaI3CBlockingInterface],
-            "uart": [None, SupernovaUARTBlockingInterface],
-            "i3c.target": [None, SupernovaI3CTargetBlockingInterface],
-            "spi.controller": [None, SupernovaSPIControllerBlockingInterface],
-            "gpio": [None, SupernovaGPIOInterface],
-        }
+        self.interfaces = {name: [None, interface_class] for name, interface_class in INTERFACE_CLASSES.items()}
+        # Makes threads creating the same interface at the same time get the same instance
+        self.interfaces_lock = threading.Lock()
 
         self.mounted = False
+        self.info = None
+        # GetUsbStringSubCommand name -> string, of the opened device
+        self.usb_strings = {}
+        self.usb_strings_lock = threading.Lock()
+
+        # TrafficRecorder while start_recording() is in effect
+        self.recorder = None
+
+    @property
+    def timeout(self):
+        """
+        The default time to wait for the device to respond, in seconds, or None to wait forever.
+        """
+        return self.controller.timeout
+
+    @timeout.setter
+    def timeout(self, timeout):
+        self.controller.timeout = timeout
 
     @property
     def driver(self):
@@ -68,64 +246,175 @@ class SupernovaDevice:
         self.__driver = log_instance_method_calls(newDriver, os.environ.get('PYTHON_LOG_PATH') is not None)
 
     def open(self, usb_address=None):
+        """
+        Opens the connection with the device.
+
+        Args:
+        usb_address (str, optional): The path of the device, as listed by getAllConnectedSupernovaDevices().
+                                     The first Supernova found is opened by default.
+
+        Returns:
+        DeviceInfo: The information of the device, a dict with "hw_version", "fw_version", "serial_number",
+                    "manufacturer" and "product_name". Only the serial number is requested here, the other
+                    strings are taken from 'info_cache' or requested on first access.
+        """
+        from BinhoSupernova.utils.system_message import SystemOpcode
+
         if self.mounted:
             raise DeviceAlreadyMountedError
 
+        setup_logging()
+
         result = self.driver.open(path=usb_address)
         if result["opcode"] != SystemOpcode.OK.value:
             raise DeviceOpenError(result["message"])
 
         self.driver.onEvent(self._push_sdk_response)
 
+        self.usb_strings = {}
+        # Fails the opening of a device that doesn't respond
+        self._get_usb_strings(["SERIAL_NUMBER"])
+        self.info = DeviceInfo(self)
+
+        self.mounted = True
+
+        return self.info
+
+    def _get_usb_strings(self, names):
+        """
+        Requests the strings of the device information not known yet. The serial number is requested first, the
+        strings cached for it in 'info_cache' are not requested again.
+
+        Args:
+        names (list): The GetUsbStringSubCommand names of the strings needed.
+
+        Returns:
+        dict: The strings of the device information known so far, by GetUsbStringSubCommand name.
+        """
+        with self.usb_strings_lock:
+            if "SERIAL_NUMBER" not in self.usb_strings:
+                self.usb_strings.update(self.__request_usb_strings(["SERIAL_NUMBER"]))
+                with SupernovaDevice.info_cache_lock:
+                    self.usb_strings.update(SupernovaDevice.info_cache.get(self.usb_strings["SERIAL_NUMBER"][3:], {}))
+
+            missing = [name for name in names if name not in self.usb_strings]
+            if missing:
+                strings = self.__request_usb_strings(missing)
+                self.usb_strings.update(strings)
+                with SupernovaDevice.info_cache_lock:
+                    SupernovaDevice.info_cache.setdefault(self.usb_strings["SERIAL_NUMBER"][3:], {}).update(strings)
+
+            return dict(self.usb_strings)
+
+    @staticmethod
+    def clear_info_cache(serial_number=None):
+        """
+        Forgets the cached device information, so it is requested again the next time a device is opened. Needed
+        after updating the firmware of a Supernova, whose cached version would be stale.
+
+        Args:
+        serial_number (str, optional): The serial number of the device to forget, as in its information. All
+                                       the devices by default.
+        """
+        with SupernovaDevice.info_cache_lock:
+            if serial_number is None:
+                SupernovaDevice.info_cache.clear()
+            else:
+                SupernovaDevice.info_cache.pop(serial_number, None)
+
+    @accepts_timeout
+    def __request_usb_strings(self, names):
+        from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
+
         try:
             responses = self.controller.sync_submit([
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'HW_VERSION')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'FW_VERSION')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'SERIAL_NUMBER')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'MANUFACTURER')),
-                lambda id: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, 'PRODUCT_NAME')),
+                lambda id, name=name: self.driver.getUsbString(id, getattr(GetUsbStringSubCommand, name)) for name in names
             ])
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        def _process_device_info(responses):
-            hw_version = responses[0]['message'][3:]
-            fw_version = responses[1]['message'][3:]
-            serial_number = responses[2]['message'][3:]
-            manufacturer = responses[3]['message'][3:]
-            product_name = responses[4]['message'][3:]
-
-            return {
-                "hw_version": hw_version,
-                "fw_version": fw_version,
-                "serial_number": serial_number,
-                "manufacturer": manufacturer,
-                "product_name": product_name,
-            }
-
-        self.mounted = True
-
-        return _process_device_info(responses)
+        return {name: response['message'] for (name, response) in zip(names, responses)}
 
     @staticmethod
     def getAllConnectedSupernovaDevices():
         return getConnectedSupernovaDevicesList()
 
     @staticmethod
-    def openAllConnectedSupernovaDevices():
+    def openAllConnectedSupernovaDevices(max_workers=DEFAULT_OPEN_WORKERS):
+        """
+        Opens all the connected Supernovas, up to 'max_workers' of them at the same time.
+
+        Args:
+        max_workers (int, optional): The maximum number of devices being opened at the same time.
+
+        Returns:
+        list: The opened SupernovaDevice instances, in the order the devices are listed by
+              getAllConnectedSupernovaDevices().
+
+        Raises:
+        Exception: The error of the first device that could not be opened, once the devices that did open are
+                   closed again. Use openAllConnectedSupernovaDevicesWithReport() to get the error of every device
+                   instead.
+        """
+        report = SupernovaDevice.openAllConnectedSupernovaDevicesWithReport(max_workers)
+
+        errors = [failure["error"] for failure in report["failed"] if not isinstance(failure["error"], DeviceAlreadyMountedError)]
+        if errors:
+            for opened in report["opened"]:
+                opened["device"].close()
+            raise errors[0]
+
+        return [opened["device"] for opened in report["opened"]]
+
+    @staticmethod
+    def openAllConnectedSupernovaDevicesWithReport(max_workers=DEFAULT_OPEN_WORKERS):
+        """
+        Opens all the connected Supernovas, up to 'max_workers' of them at the same time, and reports the outcome
+        of every device.
+
+        Args:
+        max_workers (int, optional): The maximum number of devices being opened at the same time.
+
+        Returns:
+        dict: A dictionary with:
+            - "opened": a list of {"path", "serial_number", "device", "info"} dictionaries, one per opened device,
+              with the SupernovaDevice and the information returned by its open() method.
+            - "failed": a list of {"path", "serial_number", "error"} dictionaries, one per device that could not
+              be opened, with the exception raised by open().
+            - "elapsed": the time it took to list and open all the devices, in seconds.
+            Both lists follow the order of getAllConnectedSupernovaDevices().
+        """
+        start = time.perf_counter()
         allDevices = SupernovaDevice.getAllConnectedSupernovaDevices()
-        openedDevices = []
 
-        for device in allDevices:
+        def open_device(device):
             newDevice = SupernovaDevice()
             try:
-                newDevice.open(device["path"])
-                openedDevices.append(newDevice)
-            except DeviceAlreadyMountedError as e:
-                continue
+                return (newDevice, newDevice.open(device["path"]), None)
+            except Exception as e:
+                # Stop the dispatcher threads of the device that didn't open
+                newDevice.close()
+                return (None, None, e)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(allDevices)))) as pool:
+            outcomes = list(pool.map(open_device, allDevices))
+
+        report = {"opened": [], "failed": [], "elapsed": None}
+        for device, (newDevice, info, error) in zip(allDevices, outcomes):
+            entry = {"path": device["path"], "serial_number": device.get("serial_number")}
+            if error is None:
+                report["opened"].append({**entry, "device": newDevice, "info": info})
+            else:
+                report["failed"].append({**entry, "error": error})
 
-        return openedDevices
+        report["elapsed"] = time.perf_counter() - start
+        logger.debug("Opened %d of %d devices in %.3f s", len(report["opened"]), len(allDevices), report["elapsed"])
 
+        return report
+
+    @accepts_timeout
     def measure_analog_signal(self):
         """
         Measures the voltages found in the different pins of the Supernova.
@@ -143,6 +432,9 @@ class SupernovaDevice:
                 }
                 All voltage values are measured and presented in milivolts.
         """
+        from BinhoSupernova.commands.definitions import GET_ANALOG_MEASUREMENTS
+        from .validators import VALIDATORS
+
         try:
             responses = self.controller.sync_submit([
                 lambda id: self.driver.getAnalogMeasurements(id),
@@ -151,14 +443,7 @@ class SupernovaDevice:
             raise BackendError(original_exception=e) from e
         
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "ADC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[GET_ANALOG_MEASUREMENTS].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
@@ -169,6 +454,7 @@ class SupernovaDevice:
             "i3c_low_voltage_vtarg_mV": response["i3c_low_voltage_vtarg_mV"],
             })
 
+    @accepts_timeout
     def get_hardware_version(self):
         """
         Retrieves the hardware version of the connected Supernova device.
@@ -176,48 +462,242 @@ class SupernovaDevice:
         Returns:
         str: The hardware version of the Supernova device.
         """
+        from BinhoSupernova.commands.definitions import GetUsbStringSubCommand
+
         try:
             response = self.controller.sync_submit([
                 lambda transfer_id: self.driver.getUsbString(transfer_id, GetUsbStringSubCommand.HW_VERSION)
             ])
             if response[0]["name"] == "GET USB STRING" and "message" in response[0]:
+                self.usb_strings["HW_VERSION"] = response[0]["message"]
                 return response[0]["message"]
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
         raise BackendError("Unable to retrieve hardware version.")
 
-    def on_notification(self, name, filter_func, handler_func):
-        if name not in self.notification_handlers:
-            self.notification_handlers[name] = (filter_func, handler_func)
+    def batch(self, window=DEFAULT_PIPELINE_WINDOW):
+        """
+        Creates a batch to submit operations of any interface of this device together.
+
+        Args:
+        window (int, optional): Maximum number of requests kept in flight while the batch is submitted.
+
+        Returns:
+        SupernovaBatch: The batch. Operations are added with batch.add(interface.method, *args) and submitted
+        with batch.submit(), or when leaving the 'with' block if the batch is used as a context manager.
+
+        Raises:
+        DeviceNotMountedError: If the device is not open.
+        """
+        if not self.mounted:
+            raise DeviceNotMountedError()
+
+        return SupernovaBatch(self.controller, window)
+
+    def on_notification(self, name, filter_func, handler_func, notification_name=None, dynamic_address=None, execution=INLINE):
+        """
+        Registers a handler for the notifications of the device. A name that is already registered is ignored.
+
+        Args:
+        name (str): The name of the handler, also used to remove it with unsubscribe_notification().
+        filter_func (callable): Receives (name, message) and returns True for the notifications to handle.
+        handler_func (callable): Receives (name, message) for every notification accepted by filter_func.
+        notification_name (str, optional): The name of the notifications the handler is interested in, e.g.
+                                           "I3C IBI NOTIFICATION". When given, filter_func is only evaluated for
+                                           those notifications instead of for every one of them.
+        dynamic_address (int, optional): Along with notification_name, restricts the handler to the
+                                         notifications sent by the I3C target with this dynamic address.
+        execution (str, optional): Where handler_func runs. "inline" (default) runs it on the notification
+                                   dispatcher thread, delaying the next notifications until it returns. "thread"
+                                   runs it on a thread of its own, in arrival order. "pool" runs it on the threads
+                                   shared by the handlers of the device, in no particular order.
+        """
+        self.notification_router.add_handler(name, filter_func, handler_func, notification_name, dynamic_address, execution)
+
+    def subscribe_notification(self, notification_name, handler_func, dynamic_address=None, execution=INLINE):
+        """
+        Subscribes a handler to the notifications with a given name.
+
+        Args:
+        notification_name (str): The name of the notifications, e.g. "I3C IBI NOTIFICATION".
+        handler_func (callable): Receives (notification_name, message) for every matching notification.
+        dynamic_address (int, optional): Only deliver the notifications sent by the I3C target with this
+                                         dynamic address.
+        execution (str, optional): Where handler_func runs: "inline" (default), "thread" or "pool", as in
+                                   on_notification().
+
+        Returns:
+        int: The subscription, to be passed to unsubscribe_notification().
+        """
+        return self.notification_router.subscribe(notification_name, handler_func, dynamic_address, execution=execution)
+
+    def unsubscribe_notification(self, subscription):
+        """
+        Removes a notification handler.
+
+        Args:
+        subscription (int or str): The subscription returned by subscribe_notification(), or the name of a
+                                   handler registered with on_notification().
+
+        Returns:
+        bool: True if a handler was removed.
+        """
+        return self.notification_router.unsubscribe(subscription)
+
+    def notification_stats(self):
+        """
+        Reports the backlog of the notification handlers not running inline.
+
+        Returns:
+        dict: Keyed by subscription or handler name, the 'queue_depth' (and 'max_queue_depth') of notifications
+              waiting for the handler, the notifications it 'handled', the 'errors' it raised and the time
+              notifications waited for it to start ('last_lag', 'max_lag' and 'mean_lag', in seconds).
+        """
+        return self.notification_router.stats()
+
+    def stats(self):
+        """
+        Reports the latency of the transfers completed since the device was created or reset_stats() was called.
+
+        Each transfer is timed in three stages: 'transit', from sending the request to the driver until the
+        response arrives from the Supernova, 'dispatch', from then until the response is handed to the waiting
+        operation, and the 'total' of both.
+
+        Returns:
+        dict: {"interfaces": {...}, "commands": {...}}, mapping each interface (e.g. "I2C") and each command
+              name (e.g. "I2C WRITE") to a dictionary per stage with the 'count' of transfers, their 'mean',
+              'min', 'max', 'p50', 'p90' and 'p99' latencies in seconds, and a logarithmic 'histogram' as a
+              list of (bucket upper bound in seconds, count). Empty if the device collects no stats.
+        """
+        if self.transfer_stats is None:
+            return {}
+
+        return self.transfer_stats.snapshot()
+
+    def reset_stats(self):
+        """
+        Clears the latencies reported by stats().
+        """
+        if self.transfer_stats is not None:
+            self.transfer_stats.reset()
+
+    def set_retry_policy(self, policy, interface=None):
+        """
+        Sets how the transfers failing with a transient error (e.g. an I2C NACK) are retried. Retries happen
+        inside the transfer controller, so they apply to the interface methods, batches and the asyncio
+        front-end alike, and only resend the failing request.
+
+        Args:
+        policy (RetryPolicy): The policy, or None to remove it.
+        interface (str, optional): The interface the policy applies to, e.g. "i2c" or "i3c.controller". Every
+                                   transfer submitted by a method of the interface uses it, configuration
+                                   included. By default, the policy applies to every interface without a policy
+                                   of its own, and to the transfers of the device itself.
+
+        Raises:
+        UnknownInterfaceError: If there is no interface with this name.
+        """
+        if interface is not None and interface not in self.interfaces:
+            raise UnknownInterfaceError()
+
+        self.controller.set_retry_policy(policy, interface)
+
+    def retry_stats(self):
+        """
+        Reports the retries of the transfers since the device was created.
+
+        Returns:
+        dict: Per interface (e.g. "i2c", or "device" for the transfers of the device itself), the number of
+              'retries' sent, of transfers that succeeded after being retried ('recovered'), of transfers that
+              still failed with a transient error after their last attempt ('exhausted') and of retried transfers
+              that failed with an error that is not retried ('failed').
+        """
+        return self.controller.retry_stats()
+
+    def notification_queue_stats(self):
+        """
+        Reports the notifications waiting to be dispatched.
+
+        Returns:
+        dict: The current 'depth' of the notification queue, its 'max_depth' so far, and the number of
+              notifications 'dropped' and 'coalesced' because the queue was full.
+        """
+        return self.notification_queue.stats()
+
+    def start_recording(self, path):
+        """
+        Records the traffic with the device into a file, until stop_recording() is called or the device is closed:
+        every call to the driver, with its arguments and return value, and every response and notification
+        received, with timestamps. The recording can be played back with ReplayDriver, without a Supernova.
+
+        Args:
+        path (str): The path of the file to write.
+
+        Note:
+        - Start the recording before open() to be able to replay the whole session.
+        - A driver assigned after starting the recording is not recorded.
+        """
+        from ..utils.recording import TrafficRecorder
+
+        self.stop_recording()
+
+        recorder = TrafficRecorder(path)
+        recorder.attach(self.driver)
+        self.recorder = recorder
+
+    def stop_recording(self):
+        """
+        Stops recording the traffic with the device, if start_recording() was called.
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
 
     def _push_sdk_response(self, supernova_response, system_message):
         logger.debug("SDK RESPONSE: supernova_response == %s, system_message == %s", supernova_response, system_message)
 
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.response(supernova_response, system_message)
+
         if supernova_response:
             # Check if the id is non-zero (zero is reserved for notifications)
             if supernova_response["id"] != 0:
-                # Add the response to the response queue
-                self.response_queue.put((supernova_response, system_message))
+                if self.transfer_stats is not None:
+                    self.transfer_stats.received(supernova_response["id"])
+                if self.direct_dispatch:
+                    # Complete the transfer right away, on the driver thread
+                    try:
+                        self._process_sdk_response(supernova_response, system_message)
+                    except Exception:
+                        logger.exception("Error dispatching %s", supernova_response)
+                else:
+                    # Add the response to the response queue
+                    self.response_queue.put((supernova_response, system_message))
             else:
                 # Add the response to the notification queue for id zero
                 self.notification_queue.put((supernova_response, system_message))
 
     def _pull_sdk_response(self):
-        while self.running:
-            try:
-                supernova_response, system_message = self.response_queue.get(timeout=1)
-                self._process_sdk_response(supernova_response, system_message)
-            except queue.Empty:
-                continue
+        self.__dispatch(self.response_queue, self._process_sdk_response)
 
     def _pull_sdk_notification(self):
-        while self.running:
+        self.__dispatch(self.notification_queue, self._process_sdk_notification)
+
+    def __dispatch(self, source_queue, process):
+        # Blocks until there is something to process, close() queues _SHUTDOWN to end the loop
+        while True:
+            item = source_queue.get()
+            if item is _SHUTDOWN:
+                return
+
+            (supernova_response, system_message) = item
             try:
-                supernova_response, system_message = self.notification_queue.get(timeout=1)
-                self._process_sdk_notification(supernova_response, system_message)
-            except queue.Empty:
-                continue
+                process(supernova_response, system_message)
+            except Exception:
+                # A failing handler must not stop the dispatch of the next messages
+                logger.exception("Error dispatching %s", supernova_response)
 
     def _process_sdk_response(self, supernova_response, system_message):
         if supernova_response == None:
@@ -230,9 +710,7 @@ class SupernovaDevice:
             return
 
     def _process_sdk_notification(self, supernova_response, system_message):
-        for name, (filter_func, handler_func) in self.notification_handlers.items():
-            if filter_func(name, supernova_response):
-                handler_func(name, supernova_response)
+        self.notification_router.route(supernova_response)
 
     def create_interface(self, interface_name):
         if not self.mounted:
@@ -241,18 +719,44 @@ class SupernovaDevice:
         if not interface_name in self.interfaces:
             raise UnknownInterfaceError()
 
-        [interface, interface_class] = self.interfaces[interface_name]
+        with self.interfaces_lock:
+            [interface, interface_class] = self.interfaces[interface_name]
 
-        if interface is None:
-            if interface_name == "gpio":
-                hardware_version = self.get_hardware_version()
-                self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification, hardware_version)
-            else:
-                self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification)
-            interface = self.interfaces[interface_name][0]
+            if interface is None:
+                interface_class = _load_interface_class(interface_class)
+                if interface_name == "gpio":
+                    # Shared with the device information, and cached by serial number
+                    hardware_version = self._get_usb_strings(["HW_VERSION"])["HW_VERSION"]
+                    self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification, hardware_version)
+                else:
+                    self.interfaces[interface_name][0] = interface_class(self.driver, self.controller, self.on_notification)
+                interface = self.interfaces[interface_name][0]
 
         return interface
 
     def close(self):
+        """
+        Closes the connection with the device and stops the threads dispatching its responses and notifications,
+        as well as the threads of the notification handlers.
+
+        The time elapsed until the dispatcher threads ended is logged and kept in the 'shutdown_latency'
+        attribute, in seconds.
+        """
+        start = time.perf_counter()
+
         self.driver.close()
         self.running = False
+
+        self.response_queue.put(_SHUTDOWN)
+        self.notification_queue.put(_SHUTDOWN)
+
+        for thread in (self.process_response_thread, self.process_notifications_thread):
+            # close() may be called from a notification handler, which runs on one of these threads
+            if thread is not threading.current_thread():
+                thread.join()
+
+        self.notification_router.close()
+        self.stop_recording()
+
+        self.shutdown_latency = time.perf_counter() - start
+        logger.debug("Device closed, dispatcher threads stopped in %.6f s", self.shutdown_latency)
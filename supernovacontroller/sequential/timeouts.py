@@ -0,0 +1,67 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+from supernovacontroller.errors import BackendError, TransferTimeoutError
+
+# Timeout of the call in progress on each thread, set by the 'timeout' argument of the interface methods
+_call = threading.local()
+
+def get_call_timeout():
+    """
+    Returns:
+    float: The timeout given to the call in progress on the current thread, or None to use the default timeout
+           of the device.
+    """
+    return getattr(_call, "timeout", None)
+
+@contextmanager
+def call_timeout(timeout):
+    """
+    Makes the transfers waited for by the current thread, inside the 'with' block, time out after 'timeout'
+    seconds instead of the default timeout of the device.
+    """
+    previous = getattr(_call, "timeout", None)
+    _call.timeout = timeout
+    try:
+        yield
+    finally:
+        _call.timeout = previous
+
+def accepts_timeout(func):
+    """
+    Adds a 'timeout' keyword argument to a method waiting for the device. The transfers it waits for longer than
+    'timeout' seconds are cancelled and TransferTimeoutError is raised. Without it, the default timeout of the
+    device applies.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, timeout=None, **kwargs):
+        try:
+            if timeout is None:
+                return func(*args, **kwargs)
+
+            with call_timeout(timeout):
+                return func(*args, **kwargs)
+        except BackendError as e:
+            # The methods wrap every error of the transfer controller, timeouts must stand out
+            if isinstance(e.original_exception, TransferTimeoutError):
+                raise e.original_exception from None
+            raise
+
+    return wrapper
+
+def timeout_argument(cls):
+    """
+    Class decorator applying accepts_timeout() to the public methods of an interface, except the ones that
+    already have a 'timeout' argument of their own.
+    """
+    import inspect
+
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attribute):
+            continue
+        if "timeout" in inspect.signature(attribute).parameters:
+            continue
+        setattr(cls, name, accepts_timeout(attribute))
+
+    return cls
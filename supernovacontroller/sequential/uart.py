@@ -3,10 +3,16 @@ from transfer_controller import TransferController
 from BinhoSupernova.Supernova import Supernova
 from BinhoSupernova.commands.definitions import (
     UartControllerBaudRate, UartControllerParity, UartControllerDataSize,
-    UartControllerStopBit, COMMANDS_DICTIONARY,
-    UART_CONTROLLER_INIT, UART_CONTROLLER_SET_PARAMETERS, UART_CONTROLLER_SEND
+    UartControllerStopBit,
+    UART_CONTROLLER_INIT, UART_CONTROLLER_SET_PARAMETERS, UART_CONTROLLER_SEND, UART_CONTROLLER_RECEIVE_NOTIFICATION,
+    SET_I2C_SPI_UART_BUS_VOLTAGE, USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE
 )
 from supernovacontroller.errors import BackendError
+from .locking import serialized
+from .retry import submits_for
+from .timeouts import timeout_argument
+from .validators import VALIDATORS
+import threading
 from threading import Event
 
 class UARTNotificationHandler:
@@ -25,7 +31,8 @@ class UARTNotificationHandler:
 
         self.last_notification = Event()
         self.last_notification_message = None
-        notification_subscription(name="UART Receive Notification", filter_func=self.__is_uart_receive, handler_func=self.__handle_uart_receive)
+        notification_subscription(name="UART Receive Notification", filter_func=self.__is_uart_receive, handler_func=self.__handle_uart_receive,
+                                  notification_name="UART CONTROLLER RECEIVE MESSAGE")
 
     def wait_for_notification(self, time_out):
         """
@@ -78,6 +85,8 @@ class UARTNotificationHandler:
         self.last_notification_message = message
         self.last_notification.set()
         
+@submits_for("uart")
+@timeout_argument
 class SupernovaUARTBlockingInterface:
     # Private Methods
     def __init__(self, driver: Supernova, controller: TransferController, notification_subscription):
@@ -95,6 +104,8 @@ class SupernovaUARTBlockingInterface:
         self.driver = driver
         # Transfer controller instance
         self.controller = controller
+        # Held by the methods changing the configuration of the interface, see serialized()
+        self.lock = threading.RLock()
         # UART communication parameters
         self.baudrate = UartControllerBaudRate.UART_BAUD_9600
         self.parity = UartControllerParity.UART_NO_PARITY
@@ -147,37 +158,7 @@ class SupernovaUARTBlockingInterface:
             self.stop_bit is not None
         ])
 
-    def __check_if_response_is_correct(self, response):
-        """
-        Checks if the response received from the Supernova indicates successful execution of the UART method.
-
-        Args:
-        response (dict): A dictionary containing response data from the Supernova UART request.
-
-        Returns:
-        bool: True if the response indicates successful, False otherwise.
-        """
-
-        # Check if the USB, manager or driver had issues handling the UART request
-        return len(self.__get_response_errors(response)) == 0
-    
-    def __get_response_errors(self, response: dict):
-        """
-        Checks if the response received any errors from the Supernova and returns them (if any).
-
-        Args:
-        response (dict): A dictionary containing response data from the Supernova UART request.
-
-        Returns:
-        [ String ]: List of errors, in order usb_error, manager_error and driver_error.
-        """
-
-        result = []
-        if response["usb_error"] != "CMD_SUCCESSFUL": result.append(response["usb_error"])
-        if response["manager_error"] != "UART_NO_ERROR": result.append(response["manager_error"])
-        if response["driver_error"] != "NO_TRANSFER_ERROR": result.append(response["driver_error"])
-        return result
-    
+    @serialized
     def set_bus_voltage(self, voltage_mv: int):
         """
         Sets the bus voltage for the UART interface to a specified value.
@@ -213,8 +194,8 @@ class SupernovaUARTBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"] == "SET I2C-SPI-UART BUS VOLTAGE" and responses[0]["result"] == "SYS_NO_ERROR"
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[SET_I2C_SPI_UART_BUS_VOLTAGE].is_success(responses[0])
 
         # If successful, update the bus voltage
         if response_success:
@@ -227,6 +208,7 @@ class SupernovaUARTBlockingInterface:
 
         return result
 
+    @serialized
     def use_external_uart_power_source(self):
         """
         Sets the bus to utilize the external power source voltage 
@@ -246,20 +228,14 @@ class SupernovaUARTBlockingInterface:
             raise BackendError(original_exception=e) from e
 
         response = responses[0]
-        errors = []
-
-        if response["usb_error"] != "CMD_SUCCESSFUL":
-            errors.append(response["usb_error"])
-        if response["manager_error"] != "SYS_NO_ERROR":
-            errors.append(response["manager_error"])
-        if response["driver_error"] != "DAC_DRIVER_NO_ERROR":
-            errors.append(response["driver_error"])
+        errors = VALIDATORS[USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE].errors(response)
 
         if len(errors) > 0:
             return (False, errors)
 
         return (True, response["external_voltage_mV"])
 
+    @serialized
     def init_bus(self, baudrate: UartControllerBaudRate=None, hardware_handshake: bool=None , parity: UartControllerParity=None, data_size: UartControllerDataSize=None, stop_bit: UartControllerStopBit=None):
         """
         Initializes the UART bus with specified parameters.
@@ -305,11 +281,12 @@ class SupernovaUARTBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"].strip() == COMMANDS_DICTIONARY[UART_CONTROLLER_INIT]["name"].strip() and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[UART_CONTROLLER_INIT].is_success(responses[0])
 
-        return (response_success, "Success" if response_success else self.__get_response_errors(responses[0]))
+        return (response_success, "Success" if response_success else VALIDATORS[UART_CONTROLLER_INIT].errors(responses[0]))
 
+    @serialized
     def set_parameters(self, baudrate: UartControllerBaudRate=None, hardware_handshake: bool=None , parity: UartControllerParity=None, data_size: UartControllerDataSize=None, stop_bit: UartControllerStopBit=None):
         """
         Sets UART communication parameters.
@@ -355,11 +332,12 @@ class SupernovaUARTBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
 
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success = responses[0]["name"].strip() == COMMANDS_DICTIONARY[UART_CONTROLLER_SET_PARAMETERS]["name"].strip() and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[UART_CONTROLLER_SET_PARAMETERS].is_success(responses[0])
 
-        return (response_success, "Success" if response_success else self.__get_response_errors(responses[0]))
+        return (response_success, "Success" if response_success else VALIDATORS[UART_CONTROLLER_SET_PARAMETERS].errors(responses[0]))
 
+    @serialized
     def get_parameters(self):
         """
         Retrieves the current UART communication parameters.
@@ -404,10 +382,10 @@ class SupernovaUARTBlockingInterface:
         except Exception as e:
             raise BackendError(original_exception=e) from e
         
-        # Check if the response is of the expected type (by name) and it was successful 
-        response_success =  responses[0]["name"].strip() == COMMANDS_DICTIONARY[UART_CONTROLLER_SEND]["name"].strip() and self.__check_if_response_is_correct(responses[0])
+        # Check if the response is of the expected type and it was successful 
+        response_success = VALIDATORS[UART_CONTROLLER_SEND].is_success(responses[0])
             
-        return (response_success, "Success" if response_success else self.__get_response_errors(responses[0]))
+        return (response_success, "Success" if response_success else VALIDATORS[UART_CONTROLLER_SEND].errors(responses[0]))
     
     def wait_for_notification(self, timeout):
         """
@@ -433,10 +411,11 @@ class SupernovaUARTBlockingInterface:
             return (received_data_flag, "Timeout occurred while waiting for the UART receive notification")
         
         # Check if the reception of the UART message was successful
-        response_ok = self.__check_if_response_is_correct(notification)
+        validator = VALIDATORS[UART_CONTROLLER_RECEIVE_NOTIFICATION]
+        response_ok = validator.accepts(notification)
         # If there's an error in the received notification, return an error message
         if response_ok is False:
-            return (response_ok, self.__get_response_errors(notification))
+            return (response_ok, validator.errors(notification))
         
         # Return the received payload if the notification is correct
         return (response_ok, notification["payload"])    
\ No newline at end of file
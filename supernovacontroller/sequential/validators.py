@@ -0,0 +1,211 @@
+from BinhoSupernova.commands.definitions import (
+    COMMANDS_DICTIONARY,
+    I2C_SET_PARAMETERS, I2C_WRITE, I2C_WRITE_NO_STOP, I2C_READ, I2C_READ_FROM, I2C_SET_PULL_UP_RESISTORS,
+    I3C_INIT_BUS, I3C_TRANSFER,
+    I3C_TRIGGER_TARGET_RESET_PATTERN, I3C_TRIGGER_EXIT_PATTERN,
+    SPI_CONTROLLER_INIT, SPI_CONTROLLER_SET_PARAMETERS, SPI_CONTROLLER_TRANSFER,
+    UART_CONTROLLER_INIT, UART_CONTROLLER_SET_PARAMETERS, UART_CONTROLLER_SEND, UART_CONTROLLER_RECEIVE_NOTIFICATION,
+    GPIO_CONFIGURE_PIN, GPIO_DIGITAL_WRITE, GPIO_DIGITAL_READ, GPIO_SET_INTERRUPT, GPIO_DISABLE_INTERRUPT,
+    SET_I3C_BUS_VOLTAGE, SET_I2C_SPI_UART_BUS_VOLTAGE, USE_EXT_SRC_I3C_BUS_VOLTAGE,
+    USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE, GET_I3C_CONNECTORS_STATUS, GET_ANALOG_MEASUREMENTS,
+)
+
+def _getter(field):
+    if isinstance(field, tuple):
+        # A path into nested dictionaries, e.g. ("header", "result")
+        def get(response):
+            value = response
+            for key in field:
+                value = value[key]
+            return value
+        return get
+
+    return lambda response: response[field]
+
+# Command id of each response name, for the responses built without the command id
+_COMMAND_IDS = {command["name"].strip(): command_id for command_id, command in COMMANDS_DICTIONARY.items()}
+
+def command_of(response):
+    """
+    Returns:
+    int: The id of the command a response answers, or None if it is unknown.
+    """
+    command = response.get("command")
+    if command is None:
+        # Some names have trailing spaces
+        command = _COMMAND_IDS.get(str(response.get("name", "")).strip())
+
+    return command
+
+class ResponseValidator:
+    """
+    Checks the responses to one command of the Supernova.
+
+    A response is successful if it answers the command and each of the checked fields holds one of its accepted
+    values. A field holding a list, like the 'driver_result' of some I3C commands, is accepted if any of its
+    items is.
+
+    The checks are bound into closures when the validator is created, so checking a response costs a few
+    dictionary and set lookups.
+    """
+
+    __slots__ = ("command", "name", "fields", "checks", "accepts", "is_success")
+
+    def __init__(self, command, checks):
+        """
+        Args:
+        command (int): The command id, as in BinhoSupernova.commands.definitions.
+        checks (dict): The accepted values of each checked field, in the order errors are reported. Fields are the
+                       keys of the response, or tuples of keys for nested fields.
+        """
+        self.command = command
+        self.name = COMMANDS_DICTIONARY[command]["name"].strip()
+        self.fields = tuple(checks)
+        self.checks = tuple((_getter(field), frozenset(accepted)) for field, accepted in checks.items())
+
+        checks = self.checks
+        check = self.__accepts
+        expected = command
+
+        if len(checks) == 1 and not isinstance(self.fields[0], tuple):
+            # Most commands check a single top level field
+            field = self.fields[0]
+            accepted = checks[0][1]
+
+            def accepts(response):
+                try:
+                    return response[field] in accepted
+                except TypeError:
+                    # Lists are not hashable, a list field is checked item by item instead
+                    return check(response)
+        else:
+            def accepts(response):
+                try:
+                    for (get, accepted) in checks:
+                        if get(response) not in accepted:
+                            return False
+                    return True
+                except TypeError:
+                    return check(response)
+
+        def is_success(response):
+            command = response.get("command")
+            if command is None:
+                command = command_of(response)
+            if command != expected:
+                return False
+            return accepts(response)
+
+        self.accepts = accepts
+        self.is_success = is_success
+
+    def __accepts(self, response):
+        for (get, accepted) in self.checks:
+            value = get(response)
+            if type(value) is list:
+                if accepted.isdisjoint(value):
+                    return False
+            elif value not in accepted:
+                return False
+
+        return True
+
+    def matches(self, response):
+        """
+        Returns:
+        bool: True if the response answers the command of the validator.
+        """
+        return command_of(response) == self.command
+
+    def errors(self, response):
+        """
+        Returns:
+        list: The values of the checked fields that are not accepted, in the order of the checks. The items of
+              rejected list fields are all reported.
+        """
+        errors = []
+        for (get, accepted) in self.checks:
+            value = get(response)
+            if type(value) is list:
+                if accepted.isdisjoint(value):
+                    errors.extend(value)
+            elif value not in accepted:
+                errors.append(value)
+
+        return errors
+
+    def __repr__(self):
+        return f"ResponseValidator({self.command:#04x} {self.name!r}, fields={self.fields})"
+
+# Accepted values shared by several commands
+_I2C_TRANSFER = {"status": ("NO_TRANSFER_ERROR",)}
+_BUS_VOLTAGE = {"result": ("SYS_NO_ERROR",)}
+_EXTERNAL_BUS_VOLTAGE = {
+    "usb_error": ("CMD_SUCCESSFUL",),
+    "manager_error": ("SYS_NO_ERROR",),
+    "driver_error": ("DAC_DRIVER_NO_ERROR",),
+}
+_I3C_PATTERN = {
+    "usb_result": ("CMD_SUCCESSFUL",),
+    "manager_result": ("I3C_CONTROLLER_MGR_NO_ERROR",),
+    "driver_result": ("NO_TRANSFER_ERROR",),
+}
+_SPI_CONTROLLER = {
+    "usb_error": ("CMD_SUCCESSFUL",),
+    "manager_error": ("SPI_NO_ERROR", "SPI_ALREADY_INITIALIZED_ERROR"),
+    "driver_error": ("SPI_DRIVER_NO_TRANSFER_ERROR",),
+}
+_UART_CONTROLLER = {
+    "usb_error": ("CMD_SUCCESSFUL",),
+    "manager_error": ("UART_NO_ERROR",),
+    "driver_error": ("NO_TRANSFER_ERROR",),
+}
+_GPIO = {
+    "usb_error": ("CMD_SUCCESSFUL",),
+    "manager_error": ("GPIO_NO_ERROR",),
+    "driver_error": ("GPIO_DRIVER_NO_ERROR",),
+}
+
+# Validator of the responses to each command, by command id
+VALIDATORS = {validator.command: validator for validator in (
+    ResponseValidator(I2C_SET_PARAMETERS, {"completed": (0,)}),
+    ResponseValidator(I2C_WRITE, _I2C_TRANSFER),
+    ResponseValidator(I2C_WRITE_NO_STOP, _I2C_TRANSFER),
+    ResponseValidator(I2C_READ, _I2C_TRANSFER),
+    ResponseValidator(I2C_READ_FROM, _I2C_TRANSFER),
+    ResponseValidator(I2C_SET_PULL_UP_RESISTORS, {
+        "usb_error": ("CMD_SUCCESSFUL",),
+        "manager_error": ("I2C_NO_ERROR",),
+        "driver_error": ("POTENTIOMETER_SET_VALUE_NO_ERROR",),
+    }),
+    ResponseValidator(I3C_INIT_BUS, {"result": ("DAA_SUCCESS",), "errors": ("NO_TRANSFER_ERROR",)}),
+    ResponseValidator(I3C_TRANSFER, {("header", "result"): ("I3C_TRANSFER_SUCCESS", "DAA_SUCCESS")}),
+    ResponseValidator(I3C_TRIGGER_TARGET_RESET_PATTERN, _I3C_PATTERN),
+    ResponseValidator(I3C_TRIGGER_EXIT_PATTERN, _I3C_PATTERN),
+    ResponseValidator(SPI_CONTROLLER_INIT, _SPI_CONTROLLER),
+    ResponseValidator(SPI_CONTROLLER_SET_PARAMETERS, _SPI_CONTROLLER),
+    ResponseValidator(SPI_CONTROLLER_TRANSFER, _SPI_CONTROLLER),
+    ResponseValidator(UART_CONTROLLER_INIT, _UART_CONTROLLER),
+    ResponseValidator(UART_CONTROLLER_SET_PARAMETERS, _UART_CONTROLLER),
+    ResponseValidator(UART_CONTROLLER_SEND, _UART_CONTROLLER),
+    ResponseValidator(UART_CONTROLLER_RECEIVE_NOTIFICATION, _UART_CONTROLLER),
+    ResponseValidator(GPIO_CONFIGURE_PIN, _GPIO),
+    ResponseValidator(GPIO_DIGITAL_WRITE, _GPIO),
+    ResponseValidator(GPIO_DIGITAL_READ, _GPIO),
+    ResponseValidator(GPIO_SET_INTERRUPT, _GPIO),
+    ResponseValidator(GPIO_DISABLE_INTERRUPT, _GPIO),
+    ResponseValidator(SET_I3C_BUS_VOLTAGE, _BUS_VOLTAGE),
+    ResponseValidator(SET_I2C_SPI_UART_BUS_VOLTAGE, _BUS_VOLTAGE),
+    ResponseValidator(USE_EXT_SRC_I3C_BUS_VOLTAGE, _EXTERNAL_BUS_VOLTAGE),
+    ResponseValidator(USE_EXT_SRC_I2C_SPI_UART_BUS_VOLTAGE, _EXTERNAL_BUS_VOLTAGE),
+    ResponseValidator(GET_I3C_CONNECTORS_STATUS, {
+        "usb_error": ("CMD_SUCCESSFUL",),
+        "manager_error": ("SYS_NO_ERROR",),
+        "driver_error": ("DRIVER_NO_ERROR",),
+    }),
+    ResponseValidator(GET_ANALOG_MEASUREMENTS, {
+        "usb_error": ("CMD_SUCCESSFUL",),
+        "manager_error": ("SYS_NO_ERROR",),
+        "driver_error": ("ADC_DRIVER_NO_ERROR",),
+    }),
+)}
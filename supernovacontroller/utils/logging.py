@@ -1,9 +1,20 @@
-import inspect
+import itertools
 import os
 import logging
 from functools import wraps
 
+_logging_configured = False
+
 def setup_logging():
+    """
+    Configures the root logger from the PYTHON_LOG_PATH and PYTHON_LOG_LEVEL environment variables.
+    It runs when the first device is opened rather than when the package is imported, and only once.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
     # Check if the root logger is already configured
     root_logger = logging.getLogger()
     if root_logger.hasHandlers():
@@ -38,36 +49,79 @@ def setup_logging():
         root_logger.setLevel(log_level)
 
 # Export the logger, named for this module
-setup_logging()
-
 logger = logging.getLogger(__name__)
 
-def log_function_call(func, logger = logger):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        signature = inspect.signature(func)
+def _sampling_from_environment():
+    try:
+        return max(1, int(os.environ.get('PYTHON_LOG_SAMPLING', '1')))
+    except ValueError:
+        return 1
+
+def log_function_call(func, logger = logger, sample_every = None):
+    """
+    Wraps a function to log its calls, with their arguments and return value, at DEBUG level, and the exceptions
+    it raises.
+
+    Args:
+    func (callable): The function to wrap.
+    logger (logging.Logger, optional): The logger to log to.
+    sample_every (int, optional): Log only one in every 'sample_every' calls. Defaults to the PYTHON_LOG_SAMPLING
+                                  environment variable, or to every call if it isn't set.
+
+    Note:
+    - While the logger is not enabled for DEBUG, or for the calls left out by sampling, the arguments are neither
+      bound nor formatted. Exceptions are always logged.
+    - The signature of the function is inspected once, on the first logged call.
+    """
+    if sample_every is None:
+        sample_every = _sampling_from_environment()
+
+    calls = itertools.count()
+    signature = None
+
+    def bind_arguments(args, kwargs):
+        nonlocal signature
+        if signature is None:
+            import inspect
+            try:
+                signature = inspect.signature(func)
+            except (TypeError, ValueError):
+                # Some builtins have no signature, their arguments are logged as passed
+                signature = False
+
+        if signature is False:
+            return {"args": args, "kwargs": kwargs}
+
         bound_args = signature.bind(*args, **kwargs)
         bound_args.apply_defaults()
-        # Log function name and arguments
-        logger.debug("Calling %s with args: %s", func.__name__, bound_args.arguments)
+        return bound_args.arguments
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        log_call = logger.isEnabledFor(logging.DEBUG) and (sample_every == 1 or next(calls) % sample_every == 0)
+
+        if log_call:
+            # Log function name and arguments
+            logger.debug("Calling %s with args: %s", func.__name__, bind_arguments(args, kwargs))
 
         try:
             # Call the original function
             result = func(*args, **kwargs)
-
-            # Log the return value
-            logger.debug("%s returned %s", func.__name__, result)
-            return result
-
         except Exception as e:
             # Log the exception with traceback
             logger.exception("Exception occurred in %s: %s", func.__name__, e)
             raise  # Re-raise the exception after logging it
 
+        if log_call:
+            # Log the return value
+            logger.debug("%s returned %s", func.__name__, result)
+
+        return result
+
     return wrapper
 
 # For logging all methods in some class vvvvvv
-def log_instance_method_calls(instance: object, enabled: bool):
+def log_instance_method_calls(instance: object, enabled: bool, sample_every = None):
     if not enabled:
         return instance
 
@@ -76,7 +130,7 @@ def log_instance_method_calls(instance: object, enabled: bool):
         if not attr_name.startswith('_'):  # Avoid private and protected methods
             attr = getattr(instance, attr_name)
             if callable(attr) and not hasattr(attr, "_wrapped"):  # Avoid double wrapping
-                wrapped = log_function_call(attr, classLogger)
+                wrapped = log_function_call(attr, classLogger, sample_every)
                 wrapped._wrapped = True
                 setattr(instance, attr_name, wrapped)
 
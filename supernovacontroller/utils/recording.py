@@ -0,0 +1,339 @@
+import enum
+import io
+import pickle
+import struct
+import threading
+import time
+
+from supernovacontroller.errors import ReplayMismatchError
+
+# Identifies recording files, followed by the version of the format
+MAGIC = b"SNVREC"
+VERSION = 2
+
+# Pickle protocol of the payloads, fixed so recordings read the same on every Python version
+PICKLE_PROTOCOL = 4
+
+# Kinds of records
+COMMAND = 1   # (sequence, method name, transfer id, args, kwargs), written before the driver is called
+RESULT = 2    # (sequence, raised, value), the value returned (or the error raised) by the driver call
+RESPONSE = 3  # (supernova_response, system_message), as received by the driver callback
+
+# Every record: kind, seconds since the recording started and size of the pickled payload
+_RECORD_HEADER = struct.Struct("<BdI")
+
+# Driver methods whose calls are not recorded
+_IGNORED_METHODS = ("onEvent",)
+
+# Methods of a driver that were not instance attributes before being wrapped
+_MISSING = object()
+
+def _plain(value):
+    """
+    Converts a value into plain built-in types, the only ones a recording holds. Enums are kept by name, and
+    anything else unknown (e.g. callbacks) by its repr.
+    """
+    if value is None or type(value) in (bool, int, float, str, bytes):
+        return value
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, dict):
+        return {_plain(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_plain(item) for item in value)
+    if isinstance(value, (list, set, frozenset)):
+        return [_plain(item) for item in value]
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    for plain_type in (int, float, str):
+        if isinstance(value, plain_type):
+            return plain_type(value)
+
+    return repr(value)
+
+class _PlainUnpickler(pickle.Unpickler):
+    """
+    Loads the payloads of a recording, which only hold plain built-in values: a pickle referring to any class or
+    function is rejected instead of importing it.
+    """
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Unexpected {module}.{name} in a recording")
+
+def _transfer_id(args, kwargs):
+    # Transfer ids are passed first, either positionally or as 'id'
+    if "id" in kwargs:
+        return kwargs["id"]
+    if args and type(args[0]) is int:
+        return args[0]
+    return None
+
+def read_recording(path):
+    """
+    Reads a file written by TrafficRecorder.
+
+    Args:
+    path (str): The path of the recording.
+
+    Returns:
+    generator: A (kind, timestamp, payload) tuple per record, in the order they were written. The timestamp is
+               in seconds since the recording started.
+
+    Raises:
+    ValueError: If the file is not a recording.
+    """
+    with open(path, "rb") as file:
+        header = file.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or header[len(MAGIC):] != bytes([VERSION]):
+            raise ValueError(f"{path} is not a recording of version {VERSION}")
+
+        while True:
+            record_header = file.read(_RECORD_HEADER.size)
+            if len(record_header) < _RECORD_HEADER.size:
+                # A recording interrupted in the middle of a record ends at the last complete one
+                return
+
+            (kind, timestamp, size) = _RECORD_HEADER.unpack(record_header)
+            payload = file.read(size)
+            if len(payload) < size:
+                return
+
+            yield (kind, timestamp, _PlainUnpickler(io.BytesIO(payload)).load())
+
+class TrafficRecorder:
+    """
+    Writes the traffic of a SupernovaDevice into a binary file: the calls to the methods of its driver, with
+    their arguments and return value, and the responses and notifications received from the driver.
+
+    The file starts with MAGIC and the VERSION of the format. Each record is a small fixed header (kind, timestamp
+    and size) followed by its payload, made of plain built-in values pickled with PICKLE_PROTOCOL, so recording
+    stays cheap enough to be left on while reproducing a failure.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + bytes([VERSION]))
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.sequence = 0
+        # (driver, {method name: attribute of the instance before it was wrapped}) of every attached driver
+        self.attached = []
+
+    def __write(self, kind, payload):
+        data = pickle.dumps(payload, PICKLE_PROTOCOL)
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(_RECORD_HEADER.pack(kind, time.perf_counter() - self.start, len(data)) + data)
+
+    def command(self, name, args, kwargs):
+        """
+        Records a driver call about to be made.
+
+        Returns:
+        int: The sequence number of the call, to record its result.
+        """
+        with self.lock:
+            sequence = self.sequence
+            self.sequence += 1
+
+        self.__write(COMMAND, (sequence, name, _plain(_transfer_id(args, kwargs)), _plain(args), _plain(kwargs)))
+
+        return sequence
+
+    def result(self, sequence, value, raised=False):
+        self.__write(RESULT, (sequence, raised, _plain(value)))
+
+    def response(self, supernova_response, system_message):
+        self.__write(RESPONSE, (_plain(supernova_response), _plain(system_message)))
+
+    def attach(self, driver):
+        """
+        Records the calls to the public methods of a driver, until close() is called.
+        """
+        replaced = {}
+        for name in dir(driver):
+            if name.startswith("_") or name in _IGNORED_METHODS:
+                continue
+
+            method = getattr(driver, name)
+            if callable(method):
+                replaced[name] = driver.__dict__.get(name, _MISSING)
+                setattr(driver, name, self.__wrap(name, method))
+
+        self.attached.append((driver, replaced))
+
+    def __wrap(self, name, method):
+        def wrapper(*args, **kwargs):
+            # Recorded before the call, the response may arrive before the driver returns
+            sequence = self.command(name, args, kwargs)
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                self.result(sequence, f"{type(e).__name__}: {e}", raised=True)
+                raise
+
+            self.result(sequence, result)
+            return result
+
+        return wrapper
+
+    def close(self):
+        """
+        Stops recording, restoring the methods of the drivers, and closes the file.
+        """
+        for (driver, replaced) in self.attached:
+            for name, attribute in replaced.items():
+                if attribute is _MISSING:
+                    delattr(driver, name)
+                else:
+                    setattr(driver, name, attribute)
+        self.attached = []
+
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+class ReplayDriver:
+    """
+    A driver playing back a recording written by TrafficRecorder, to be assigned to SupernovaDevice.driver.
+
+    Every call returns the value the recorded call returned, and the responses and notifications recorded
+    after it are delivered to the callback registered with onEvent(), from a thread of their own like the
+    real driver does. The transfer ids of the responses are translated to the ids of the replayed calls, so the
+    device doesn't need to generate the same ids as when the traffic was recorded.
+
+    Usage:
+        device = SupernovaDevice()
+        device.driver = ReplayDriver("failure.snvrec")
+        device.open()
+        ...  # the same operations that were recorded
+
+    Note:
+    - The calls must be made in the recorded order, a different call raises ReplayMismatchError. Recordings of
+      several threads using the device at the same time may not replay.
+    - SupernovaDevice.info_cache must be in the same state as when recording, and the device information read
+      in the same order, as they decide which device information strings are requested and when.
+    """
+
+    def __init__(self, path, timing=False):
+        """
+        Args:
+        path (str): The path of the recording.
+        timing (bool, optional): If True, responses are delivered after the same delay since their preceding
+                                 call as when they were recorded. By default they are delivered as soon as
+                                 that call is replayed.
+        """
+        self.path = path
+        self.timing = timing
+        self.commands = []
+        self.results = {}
+        # (number of calls recorded before the response, timestamp, response, system_message)
+        self.responses = []
+
+        for (kind, timestamp, payload) in read_recording(path):
+            if kind == COMMAND:
+                self.commands.append((timestamp,) + tuple(payload))
+            elif kind == RESULT:
+                self.results[payload[0]] = (payload[1], payload[2])
+            elif kind == RESPONSE:
+                self.responses.append((len(self.commands), timestamp, payload[0], payload[1]))
+
+        self.condition = threading.Condition()
+        self.callback = None
+        self.replayed = 0
+        # Replay time of every replayed call
+        self.replayed_at = []
+        # Recorded transfer id -> transfer id of the replayed call
+        self.transfer_ids = {}
+        self.delivered = 0
+        self.closed = False
+
+        self.delivery_thread = threading.Thread(target=self.__deliver, daemon=True)
+        self.delivery_thread.start()
+
+    def onEvent(self, callback):
+        with self.condition:
+            self.callback = callback
+            self.condition.notify_all()
+
+    def close(self, *args, **kwargs):
+        # Closing is always possible, the replay may stop before the end of the recording
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            next_call = self.commands[self.replayed][2] if self.replayed < len(self.commands) else None
+
+        if next_call == "close":
+            return self.__replay("close", args, kwargs)
+
+        return None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return lambda *args, **kwargs: self.__replay(name, args, kwargs)
+
+    def __replay(self, name, args, kwargs):
+        with self.condition:
+            if self.replayed >= len(self.commands):
+                raise ReplayMismatchError(f"{name} was called after the end of the recording")
+
+            (_, sequence, recorded_name, recorded_id, _, _) = self.commands[self.replayed]
+            if recorded_name != name:
+                raise ReplayMismatchError(f"{name} was called, the recording expected {recorded_name}")
+
+            transfer_id = _transfer_id(args, kwargs)
+            if recorded_id is not None and transfer_id is not None:
+                self.transfer_ids[recorded_id] = transfer_id
+
+            self.replayed += 1
+            self.replayed_at.append(time.perf_counter())
+            self.condition.notify_all()
+
+        (raised, value) = self.results.get(sequence, (False, None))
+        if raised:
+            raise RuntimeError(value)
+
+        return value
+
+    def __deliver(self):
+        for (commands_before, timestamp, response, system_message) in self.responses:
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed or (self.callback is not None and self.replayed >= commands_before))
+                if self.closed:
+                    return
+
+                callback = self.callback
+                if commands_before and self.timing:
+                    delay = timestamp - self.commands[commands_before - 1][0]
+                    due = self.replayed_at[commands_before - 1] + delay
+                else:
+                    due = None
+
+                if isinstance(response, dict) and response.get("id") in self.transfer_ids:
+                    response = dict(response, id=self.transfer_ids[response["id"]])
+
+            if due is not None:
+                remaining = due - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+
+            callback(response, system_message)
+
+            with self.condition:
+                self.delivered += 1
+                self.condition.notify_all()
+
+    def wait_delivered(self, timeout=None):
+        """
+        Waits until every recorded response and notification was delivered.
+
+        Returns:
+        bool: False if the timeout expired first.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.delivered == len(self.responses), timeout)
@@ -0,0 +1,165 @@
+import threading
+import time
+
+# Groups of the commands whose name doesn't start with the name of an interface
+SYSTEM = "SYSTEM"
+
+INTERFACE_PREFIXES = ("I2C", "I3C", "SPI", "UART", "GPIO")
+
+def interface_of(command_name):
+    """
+    Returns:
+    str: The interface of a command, the first word of its name (e.g. "I2C" for "I2C WRITE"), or SYSTEM.
+    """
+    prefix = command_name.split(" ", 1)[0]
+    return prefix if prefix in INTERFACE_PREFIXES else SYSTEM
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with logarithmic buckets.
+
+    Bucket i counts the latencies between 2^(i-1) and 2^i microseconds, so recording a sample is a couple of
+    integer operations and the memory used doesn't depend on the number of samples. Percentiles are estimated
+    with the upper bound of the bucket they fall in.
+    """
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, latency):
+        """
+        Args:
+        latency (float): The latency in seconds.
+        """
+        index = min(int(latency * 1e6).bit_length(), self.BUCKETS - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += latency
+        if self.min is None or latency < self.min:
+            self.min = latency
+        if self.max is None or latency > self.max:
+            self.max = latency
+
+    def percentile(self, percent):
+        """
+        Args:
+        percent (float): The percentile, from 0 to 100.
+
+        Returns:
+        float: The estimated latency in seconds below which 'percent' of the samples are, or None without samples.
+        """
+        if self.count == 0:
+            return None
+
+        threshold = self.count * percent / 100
+        accumulated = 0
+        for index, count in enumerate(self.buckets):
+            accumulated += count
+            if count and accumulated >= threshold:
+                return min((1 << index) / 1e6, self.max)
+
+        return self.max
+
+    def as_dict(self):
+        """
+        Returns:
+        dict: The 'count' of samples, their 'mean', 'min', 'max', 'p50', 'p90' and 'p99' in seconds, and the
+              'histogram' as a list of (bucket upper bound in seconds, count) for the non-empty buckets.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "histogram": [((1 << index) / 1e6, count) for index, count in enumerate(self.buckets) if count],
+        }
+
+class TransferStats:
+    """
+    Latencies of the transfers of a SupernovaDevice, split in stages:
+    - transit: from sending the request to the driver until its response reaches the driver callback, which
+      covers the USB round trip and the processing in the Supernova,
+    - dispatch: from the driver callback until the response is handed to the transfer controller,
+    - total: from sending the request until its response is handed to the transfer controller.
+
+    Each stage is aggregated per interface (the first word of the command name, e.g. "I2C") and per command
+    name (e.g. "I2C WRITE").
+    """
+
+    STAGES = ("transit", "dispatch", "total")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent_at = {}
+        self.received_at = {}
+        self.interfaces = {}
+        self.commands = {}
+
+    interface_of = staticmethod(interface_of)
+
+    def sent(self, transfer_id):
+        self.sent_at[transfer_id] = time.perf_counter()
+
+    def received(self, transfer_id):
+        # Responses to transfers not sent by this device (e.g. late ones) would never be handled
+        if transfer_id in self.sent_at:
+            self.received_at[transfer_id] = time.perf_counter()
+
+    def discard(self, transfer_id):
+        """
+        Forgets a transfer that will never be handled, e.g. because its request could not be sent.
+        """
+        self.sent_at.pop(transfer_id, None)
+        self.received_at.pop(transfer_id, None)
+
+    def handled(self, transfer_id, response):
+        handled_at = time.perf_counter()
+        sent_at = self.sent_at.pop(transfer_id, None)
+        received_at = self.received_at.pop(transfer_id, handled_at)
+        if sent_at is None:
+            return
+
+        # Hot-Fix to solve extra space in the firmware release
+        command_name = response.get("name", "").strip()
+        latencies = (received_at - sent_at, handled_at - received_at, handled_at - sent_at)
+
+        with self.lock:
+            for (groups, key) in ((self.interfaces, self.interface_of(command_name)), (self.commands, command_name)):
+                histograms = groups.get(key)
+                if histograms is None:
+                    histograms = groups[key] = tuple(LatencyHistogram() for _ in self.STAGES)
+                for histogram, latency in zip(histograms, latencies):
+                    histogram.record(latency)
+
+    def snapshot(self):
+        """
+        Returns:
+        dict: {"interfaces": {...}, "commands": {...}}, each mapping an interface or command name to the
+              LatencyHistogram.as_dict() of every stage ("transit", "dispatch" and "total").
+        """
+        with self.lock:
+            return {
+                "interfaces": self.__as_dict(self.interfaces),
+                "commands": self.__as_dict(self.commands),
+            }
+
+    def __as_dict(self, groups):
+        return {key: {stage: histogram.as_dict() for stage, histogram in zip(self.STAGES, histograms)}
+                for key, histograms in groups.items()}
+
+    def reset(self):
+        """
+        Clears the histograms. Transfers in flight are still measured.
+        """
+        with self.lock:
+            self.interfaces = {}
+            self.commands = {}
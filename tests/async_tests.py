@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+from supernovacontroller.sequential import AsyncSupernovaDevice, RetryPolicy
+from supernovacontroller.errors import DeviceNotMountedError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestAsyncSupernovaController(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    async def asyncSetUp(self):
+        self.device = AsyncSupernovaDevice()
+
+        if self.use_simulator:
+            self.device.driver = BinhoSupernovaSimulator()
+
+        self.device_info = await self.device.open()
+        self.i2c = await self.device.create_interface("i2c")
+
+    async def asyncTearDown(self):
+        await self.device.close()
+
+    async def test_create_interface_before_open_throws_error(self):
+        d = AsyncSupernovaDevice()
+        with self.assertRaises(DeviceNotMountedError):
+            await d.create_interface("i2c")
+
+    async def test_subsequent_calls_to_create_interface_retrieve_the_same_instance(self):
+        instance = await self.device.create_interface("i2c")
+
+        self.assertIs(instance, self.i2c)
+
+    async def test_async_i2c_write_read_from(self):
+        await self.i2c.init_bus(3300)
+
+        (success, result) = await self.i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+        self.assertTupleEqual((success, result), (True, None))
+
+        (success, data) = await self.i2c.read_from(0x50, [0x00,0x00], 4)
+        self.assertTupleEqual((success, data), (True, [0xDE, 0xAD, 0xBE, 0xEF]))
+
+    async def test_async_i2c_write_NACK(self):
+        await self.i2c.init_bus(3300)
+
+        (success, result) = await self.i2c.write(0x99, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+
+        self.assertTupleEqual((success, result), (False, "I2C_NACK_ADDRESS"))
+
+    async def test_async_concurrent_operations(self):
+        await self.i2c.init_bus(3300)
+        await self.i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+
+        results = await asyncio.gather(*[self.i2c.read_from(0x50, [0x00,0x00], 4) for _ in range(32)])
+
+        self.assertListEqual(results, [(True, [0xDE, 0xAD, 0xBE, 0xEF])] * 32)
+
+    async def test_async_update_bits_with_register_cache(self):
+        await self.i2c.init_bus(3300)
+        cache = await self.i2c.enable_register_cache()
+        await self.i2c.write(0x50, [0x00,0x10], [0xAA])
+
+        self.assertTupleEqual(await self.i2c.update_bits(0x50, [0x00,0x10], 0x0F, 0x05), (True, 0xA5))
+        self.assertTupleEqual(await self.i2c.update_bits(0x50, [0x00,0x10], 0xF0, 0x30), (True, 0x35))
+        self.assertTupleEqual(await self.i2c.read_from(0x50, [0x00,0x10], 1), (True, [0x35]))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    async def test_async_requests_are_sent_once(self):
+        await self.i2c.init_bus(3300)
+        await self.i2c.write(0x50, [0x00,0x10], [0xAA])
+
+        # Requests sent to the driver, update_bits reads the register then writes it
+        sent = []
+        driver = self.i2c.interface.driver
+        for name in ("i2cReadFrom", "i2cWrite"):
+            request = getattr(driver, name)
+            setattr(driver, name, lambda *args, name=name, request=request: sent.append(name) or request(*args))
+
+        self.assertTupleEqual(await self.i2c.update_bits(0x50, [0x00,0x10], 0x0F, 0x05), (True, 0xA5))
+        self.assertListEqual(sent, ["i2cReadFrom", "i2cWrite"])
+
+    async def test_async_many_operations_in_flight(self):
+        await self.i2c.init_bus(3300)
+        await self.i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+        threads = threading.active_count()
+
+        results = await asyncio.gather(*[self.i2c.read_from(0x50, [0x00,0x00], 4) for _ in range(256)])
+
+        self.assertListEqual(results, [(True, [0xDE, 0xAD, 0xBE, 0xEF])] * 256)
+        # No thread waits for an operation
+        self.assertLessEqual(threading.active_count(), threads)
+
+    async def test_async_scan_is_not_retried(self):
+        await self.i2c.init_bus(3300)
+        self.device.device.set_retry_policy(RetryPolicy(max_attempts=3))
+        probes = []
+        driver = self.i2c.interface.driver
+        i2cRead = driver.i2cRead
+        driver.i2cRead = lambda id, address, length: probes.append(address) or i2cRead(id, address, length)
+
+        self.assertTupleEqual(await self.i2c.scan([0x99, 0x50]), (True, [0x50]))
+        self.assertListEqual(probes, [0x99, 0x50])
+
+    async def test_async_measure_analog_signal(self):
+        (success, _) = await self.device.measure_analog_signal()
+
+        self.assertEqual(success, True)
+
+    async def test_async_notification_stream_is_closed(self):
+        async with self.device.notifications() as stream:
+            pass
+
+        notifications = [notification async for notification in stream]
+        self.assertListEqual(notifications, [])
+
+if __name__ == "__main__":
+    unittest.main()
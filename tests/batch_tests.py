@@ -0,0 +1,107 @@
+import os
+import sys
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.sequential.i2c import SupernovaI2CBlockingInterface
+from supernovacontroller.errors import DeviceNotMountedError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestBatchSupernovaController(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        self.device = SupernovaDevice()
+
+        if self.use_simulator:
+            self.device.driver = BinhoSupernovaSimulator()
+
+        self.device_info = self.device.open()
+        self.i2c : SupernovaI2CBlockingInterface = self.device.create_interface("i2c")
+        self.i2c.init_bus(3300)
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_batch_before_open_throws_error(self):
+        d = SupernovaDevice()
+        with self.assertRaises(DeviceNotMountedError):
+            d.batch()
+
+    def test_batch_results_match_individual_calls(self):
+        self.i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+        expected = [self.i2c.read_from(0x50, [0x00,0x00], 4), self.i2c.read_from(0x99, [0x00,0x00], 4)]
+
+        batch = self.device.batch()
+        batch.add(self.i2c.read_from, 0x50, [0x00,0x00], 4)
+        batch.add(self.i2c.read_from, 0x99, [0x00,0x00], 4)
+        results = batch.submit()
+
+        self.assertListEqual(results, expected)
+
+    def test_batch_as_context_manager(self):
+        with self.device.batch() as batch:
+            write_index = batch.add(self.i2c.write, 0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+            read_index = batch.add(self.i2c.read_from, 0x50, [0x00,0x00], 4)
+
+        self.assertTupleEqual(batch.results[write_index], (True, None))
+        self.assertTupleEqual(batch.results[read_index], (True, [0xDE, 0xAD, 0xBE, 0xEF]))
+
+    def test_batch_keeps_operation_order(self):
+        batch = self.device.batch(window=4)
+        for value in range(16):
+            batch.add(self.i2c.write, 0x50, [0x00,0x00], [value])
+            batch.add(self.i2c.read_from, 0x50, [0x00,0x00], 1)
+        results = batch.submit()
+
+        self.assertListEqual(results[1::2], [(True, [value]) for value in range(16)])
+
+    def test_batch_update_bits_with_register_cache(self):
+        cache = self.i2c.enable_register_cache()
+        self.i2c.write(0x50, [0x00,0x10], [0xAA, 0x55])
+
+        batch = self.device.batch()
+        batch.add(self.i2c.update_bits, 0x50, [0x00,0x10], 0x0F, 0x05)
+        batch.add(self.i2c.update_bits, 0x50, [0x00,0x11], 0xF0, 0x30)
+        results = batch.submit()
+
+        self.assertListEqual(results, [(True, 0xA5), (True, 0x35)])
+        # The cache holds the values written by the batch
+        self.assertTupleEqual(self.i2c.read_from(0x50, [0x00,0x10], 2), (True, [0xA5, 0x35]))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_batch_across_interfaces(self):
+        spi = self.device.create_interface("spi.controller")
+        spi.init_bus()
+
+        with self.device.batch() as batch:
+            batch.add(self.i2c.write, 0x50, [0x00,0x00], [0xDE, 0xAD])
+            batch.add(spi.transfer, [0x01, 0x02, 0x03], 3)
+            batch.add(self.device.measure_analog_signal)
+
+        (i2c_result, spi_result, measure_result) = batch.results
+        self.assertEqual(i2c_result, (True, None))
+        self.assertEqual(spi_result[0], True)
+        self.assertEqual(measure_result[0], True)
+
+    def test_batch_operation_without_requests(self):
+        with self.device.batch() as batch:
+            batch.add(self.i2c.get_parameters)
+
+        self.assertListEqual(batch.results, [self.i2c.get_parameters()])
+
+    def test_batch_rejects_non_interface_callables(self):
+        batch = self.device.batch()
+        with self.assertRaises(TypeError):
+            batch.add(print, "foo")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from supernovacontroller.bench import BENCHMARKS, measure, run_benchmarks
+from supernovacontroller.bench.__main__ import main
+from supernovacontroller.sequential import SupernovaDevice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_benchmarks(self):
+        device = SupernovaDevice()
+        device.driver = BinhoSupernovaSimulator()
+        device.open()
+
+        report = run_benchmarks(device, ["i2c.write", "i2c.read_from"], iterations=20, warmup=2)
+
+        device.close()
+
+        self.assertEqual(list(report["benchmarks"].keys()), ["i2c.write", "i2c.read_from"])
+        for result in report["benchmarks"].values():
+            self.assertEqual((result["iterations"], result["errors"]), (20, 0))
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertTrue(result["min"] <= result["p50"] <= result["p99"] <= result["max"])
+
+    def test_iterations_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            measure(lambda: (True, None), iterations=0)
+
+        with self.assertRaises(ValueError):
+            run_benchmarks(SupernovaDevice(), ["i2c.write"], iterations=0)
+
+        # argparse reports the invalid option and exits
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            main(["--simulator", "--iterations", "0"])
+
+    def test_command_line_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            main(["--simulator", "--iterations", "5", "--warmup", "0", "--output", path])
+
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertEqual(report["target"], "simulator")
+        self.assertEqual(set(report["benchmarks"].keys()), set(BENCHMARKS))
+        self.assertEqual(report["benchmarks"]["i2c.write"]["iterations"], 5)
+
+    def test_command_line_report_on_stdout(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(["--simulator", "--benchmarks", "i2c.write", "--iterations", "5", "--warmup", "0", "--output", "-"])
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(list(report["benchmarks"].keys()), ["i2c.write"])
+
+    def test_command_line_report_of_both_dispatch_modes(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(["--simulator", "--benchmarks", "i2c.write", "--iterations", "5", "--warmup", "0", "--dispatch", "both",
+                  "--output", "-"])
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(list(report["benchmarks"].keys()), ["i2c.write", "i2c.write [direct]"])
+        self.assertEqual([result["dispatch"] for result in report["benchmarks"].values()], ["queued", "direct"])
+        self.assertTrue(all(result["p50"] > 0 for result in report["benchmarks"].values()))
+
+if __name__ == "__main__":
+    unittest.main()
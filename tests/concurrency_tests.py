@@ -0,0 +1,196 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+from BinhoSupernova.commands.definitions import (GpioFunctionality, GpioLogicLevel, GpioPinNumber,
+                                                 SpiControllerMode)
+
+from supernovacontroller.sequential import SupernovaDevice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+THREADS = 8
+ITERATIONS = 50
+# Time the threads of a test have to finish, in seconds
+DEADLINE = 60
+
+I2C_ADDRESS = 0x50
+I3C_ADDRESS = 0x08
+
+class TestConcurrentUse(unittest.TestCase):
+    """
+    Uses one SupernovaDevice from many threads at the same time, checking every thread gets the responses to its
+    own requests and the configuration kept by the interfaces stays consistent.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        self.device = SupernovaDevice(timeout=10)
+
+        if self.use_simulator:
+            self.device.driver = BinhoSupernovaSimulator()
+
+        self.device_info = self.device.open()
+        self.i2c = self.device.create_interface("i2c")
+        self.i2c.init_bus(3300)
+
+    def tearDown(self):
+        self.device.close()
+
+    def __run_threads(self, workers):
+        """
+        Runs every worker on a thread of its own, all starting at the same time.
+
+        Returns:
+        float: The time it took for all the workers to finish, in seconds.
+        """
+        barrier = threading.Barrier(len(workers))
+        failures = []
+
+        def run(worker):
+            barrier.wait()
+            try:
+                worker()
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=run, args=(worker,), daemon=True) for worker in workers]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(DEADLINE)
+        elapsed = time.perf_counter() - start
+
+        self.assertFalse(any(thread.is_alive() for thread in threads), "Threads still running, deadlock?")
+        if failures:
+            raise failures[0]
+
+        return elapsed
+
+    def test_i2c_transfers_of_many_threads_are_not_mixed(self):
+        mismatches = []
+
+        def worker(index):
+            # Every thread writes and reads back registers of its own
+            register = [0x00, index * 0x10]
+            for iteration in range(ITERATIONS):
+                data = [index, iteration & 0xFF, 0xA5, 0x5A]
+                self.assertTupleEqual(self.i2c.write(I2C_ADDRESS, register, data), (True, None))
+                result = self.i2c.read_from(I2C_ADDRESS, register, len(data))
+                if result != (True, data):
+                    mismatches.append((index, iteration, result))
+
+        self.__run_threads([lambda index=index: worker(index) for index in range(THREADS)])
+
+        self.assertListEqual(mismatches, [])
+
+    def test_all_interfaces_from_many_threads(self):
+        spi = self.device.create_interface("spi.controller")
+        spi.set_bus_voltage(3300)
+        spi.init_bus()
+
+        uart = self.device.create_interface("uart")
+        uart.set_bus_voltage(3300)
+        uart.init_bus()
+
+        gpio = self.device.create_interface("gpio")
+        gpio.set_pins_voltage(3300)
+        gpio.configure_pin(GpioPinNumber.GPIO_6, GpioFunctionality.DIGITAL_OUTPUT)
+
+        operations = {
+            "i2c": lambda index, iteration: self.i2c.read_from(I2C_ADDRESS, [0x00, 0x00], 4),
+            "spi": lambda index, iteration: spi.transfer([0x9F], 5),
+            "uart": lambda index, iteration: uart.send([index, iteration & 0xFF]),
+            "gpio": lambda index, iteration: gpio.digital_write(GpioPinNumber.GPIO_6, GpioLogicLevel.HIGH if iteration % 2 else GpioLogicLevel.LOW),
+        }
+
+        if self.use_simulator:
+            i3c = self.device.create_interface("i3c.controller")
+            i3c.init_bus(3300)
+
+            def i3c_write_read(index, iteration):
+                subaddress = [0x00, index * 0x10]
+                data = [index, iteration & 0xFF]
+                (success, _) = i3c.write(I3C_ADDRESS, i3c.TransferMode.I3C_SDR, subaddress, data)
+                if not success:
+                    return (False, "write failed")
+                result = i3c.read(I3C_ADDRESS, i3c.TransferMode.I3C_SDR, subaddress, len(data))
+                return (result == (True, data), result)
+
+            operations["i3c"] = i3c_write_read
+
+        failures = []
+        names = list(operations)
+
+        def worker(index):
+            operation = operations[names[index % len(names)]]
+            for iteration in range(ITERATIONS):
+                (success, result) = operation(index, iteration)
+                if not success:
+                    failures.append((names[index % len(names)], index, iteration, result))
+
+        threads = max(THREADS, len(names))
+        self.__run_threads([lambda index=index: worker(index) for index in range(threads)])
+
+        self.assertListEqual(failures, [])
+
+    def test_throughput_does_not_collapse_with_threads(self):
+        read = lambda: self.i2c.read_from(I2C_ADDRESS, [0x00, 0x00], 4)
+
+        start = time.perf_counter()
+        for _ in range(THREADS * ITERATIONS):
+            read()
+        sequential = THREADS * ITERATIONS / (time.perf_counter() - start)
+
+        def worker():
+            for _ in range(ITERATIONS):
+                self.assertTrue(read()[0])
+
+        concurrent = THREADS * ITERATIONS / self.__run_threads([worker] * THREADS)
+
+        self.assertGreater(concurrent, sequential / 2,
+                           f"I2C reads/s: {sequential:.0f} from one thread, {concurrent:.0f} from {THREADS} threads")
+
+    def test_configuration_is_never_seen_half_updated(self):
+        spi = self.device.create_interface("spi.controller")
+        spi.set_bus_voltage(3300)
+        spi.init_bus()
+
+        (_, (_, mode, _, _, _, frequency)) = spi.get_parameters()
+        settings = [(SpiControllerMode.MODE_1, 1000000), (SpiControllerMode.MODE_2, 2000000), (SpiControllerMode.MODE_3, 5000000)]
+        expected = set(settings) | {(mode, frequency)}
+        seen = []
+
+        def configure(setting):
+            for _ in range(ITERATIONS):
+                spi.set_parameters(mode=setting[0], frequency=setting[1])
+
+        def observe():
+            for _ in range(ITERATIONS * 4):
+                (_, (_, mode, _, _, _, frequency)) = spi.get_parameters()
+                seen.append((mode, frequency))
+
+        self.__run_threads([lambda setting=setting: configure(setting) for setting in settings] + [observe] * 2)
+
+        self.assertTrue(set(seen) <= expected, f"Unexpected settings: {set(seen) - expected}")
+
+    def test_interfaces_created_from_many_threads_are_the_same(self):
+        created = []
+
+        self.__run_threads([lambda: created.append(self.device.create_interface("uart"))] * THREADS)
+
+        self.assertEqual(len({id(interface) for interface in created}), 1)
+
+if __name__ == "__main__":
+    unittest.main()
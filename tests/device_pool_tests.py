@@ -0,0 +1,149 @@
+import os
+import sys
+import threading
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice, SupernovaDevicePool
+from supernovacontroller.errors import BackendError, NoDeviceAvailableError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestSupernovaDevicePool(unittest.TestCase):
+    ADAPTERS = 3
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real devices
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        if not self.use_simulator:
+            self.pool = SupernovaDevicePool.open_all()
+            return
+
+        devices = []
+        for index in range(self.ADAPTERS):
+            device = SupernovaDevice()
+            device.driver = BinhoSupernovaSimulator()
+            info = device.open()
+            # The simulators share a serial number, tell them apart
+            info["serial_number"] = f"SIM{index}"
+            devices.append((device, info))
+
+        self.pool = SupernovaDevicePool(devices, max_failures=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_lease_by_serial_number(self):
+        serial_number = self.pool.utilization()[-1]["serial_number"]
+
+        with self.pool.lease(serial_number=serial_number) as lease:
+            self.assertEqual(lease.serial_number, serial_number)
+            self.assertTrue(lease.device.get_hardware_version())
+
+            with self.assertRaises(NoDeviceAvailableError):
+                self.pool.lease(serial_number=serial_number, timeout=0.1)
+
+        self.pool.lease(serial_number=serial_number, timeout=0.1).release()
+
+    def test_lease_by_hardware_version(self):
+        hw_version = self.pool.utilization()[0]["hw_version"]
+
+        with self.pool.lease(hw_version=hw_version) as lease:
+            self.assertEqual(lease.hw_version, hw_version)
+
+        with self.assertRaises(NoDeviceAvailableError):
+            self.pool.lease(hw_version="unknown")
+
+    def test_jobs_are_queued_when_all_adapters_are_busy(self):
+        adapters = len(self.pool.utilization())
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def job(device):
+            started.release()
+            release.wait(5)
+            return device.get_hardware_version()
+
+        futures = [self.pool.submit(job) for _ in range(adapters + 2)]
+        for _ in range(adapters):
+            self.assertTrue(started.acquire(timeout=5))
+
+        self.assertEqual(self.pool.pending_jobs(), 2)
+
+        release.set()
+        self.assertTrue(all(future.result(5) for future in futures))
+
+        usage = self.pool.utilization()
+        self.assertEqual(sum(adapter["jobs"] for adapter in usage), len(futures))
+        self.assertTrue(all(adapter["jobs"] > 0 for adapter in usage))
+        self.assertTrue(all(0 < adapter["utilization"] <= 1 for adapter in usage))
+
+    def test_failing_adapter_becomes_unhealthy(self):
+        if not self.use_simulator:
+            self.skipTest("For simulator only")
+
+        def failing_job(device):
+            raise BackendError()
+
+        for _ in range(2):
+            with self.assertRaises(BackendError):
+                self.pool.submit(failing_job, serial_number="SIM0").result(5)
+
+        self.assertFalse(self.pool.utilization()[0]["healthy"])
+        with self.assertRaises(NoDeviceAvailableError):
+            self.pool.submit(failing_job, serial_number="SIM0").result(5)
+
+        self.assertTrue(all(result["healthy"] for result in self.pool.check_health()))
+        self.assertTrue(self.pool.utilization()[0]["healthy"])
+
+    def test_workers_are_reused(self):
+        adapters = len(self.pool.utilization())
+        threads = set()
+
+        def job(device):
+            threads.add(threading.current_thread())
+            return device.get_hardware_version()
+
+        futures = [self.pool.submit(job) for _ in range(10 * adapters)]
+        self.assertTrue(all(future.result(5) for future in futures))
+
+        self.assertLessEqual(len(threads), adapters)
+
+    def test_close_from_a_job(self):
+        def job(device):
+            self.pool.close()
+
+        with self.assertRaises(RuntimeError):
+            self.pool.submit(job).result(5)
+
+        # The pool is still open
+        self.assertTrue(self.pool.submit(lambda device: device.get_hardware_version()).result(5))
+
+    def test_close_while_holding_a_lease(self):
+        with self.pool.lease():
+            with self.assertRaises(RuntimeError):
+                self.pool.close()
+
+class TestSupernovaDevicePoolCreation(unittest.TestCase):
+    def test_devices_are_closed_if_the_pool_is_not_created(self):
+        devices = []
+        for _ in range(2):
+            device = SupernovaDevice()
+            device.driver = BinhoSupernovaSimulator()
+            devices.append((device, device.open()))
+        # Not the information returned by open()
+        devices[1] = (devices[1][0], None)
+
+        with self.assertRaises(AttributeError):
+            SupernovaDevicePool(devices)
+
+        self.assertFalse(any(device.running for (device, _) in devices))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import queue
+import time
+import unittest
+from unittest import mock
+
+from supernovacontroller.sequential import SupernovaDevice, SupernovaDeviceWatcher
+from supernovacontroller.sequential.device_watcher import ATTACH, DETACH
+
+def supernova(path, serial_number):
+    return {"path": path, "serial_number": serial_number, "vendor_id": "0x1fc9", "product_id": "0x82fc"}
+
+class TestSupernovaDeviceWatcher(unittest.TestCase):
+    """
+    Plugs and unplugs Supernovas by changing the list the watcher enumerates.
+    """
+
+    def setUp(self):
+        self.connected = [supernova("/dev/hidraw0", "A0"), supernova("/dev/hidraw1", "B1")]
+        self.events = queue.Queue()
+        self.watchers = []
+
+    def tearDown(self):
+        for watcher in self.watchers:
+            watcher.stop()
+
+    def __watcher(self, poll_interval):
+        watcher = SupernovaDeviceWatcher(poll_interval=poll_interval, use_system_events=False,
+                                         enumerate_func=lambda: list(self.connected))
+        watcher.subscribe(lambda event, device: self.events.put((event, device["serial_number"])))
+        self.watchers.append(watcher)
+        return watcher
+
+    def __next_event(self, timeout=2):
+        return self.events.get(timeout=timeout)
+
+    def test_connected_devices_are_attached_on_start(self):
+        watcher = self.__watcher(poll_interval=60)
+        watcher.start()
+
+        self.assertEqual({self.__next_event(), self.__next_event()}, {(ATTACH, "A0"), (ATTACH, "B1")})
+        self.assertEqual(len(watcher), 2)
+        self.assertIn("/dev/hidraw1", watcher)
+        self.assertEqual(watcher.find(serial_number="B1")["path"], "/dev/hidraw1")
+        self.assertEqual(watcher.find(path="/dev/hidraw0")["serial_number"], "A0")
+        self.assertIsNone(watcher.find(serial_number="C2"))
+
+    def test_changes_are_found_by_polling(self):
+        watcher = self.__watcher(poll_interval=0.01)
+        watcher.start()
+        self.__next_event()
+        self.__next_event()
+
+        self.connected.append(supernova("/dev/hidraw2", "C2"))
+        self.assertEqual(self.__next_event(), (ATTACH, "C2"))
+
+        del self.connected[0]
+        self.assertEqual(self.__next_event(), (DETACH, "A0"))
+        self.assertIsNone(watcher.find(serial_number="A0"))
+        self.assertEqual(sorted(device["serial_number"] for device in watcher.devices()), ["B1", "C2"])
+
+        # Nothing changes, nothing is reported
+        with self.assertRaises(queue.Empty):
+            self.__next_event(timeout=0.1)
+
+    def test_notify_scans_right_away(self):
+        watcher = self.__watcher(poll_interval=60)
+        watcher.start()
+        self.__next_event()
+        self.__next_event()
+
+        self.connected.append(supernova("/dev/hidraw2", "C2"))
+        start = time.perf_counter()
+        watcher.notify()
+
+        self.assertEqual(self.__next_event(), (ATTACH, "C2"))
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_other_device_on_the_same_path(self):
+        watcher = self.__watcher(poll_interval=60)
+        watcher.start()
+        self.__next_event()
+        self.__next_event()
+
+        self.connected[0] = supernova("/dev/hidraw0", "D3")
+
+        self.assertEqual(watcher.scan(), [(DETACH, supernova("/dev/hidraw0", "A0")), (ATTACH, supernova("/dev/hidraw0", "D3"))])
+        self.assertEqual(watcher.find(path="/dev/hidraw0")["serial_number"], "D3")
+        self.assertIsNone(watcher.find(serial_number="A0"))
+
+    def test_failing_handler_does_not_stop_the_watcher(self):
+        watcher = self.__watcher(poll_interval=0.01)
+
+        def fail(event, device):
+            raise RuntimeError("handler failed")
+
+        watcher.subscribe(fail)
+        watcher.start()
+        self.__next_event()
+        self.__next_event()
+
+        self.connected.append(supernova("/dev/hidraw2", "C2"))
+        self.assertEqual(self.__next_event(), (ATTACH, "C2"))
+
+    def test_unsubscribed_handlers_are_not_called(self):
+        watcher = self.__watcher(poll_interval=60)
+        calls = []
+        subscription = watcher.subscribe(lambda event, device: calls.append(event))
+        watcher.start()
+
+        self.assertTrue(watcher.unsubscribe(subscription))
+        self.assertFalse(watcher.unsubscribe(subscription))
+        self.connected.clear()
+        watcher.scan()
+
+        self.assertEqual(calls, [ATTACH, ATTACH])
+
+    def test_devices_are_listed_by_the_supernova_device_by_default(self):
+        watcher = SupernovaDeviceWatcher(poll_interval=60, use_system_events=False)
+
+        with mock.patch.object(SupernovaDevice, "getAllConnectedSupernovaDevices", return_value=self.connected):
+            events = watcher.scan()
+
+        self.assertEqual([(event, device["serial_number"]) for (event, device) in events], [(ATTACH, "A0"), (ATTACH, "B1")])
+
+    def test_stop(self):
+        watcher = self.__watcher(poll_interval=60)
+        watcher.start()
+        thread = watcher.thread
+
+        watcher.stop()
+
+        self.assertFalse(thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
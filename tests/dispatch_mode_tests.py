@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestDispatchModes(unittest.TestCase):
+    """
+    Runs a read-modify-write loop with the queued dispatch of responses (default) and with the direct dispatch
+    from the driver callback, checking both modes transfer correctly. Their latency is compared by the benchmarks,
+    see 'python -m supernovacontroller.bench --dispatch both'.
+    """
+
+    TRANSFERS = 500
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def __read_modify_write(self, direct_dispatch):
+        device = SupernovaDevice(direct_dispatch=direct_dispatch)
+        if self.use_simulator:
+            device.driver = BinhoSupernovaSimulator()
+        device.open()
+
+        i2c = device.create_interface("i2c")
+        i2c.init_bus(3300)
+        i2c.write(0x50, [0x00,0x00], [0x00])
+
+        for value in range(self.TRANSFERS):
+            (read_success, data) = i2c.read_from(0x50, [0x00,0x00], 1)
+            (write_success, _) = i2c.write(0x50, [0x00,0x00], [(data[0] + 1) & 0xFF])
+
+            self.assertTupleEqual((read_success, write_success), (True, True))
+            self.assertEqual(data, [value & 0xFF])
+
+        device.close()
+
+    def test_queued_dispatch(self):
+        self.__read_modify_write(direct_dispatch=False)
+
+    def test_direct_dispatch(self):
+        self.__read_modify_write(direct_dispatch=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import unittest
+
+from supernovacontroller.sequential import I2CEeprom, SupernovaDevice
+from supernovacontroller.sequential.retry import retries_enabled
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestI2CEeprom(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        self.device = SupernovaDevice()
+
+        if self.use_simulator:
+            self.device.driver = BinhoSupernovaSimulator()
+
+        self.device_info = self.device.open()
+        self.i2c = self.device.create_interface("i2c")
+        self.i2c.init_bus(3300)
+        self.eeprom = I2CEeprom.for_part(self.i2c, "24C256", address=0x50)
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_write_across_pages_and_read(self):
+        data = bytes(range(200))
+
+        # Starts in the middle of a page and ends in the middle of another one
+        self.assertTupleEqual(self.eeprom.write(0x0130, data), (True, None))
+        self.assertTupleEqual(self.eeprom.read(0x0130, len(data)), (True, data))
+
+    def test_wait_ready(self):
+        (ready, _) = self.eeprom.wait_ready()
+
+        self.assertTrue(ready)
+
+    def test_data_out_of_the_eeprom(self):
+        with self.assertRaises(ValueError):
+            self.eeprom.write(0x7FF0, [0x00] * 32)
+        with self.assertRaises(ValueError):
+            self.eeprom.read(0x8000, 1)
+
+    def test_write_NACK(self):
+        eeprom = I2CEeprom.for_part(self.i2c, "24C256", address=0x99)
+
+        self.assertTupleEqual(eeprom.write(0x0000, [0x01, 0x02]), (False, "I2C_NACK_ADDRESS"))
+
+class _EepromBus:
+    """
+    Stands for an I2C interface with a 24xx EEPROM on it, busy for 'busy_polls' polls after every write.
+    """
+
+    def __init__(self, busy_polls):
+        self.busy_polls = busy_polls
+        self.busy = 0
+        self.memory = {}
+        self.writes = []
+
+    def write(self, address, register, data):
+        self.writes.append((address, list(register), len(data)))
+        offset = int.from_bytes(bytes(register), "big")
+        for (index, value) in enumerate(data):
+            self.memory[(address, offset + index)] = value
+        self.busy = self.busy_polls
+        return (True, None)
+
+    def read(self, address, length):
+        if self.busy:
+            self.busy -= 1
+            return (False, "I2C_NACK_ADDRESS")
+        return (True, [0x00] * length)
+
+    def read_large(self, address, register, length):
+        offset = int.from_bytes(bytes(register), "big")
+        return (True, bytes(self.memory.get((address, offset + index), 0xFF) for index in range(length)))
+
+class TestI2CEepromPaging(unittest.TestCase):
+    """
+    Checks the transfers the helper makes, on a stand-in I2C interface.
+    """
+
+    def test_writes_are_split_on_page_boundaries(self):
+        bus = _EepromBus(busy_polls=0)
+        eeprom = I2CEeprom.for_part(bus, "24C64")
+
+        self.assertTupleEqual(eeprom.write(0x001C, range(40)), (True, None))
+
+        self.assertListEqual(bus.writes, [(0x50, [0x00, 0x1C], 4), (0x50, [0x00, 0x20], 32), (0x50, [0x00, 0x40], 4)])
+
+    def test_ack_polling(self):
+        bus = _EepromBus(busy_polls=3)
+        eeprom = I2CEeprom.for_part(bus, "24C64")
+
+        bus.write(0x50, [0x00, 0x00], [0x01])
+
+        self.assertTupleEqual(eeprom.wait_ready(), (True, 3))
+
+    def test_ack_polling_is_not_retried(self):
+        bus = _EepromBus(busy_polls=1)
+        eeprom = I2CEeprom.for_part(bus, "24C64")
+        # Whether retries were enabled for every poll
+        polls = []
+        read = bus.read
+        bus.read = lambda address, length: polls.append(retries_enabled()) or read(address, length)
+
+        bus.write(0x50, [0x00, 0x00], [0x01])
+
+        self.assertTupleEqual(eeprom.wait_ready(), (True, 1))
+        self.assertListEqual(polls, [False, False])
+
+    def test_write_cycle_timeout(self):
+        bus = _EepromBus(busy_polls=10 ** 9)
+        eeprom = I2CEeprom.for_part(bus, "24C64", write_cycle_timeout=0.01)
+
+        self.assertTupleEqual(eeprom.write(0x0000, [0x01]), (False, "Write cycle not completed in time"))
+
+    def test_blocks_are_selected_with_the_i2c_address(self):
+        bus = _EepromBus(busy_polls=1)
+        eeprom = I2CEeprom.for_part(bus, "24C16")
+
+        self.assertTupleEqual(eeprom.write(0x01F8, range(16)), (True, None))
+
+        self.assertListEqual(bus.writes, [(0x51, [0xF8], 8), (0x52, [0x00], 8)])
+        self.assertTupleEqual(eeprom.read(0x01F8, 16), (True, bytes(range(16))))
+
+    def test_verification(self):
+        bus = _EepromBus(busy_polls=0)
+        eeprom = I2CEeprom.for_part(bus, "24C64")
+        bus.read_large = lambda address, register, length: (True, bytes([0x00, 0x01, 0xEE, 0x03]))
+
+        self.assertTupleEqual(eeprom.write(0x0100, range(4)), (False, "Verification failed at 0x102"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -166,6 +166,113 @@ class TestI2CSupernovaController(unittest.TestCase):
 
         self.assertEqual(data, "I2C_NACK_ADDRESS")
         self.assertEqual(success, False)
-        
+
+    def test_i2c_write_registers_read_registers(self):
+        self.i2c.init_bus(3300)
+
+        values = {(0x00, register): [register, 0xFF - register] for register in range(0x00, 0x40, 0x04)}
+
+        (success, results) = self.i2c.write_registers(0x50, [(list(register), data) for (register, data) in values.items()])
+        self.assertEqual(success, True)
+        self.assertDictEqual(results, {register: (True, None) for register in values})
+
+        (success, results) = self.i2c.read_registers(0x50, [(list(register), 2) for register in values])
+        self.assertEqual(success, True)
+        self.assertDictEqual(results, {register: (True, data) for (register, data) in values.items()})
+
+    def test_i2c_read_registers_NACK(self):
+        self.i2c.init_bus(3300)
+
+        (success, results) = self.i2c.read_registers(0x99, [([0x00, 0x00], 4), ([0x00, 0x04], 4)])
+
+        self.assertEqual(success, False)
+        self.assertDictEqual(results, {(0x00, 0x00): (False, "I2C_NACK_ADDRESS"), (0x00, 0x04): (False, "I2C_NACK_ADDRESS")})
+
+    def test_i2c_read_registers_without_registers(self):
+        self.assertTupleEqual(self.i2c.read_registers(0x50, []), (True, {}))
+
+    def test_i2c_read_registers_in_batch(self):
+        self.i2c.init_bus(3300)
+        self.i2c.write(0x50, [0x00, 0x10], [0x12, 0x34])
+
+        with self.device.batch() as batch:
+            batch.add(self.i2c.read_registers, 0x50, [([0x00, 0x10], 1), ([0x00, 0x11], 1)])
+            batch.add(self.i2c.read_from, 0x50, [0x00, 0x10], 2)
+
+        self.assertListEqual(batch.results, [(True, {(0x00, 0x10): (True, [0x12]), (0x00, 0x11): (True, [0x34])}),
+                                             (True, [0x12, 0x34])])
+
+    def test_i2c_write_large_read_large(self):
+        self.i2c.init_bus(3300)
+
+        data = bytes((index * 7) & 0xFF for index in range(600))
+
+        self.assertTupleEqual(self.i2c.write_large(0x50, [0x00, 0x00], data, chunk_size=128), (True, None))
+        self.assertTupleEqual(self.i2c.read_large(0x50, [0x00, 0x00], len(data), chunk_size=100), (True, data))
+        self.assertTupleEqual(self.i2c.read_large(0x50, [0x01, 0x00], 44, chunk_size=10), (True, data[0x100:0x100 + 44]))
+
+    def test_i2c_read_large_NACK(self):
+        self.i2c.init_bus(3300)
+
+        self.assertTupleEqual(self.i2c.read_large(0x99, [0x00, 0x00], 300, chunk_size=128), (False, "I2C_NACK_ADDRESS"))
+
+    def test_i2c_large_transfers_past_the_last_register(self):
+        with self.assertRaises(ValueError):
+            self.i2c.read_large(0x50, [0xF0], 32)
+        with self.assertRaises(ValueError):
+            self.i2c.write_large(0x50, [0xFF, 0xF0], [0x00] * 17)
+        with self.assertRaises(ValueError):
+            self.i2c.write_large(0x50, [], [0x00] * 4)
+        with self.assertRaises(ValueError):
+            self.i2c.read_large(0x50, [0x00, 0x00], 4, chunk_size=2048)
+
+    def test_i2c_scan(self):
+        self.i2c.init_bus(3300)
+
+        for probe in ("read", "write0"):
+            (success, found) = self.i2c.scan(probe=probe)
+
+            self.assertEqual(success, True)
+            self.assertIn(0x50, found)
+
+            self.assertTupleEqual(self.i2c.scan([0x99, 0x50], probe=probe, window=None), (True, [0x50]))
+
+    def test_i2c_scan_unknown_probe(self):
+        with self.assertRaises(ValueError):
+            self.i2c.scan(probe="write1")
+
+    def test_i2c_register_cache(self):
+        self.i2c.init_bus(3300)
+        cache = self.i2c.enable_register_cache()
+
+        self.i2c.write(0x50, [0x00, 0x20], [0x0F, 0xF0])
+        self.assertTupleEqual(self.i2c.read_from(0x50, [0x00, 0x20], 2), (True, [0x0F, 0xF0]))
+        self.assertTupleEqual(self.i2c.update_bits(0x50, [0x00, 0x21], 0x0C, 0x04), (True, 0xF4))
+        # Nothing to change, nothing written
+        self.assertTupleEqual(self.i2c.update_bits(0x50, [0x00, 0x21], 0x0C, 0x04), (True, 0xF4))
+        self.assertEqual(cache.stats()["hits"], 3)
+
+        cache.invalidate(0x50)
+        self.assertTupleEqual(self.i2c.read_from(0x50, [0x00, 0x20], 2), (True, [0x0F, 0xF4]))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_i2c_register_cache_excluded_registers(self):
+        self.i2c.init_bus(3300)
+        cache = self.i2c.enable_register_cache()
+        cache.exclude(0x50, [0x00, 0x30])
+
+        self.i2c.write(0x50, [0x00, 0x30], [0x01])
+        self.i2c.read_from(0x50, [0x00, 0x30], 1)
+
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "bypassed": 1, "entries": 0})
+
+    def test_i2c_update_bits_without_cache(self):
+        self.i2c.init_bus(3300)
+        self.i2c.write(0x50, [0x00, 0x40], [0xAA])
+
+        self.assertTupleEqual(self.i2c.update_bits(0x50, [0x00, 0x40], 0x0F, 0x05), (True, 0xA5))
+        self.assertTupleEqual(self.i2c.read_from(0x50, [0x00, 0x40], 1), (True, [0xA5]))
+        self.assertTupleEqual(self.i2c.update_bits(0x99, [0x00, 0x40], 0x0F, 0x05), (False, "I2C_NACK_ADDRESS"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -227,6 +227,24 @@ class TestI3CSupernovaController(unittest.TestCase):
 
         self.assertTupleEqual((success, result), (True, [0xDE, 0xAD, 0xBE, 0xEF]))
         
+    def test_i3c_register_cache(self):
+        if not self.use_simulator:
+            self.skipTest("For simulator only")
+
+        self.i3c.init_bus(3300)
+        cache = self.i3c.enable_register_cache()
+
+        subaddress = [0x00, 0x10]
+        self.i3c.write(0x08, self.i3c.TransferMode.I3C_SDR, subaddress, [0x0F])
+
+        self.assertTupleEqual(self.i3c.read(0x08, self.i3c.TransferMode.I3C_SDR, subaddress, 1), (True, [0x0F]))
+        self.assertTupleEqual(self.i3c.update_bits(0x08, subaddress, 0xF0, 0xA0), (True, 0xAF))
+        self.assertEqual(cache.stats()["hits"], 2)
+
+        # Dynamic addresses may change, nothing cached is kept
+        self.i3c.init_bus()
+        self.assertEqual(cache.stats()["entries"], 0)
+
     def test_toggle_handle_ibi(self):
         if not self.use_simulator:
             self.skipTest("For simulator only")
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+class TestImportTime(unittest.TestCase):
+    """
+    Measures the import of supernovacontroller.sequential with 'python -X importtime' in a fresh interpreter,
+    and checks it stays within budget and the modules only needed once a device is used are not imported with it.
+    """
+
+    # Cumulative import time allowed for supernovacontroller.sequential, in microseconds. It takes about 45 ms
+    # without the deferred modules, the margin absorbs slower machines.
+    IMPORT_TIME_BUDGET = 200_000
+
+    DEFERRED_MODULES = [
+        "BinhoSupernova.Supernova",
+        "BinhoSupernova.commands.definitions",
+        "supernovacontroller.sequential.i2c",
+        "supernovacontroller.sequential.i3c",
+        "supernovacontroller.sequential.i3c_target",
+        "supernovacontroller.sequential.uart",
+        "supernovacontroller.sequential.spi_controller",
+        "supernovacontroller.sequential.gpio",
+        "supernovacontroller.sequential.async_supernova_device",
+        "asyncio",
+    ]
+
+    def __import(self, statement, env=None):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                                capture_output=True, text=True, env=env, check=True)
+
+        # Lines look like "import time: self [us] | cumulative | imported package", cumulative times are kept
+        imported = {}
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                imported[fields[2].strip()] = int(fields[1])
+
+        return (imported, result.stdout)
+
+    def test_import_time(self):
+        (imported, _) = self.__import("import supernovacontroller.sequential")
+
+        self.assertLess(imported["supernovacontroller.sequential"], self.IMPORT_TIME_BUDGET)
+        for module in self.DEFERRED_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_interfaces_are_imported_on_demand(self):
+        # Modules loaded with importlib don't show up in the importtime report, check sys.modules instead
+        (_, output) = self.__import("import sys; "
+                                    "from supernovacontroller.sequential.supernova_device import _load_interface_class, INTERFACE_CLASSES; "
+                                    "_load_interface_class(INTERFACE_CLASSES['i2c']); "
+                                    "print('supernovacontroller.sequential.i2c' in sys.modules, 'supernovacontroller.sequential.i3c' in sys.modules)")
+
+        self.assertEqual(output.split(), ["True", "False"])
+
+    def test_logging_is_not_configured_on_import(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHON_LOG_PATH=os.path.join(directory, "supernova.log"))
+            (_, output) = self.__import("import logging, supernovacontroller.sequential; "
+                                        "print(logging.getLogger().hasHandlers())", env)
+
+        self.assertEqual(output.strip(), "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import inspect
+import logging
+import unittest
+from unittest.mock import patch
+
+from supernovacontroller.utils.logging import log_function_call, log_instance_method_calls
+
+class _Driver:
+    def transfer(self, data, length=1):
+        return (data, length)
+
+    def fail(self):
+        raise ValueError("failed")
+
+class TestLogFunctionCall(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("supernovacontroller.tests.logging")
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, "propagate", True)
+
+    def test_arguments_are_not_inspected_below_debug(self):
+        self.logger.setLevel(logging.INFO)
+        wrapped = log_function_call(_Driver().transfer, self.logger)
+
+        with patch.object(inspect, "signature", wraps=inspect.signature) as signature:
+            self.assertEqual(wrapped([0x01]), ([0x01], 1))
+
+        signature.assert_not_called()
+
+    def test_signature_is_inspected_once(self):
+        self.logger.setLevel(logging.DEBUG)
+        wrapped = log_function_call(_Driver().transfer, self.logger)
+
+        with patch.object(inspect, "signature", wraps=inspect.signature) as signature:
+            with self.assertLogs(self.logger, logging.DEBUG) as logs:
+                for _ in range(5):
+                    wrapped([0x01], length=2)
+
+        self.assertEqual(signature.call_count, 1)
+        self.assertEqual(len(logs.records), 10)
+        self.assertIn("'length': 2", logs.output[0])
+
+    def test_sampling(self):
+        self.logger.setLevel(logging.DEBUG)
+        wrapped = log_function_call(_Driver().transfer, self.logger, sample_every=10)
+
+        with self.assertLogs(self.logger, logging.DEBUG) as logs:
+            for _ in range(30):
+                wrapped([0x01])
+
+        # A "Calling" and a "returned" message for calls 0, 10 and 20
+        self.assertEqual(len(logs.records), 6)
+
+    def test_sampling_from_environment(self):
+        self.logger.setLevel(logging.DEBUG)
+        with patch.dict("os.environ", {"PYTHON_LOG_SAMPLING": "4"}):
+            wrapped = log_function_call(_Driver().transfer, self.logger)
+
+        with self.assertLogs(self.logger, logging.DEBUG) as logs:
+            for _ in range(8):
+                wrapped([0x01])
+
+        self.assertEqual(len(logs.records), 4)
+
+    def test_exceptions_are_always_logged(self):
+        self.logger.setLevel(logging.ERROR)
+        wrapped = log_function_call(_Driver().fail, self.logger, sample_every=100)
+
+        with self.assertLogs(self.logger, logging.ERROR) as logs:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    wrapped()
+
+        self.assertEqual(len(logs.records), 2)
+
+    def test_instance_methods_are_wrapped_once(self):
+        driver = log_instance_method_calls(_Driver(), True)
+        transfer = driver.transfer
+
+        log_instance_method_calls(driver, True)
+
+        self.assertIs(driver.transfer, transfer)
+        self.assertEqual(driver.transfer([0x01]), ([0x01], 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,286 @@
+import threading
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.sequential.notifications import NotificationQueue
+
+def _ibi(address, type="IBI_NORMAL"):
+    # Notifications are routed by the device as they come from the driver, with id zero
+    return {'id': 0, 'command': 0, 'name': "I3C IBI NOTIFICATION ", 'header': {'address': address, 'type': type}, 'payload': [0xAB]}
+
+def _uart(data):
+    return {'id': 0, 'command': 0, 'name': "UART CONTROLLER RECEIVE MESSAGE", 'payload': data}
+
+class TestNotificationRouting(unittest.TestCase):
+    """
+    Checks how the device hands notifications to the handlers registered by name, dynamic address and filter.
+    Notifications are injected in the device as the driver delivers them, so no Supernova is needed.
+    """
+
+    def setUp(self):
+        self.device = SupernovaDevice()
+        self.received = []
+
+    def tearDown(self):
+        self.device.close()
+
+    def __handler(self, tag):
+        return lambda name, message: self.received.append((tag, name, message['header']['address'] if 'header' in message else None))
+
+    def __notify(self, message):
+        self.device._process_sdk_notification(message, None)
+
+    def test_subscription_by_name(self):
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("ibi"))
+
+        self.__notify(_ibi(0x08))
+        self.__notify(_uart([0x01]))
+
+        self.assertEqual(self.received, [("ibi", "I3C IBI NOTIFICATION", 0x08)])
+
+    def test_subscription_by_dynamic_address(self):
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("target 8"), dynamic_address=0x08)
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("any target"))
+
+        self.__notify(_ibi(0x08))
+        self.__notify(_ibi(0x09))
+
+        self.assertEqual(self.received, [("any target", "I3C IBI NOTIFICATION", 0x08),
+                                         ("target 8", "I3C IBI NOTIFICATION", 0x08),
+                                         ("any target", "I3C IBI NOTIFICATION", 0x09)])
+
+    def test_filter_only_evaluated_for_its_notification_name(self):
+        evaluated = []
+        def is_hot_join(name, message):
+            evaluated.append(message['name'])
+            return message['header']['type'] == "IBI_HOT_JOIN"
+
+        self.device.on_notification("hot-join", is_hot_join, self.__handler("hot-join"), notification_name="I3C IBI NOTIFICATION")
+
+        self.__notify(_uart([0x01]))
+        self.__notify(_ibi(0x08))
+        self.__notify(_ibi(0x09, "IBI_HOT_JOIN"))
+
+        self.assertEqual(len(evaluated), 2)
+        self.assertEqual(self.received, [("hot-join", "hot-join", 0x09)])
+
+    def test_fallback_filter_sees_every_notification(self):
+        self.device.on_notification("all", lambda name, message: True, self.__handler("all"))
+
+        self.__notify(_ibi(0x08))
+        self.__notify(_uart([0x01]))
+
+        self.assertEqual([tag for (tag, _, _) in self.received], ["all", "all"])
+
+    def test_duplicated_handler_name_is_ignored(self):
+        self.device.on_notification("ibi", lambda name, message: True, self.__handler("first"), notification_name="I3C IBI NOTIFICATION")
+        self.device.on_notification("ibi", lambda name, message: True, self.__handler("second"))
+
+        self.__notify(_ibi(0x08))
+
+        self.assertEqual([tag for (tag, _, _) in self.received], ["first"])
+
+    def test_unsubscribe(self):
+        subscription = self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("subscribed"), dynamic_address=0x08)
+        self.device.on_notification("indexed", lambda name, message: True, self.__handler("indexed"), notification_name="I3C IBI NOTIFICATION")
+        self.device.on_notification("filtered", lambda name, message: True, self.__handler("filtered"))
+
+        self.assertTrue(self.device.unsubscribe_notification(subscription))
+        self.assertTrue(self.device.unsubscribe_notification("indexed"))
+        self.assertTrue(self.device.unsubscribe_notification("filtered"))
+        self.assertFalse(self.device.unsubscribe_notification(subscription))
+        self.assertFalse(self.device.unsubscribe_notification("unknown"))
+
+        self.__notify(_ibi(0x08))
+
+        self.assertEqual(self.received, [])
+
+    def test_failing_handler_does_not_block_the_others(self):
+        def fail(name, message):
+            raise RuntimeError("handler failure")
+
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", fail)
+        self.device.on_notification("failing filter", fail, self.__handler("never"))
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("ibi"))
+
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.__notify(_ibi(0x08))
+
+        self.assertEqual([tag for (tag, _, _) in self.received], ["ibi"])
+
+    def test_slow_handler_on_dedicated_thread_does_not_delay_the_others(self):
+        started = threading.Event()
+        release = threading.Event()
+        logged = []
+        def slow_logger(name, message):
+            started.set()
+            release.wait(5)
+            logged.append(message['payload'])
+
+        self.device.on_notification("uart logger", lambda name, message: True, slow_logger,
+                                    notification_name="UART CONTROLLER RECEIVE MESSAGE", execution="thread")
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("ibi"))
+
+        for data in range(3):
+            self.__notify(_uart([data]))
+        self.__notify(_ibi(0x08))
+
+        # The IBI was handled while the logger is still stuck on the first UART message
+        self.assertTrue(started.wait(5))
+        self.assertEqual(self.received, [("ibi", "I3C IBI NOTIFICATION", 0x08)])
+        self.assertEqual(self.device.notification_stats()["uart logger"]["queue_depth"], 2)
+
+        release.set()
+        self.device.unsubscribe_notification("uart logger")
+
+        self.assertEqual(logged, [[0], [1], [2]])
+        self.assertEqual(self.device.notification_stats(), {})
+
+    def test_handlers_on_thread_pool(self):
+        done = threading.Barrier(3, timeout=5)
+        def handler(name, message):
+            done.wait()
+
+        first = self.device.subscribe_notification("I3C IBI NOTIFICATION", handler, execution="pool")
+        second = self.device.subscribe_notification("I3C IBI NOTIFICATION", handler, execution="pool")
+
+        self.__notify(_ibi(0x08))
+
+        # Both handlers are running at the same time, or the barrier would time out
+        done.wait()
+
+        self.device.unsubscribe_notification(first)
+        self.device.unsubscribe_notification(second)
+
+    def test_handler_stats(self):
+        handled = threading.Event()
+        def handler(name, message):
+            handled.set()
+
+        self.device.on_notification("failing", lambda name, message: True, self.__fail, execution="thread")
+        subscription = self.device.subscribe_notification("I3C IBI NOTIFICATION", handler, execution="thread")
+
+        with self.assertLogs("supernovacontroller", level="ERROR"):
+            self.__notify(_ibi(0x08))
+            self.assertTrue(handled.wait(5))
+            self.device.unsubscribe_notification("failing")
+
+        stats = self.device.notification_stats()
+        self.assertEqual(list(stats.keys()), [subscription])
+        self.assertEqual(stats[subscription]["handled"], 1)
+        self.assertEqual(stats[subscription]["errors"], 0)
+        self.assertEqual(stats[subscription]["queue_depth"], 0)
+        self.assertGreaterEqual(stats[subscription]["max_lag"], stats[subscription]["mean_lag"])
+
+    def test_unknown_execution_mode(self):
+        with self.assertRaises(ValueError):
+            self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("ibi"), execution="process")
+
+    def test_nothing_is_routed_after_close(self):
+        router = self.device.notification_router
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("pool"), execution="pool")
+        self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("inline"))
+
+        router.close()
+        self.__notify(_ibi(0x08))
+
+        self.assertEqual(self.received, [])
+        # No pool is created for the notifications routed after close
+        self.assertIsNone(router.pool)
+        self.assertEqual(router.queued_handlers, {})
+        with self.assertRaises(RuntimeError):
+            self.device.subscribe_notification("I3C IBI NOTIFICATION", self.__handler("thread"), execution="thread")
+
+    def __fail(self, name, message):
+        raise RuntimeError("handler failure")
+
+class TestNotificationQueue(unittest.TestCase):
+    """
+    Checks the overflow policies of the bounded notification queue.
+    """
+
+    def __fill(self, queue, *messages):
+        for message in messages:
+            queue.put((message, None))
+
+    def __drain(self, queue):
+        messages = []
+        while not queue.empty():
+            messages.append(queue.get()[0])
+        return messages
+
+    def test_drop_oldest(self):
+        queue = NotificationQueue(2, "drop-oldest")
+        self.__fill(queue, _uart([0]), _uart([1]), _uart([2]))
+
+        self.assertEqual([message['payload'] for message in self.__drain(queue)], [[1], [2]])
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+    def test_drop_newest(self):
+        queue = NotificationQueue(2, "drop-newest")
+        self.__fill(queue, _uart([0]), _uart([1]), _uart([2]))
+
+        self.assertEqual([message['payload'] for message in self.__drain(queue)], [[0], [1]])
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+    def test_coalesce(self):
+        queue = NotificationQueue(2, "coalesce")
+        self.__fill(queue, _ibi(0x08), _ibi(0x09), _ibi(0x08), _ibi(0x0A))
+
+        # The second IBI of 0x08 replaced the first one, 0x0A then displaced it as the oldest
+        self.assertEqual([message['header']['address'] for message in self.__drain(queue)], [0x09, 0x0A])
+        self.assertEqual(queue.stats(), {"depth": 0, "max_depth": 2, "dropped": 1, "coalesced": 1})
+
+    def test_block(self):
+        queue = NotificationQueue(1, "block")
+        self.__fill(queue, _uart([0]))
+
+        producer = threading.Thread(target=self.__fill, args=(queue, _uart([1])))
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())
+
+        self.assertEqual(queue.get()[0]['payload'], [0])
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(queue.get()[0]['payload'], [1])
+        self.assertEqual(queue.stats()["dropped"], 0)
+
+    def test_block_does_not_wait_for_inline_handlers(self):
+        device = SupernovaDevice(notification_queue_size=1, notification_overflow="block")
+        release = threading.Event()
+        device.on_notification("blocked", lambda name, message: True, lambda name, message: release.wait(5))
+
+        # The first notification keeps the inline handler busy, the second waits, the rest don't fit
+        producer = threading.Thread(target=lambda: [device._push_sdk_response(_uart([data]), None) for data in range(5)])
+        producer.start()
+        producer.join(2)
+        finished = not producer.is_alive()
+        stats = device.notification_queue_stats()
+        release.set()
+        device.close()
+
+        self.assertTrue(finished)
+        self.assertGreaterEqual(stats["dropped"], 3)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            NotificationQueue(1, "drop-random")
+
+    def test_device_counters(self):
+        device = SupernovaDevice(notification_queue_size=1, notification_overflow="drop-newest")
+        release = threading.Event()
+        device.on_notification("blocked", lambda name, message: True, lambda name, message: release.wait(5))
+
+        # The first notification keeps the dispatcher busy, the second waits, the rest don't fit
+        for data in range(5):
+            device._push_sdk_response(_uart([data]), None)
+
+        stats = device.notification_queue_stats()
+        release.set()
+        device.close()
+
+        self.assertGreaterEqual(stats["dropped"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
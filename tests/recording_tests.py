@@ -0,0 +1,159 @@
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import unittest
+
+from supernovacontroller.errors import BackendError
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.utils.recording import (COMMAND, MAGIC, RESPONSE, RESULT,
+                                                 ReplayDriver, TrafficRecorder,
+                                                 read_recording)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestRecording(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.snvrec")
+
+        # The cache decides which device information is requested, it must be the same when replaying
+        SupernovaDevice.clear_info_cache()
+        self.addCleanup(SupernovaDevice.clear_info_cache)
+
+    def record_session(self):
+        device = SupernovaDevice()
+        if self.use_simulator:
+            device.driver = BinhoSupernovaSimulator()
+
+        device.start_recording(self.path)
+        info = dict(device.open())
+
+        i2c = device.create_interface("i2c")
+        i2c.set_bus_voltage(3300)
+        i2c.init_bus(100000)
+        i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+        result = i2c.read_from(0x50, [0x00,0x00], 4)
+
+        device.close()
+
+        return (info, result)
+
+    def test_record_and_replay(self):
+        (info, result) = self.record_session()
+
+        SupernovaDevice.clear_info_cache()
+
+        # A different start id, the transfer ids of the recorded responses are translated
+        device = SupernovaDevice(start_id=1000)
+        device.driver = ReplayDriver(self.path)
+
+        self.assertEqual(dict(device.open()), info)
+
+        i2c = device.create_interface("i2c")
+        i2c.set_bus_voltage(3300)
+        i2c.init_bus(100000)
+        i2c.write(0x50, [0x00,0x00], [0xDE, 0xAD, 0xBE, 0xEF])
+        self.assertEqual(i2c.read_from(0x50, [0x00,0x00], 4), result)
+
+        device.close()
+
+    def test_recording_contents(self):
+        self.record_session()
+
+        records = list(read_recording(self.path))
+        commands = [payload[1] for (kind, _, payload) in records if kind == COMMAND]
+
+        self.assertEqual(commands[0], "open")
+        self.assertIn("i2cWrite", commands)
+        self.assertEqual(commands[-1], "close")
+        self.assertEqual(len([kind for (kind, _, _) in records if kind == RESULT]), len(commands))
+        self.assertTrue(any(kind == RESPONSE for (kind, _, _) in records))
+
+        timestamps = [timestamp for (_, timestamp, _) in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_replay_mismatch(self):
+        self.record_session()
+
+        SupernovaDevice.clear_info_cache()
+
+        device = SupernovaDevice()
+        device.driver = ReplayDriver(self.path)
+        device.open().load()
+
+        i2c = device.create_interface("i2c")
+        # The recording continues with set_bus_voltage()
+        with self.assertRaises(BackendError):
+            i2c.write(0x50, [0x00,0x00], [0x01])
+
+        device.close()
+
+class TestRecordingFormat(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.snvrec")
+
+    def test_other_version_is_rejected(self):
+        with open(self.path, "wb") as file:
+            file.write(MAGIC + bytes([1]))
+
+        with self.assertRaises(ValueError):
+            list(read_recording(self.path))
+
+    def test_only_plain_values_are_loaded(self):
+        recorder = TrafficRecorder(self.path)
+        recorder.response({"id": 1, "payload": b"\x01", "errors": ("A", "B")}, None)
+        recorder.close()
+
+        self.assertEqual(list(read_recording(self.path))[0][2], ({"id": 1, "payload": b"\x01", "errors": ("A", "B")}, None))
+
+        # A record referring to a class, which a recording never holds
+        payload = pickle.dumps((SupernovaDevice, None))
+        with open(self.path, "ab") as file:
+            file.write(struct.pack("<BdI", RESPONSE, 0.0, len(payload)) + payload)
+
+        with self.assertRaises(pickle.UnpicklingError):
+            list(read_recording(self.path))
+
+class TestReplayDriver(unittest.TestCase):
+    def test_notifications_are_replayed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "notifications.snvrec")
+
+            recorder = TrafficRecorder(path)
+            recorder.result(recorder.command("open", (), {"path": None}), {"opcode": 0, "message": "OK"})
+            # The serial number requested by open()
+            recorder.result(recorder.command("getUsbString", (1, None), {}), None)
+            recorder.response({"id": 1, "name": "GET USB STRING", "message": "SN-0001"}, None)
+            for data in ([0x01], [0x02]):
+                recorder.response({"id": 0, "name": "UART CONTROLLER RECEIVE MESSAGE", "payload": data}, None)
+            recorder.close()
+
+            device = SupernovaDevice()
+            driver = ReplayDriver(path)
+            device.driver = driver
+
+            received = []
+            device.subscribe_notification("UART CONTROLLER RECEIVE MESSAGE", lambda name, message: received.append(message["payload"]))
+            device.open()
+
+            self.assertTrue(driver.wait_delivered(timeout=5))
+            device.close()
+
+        self.assertEqual(received, [[0x01], [0x02]])
+
+if __name__ == "__main__":
+    unittest.main()
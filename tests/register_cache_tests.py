@@ -0,0 +1,71 @@
+import unittest
+
+from supernovacontroller.sequential.register_cache import RegisterCache
+
+class TestRegisterCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = RegisterCache()
+
+    def test_write_through_and_lookup(self):
+        self.cache.store(0x50, [0x00, 0x10], [0x01, 0x02, 0x03])
+
+        self.assertEqual(self.cache.lookup(0x50, [0x00, 0x11], 2), [0x02, 0x03])
+        self.assertIsNone(self.cache.lookup(0x50, [0x00, 0x12], 2))
+        self.assertIsNone(self.cache.lookup(0x51, [0x00, 0x10], 1))
+        # Same register value, other address width
+        self.assertIsNone(self.cache.lookup(0x50, 0x10, 1))
+
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 3, "bypassed": 0, "entries": 3})
+
+    def test_one_byte_registers_as_int_or_list(self):
+        self.cache.store(0x48, 0x20, [0xAB])
+
+        self.assertEqual(self.cache.lookup(0x48, [0x20], 1), [0xAB])
+
+    def test_overlapping_writes(self):
+        self.cache.store(0x50, [0x00], [0x01, 0x02, 0x03, 0x04])
+        self.cache.store(0x50, [0x02], [0xFF])
+
+        self.assertEqual(self.cache.lookup(0x50, [0x00], 4), [0x01, 0x02, 0xFF, 0x04])
+
+    def test_excluded_registers(self):
+        self.cache.exclude(0x48, [0x00], length=2)
+        self.cache.store(0x48, [0x00], [0x01, 0x02, 0x03])
+
+        self.assertIsNone(self.cache.lookup(0x48, [0x01], 1))
+        self.assertEqual(self.cache.lookup(0x48, [0x02], 1), [0x03])
+        self.assertEqual(self.cache.stats()["bypassed"], 1)
+
+    def test_excluded_targets(self):
+        self.cache.store(0x48, [0x00], [0x01])
+        self.cache.exclude(0x48)
+        self.cache.store(0x48, [0x01], [0x02])
+
+        self.assertIsNone(self.cache.lookup(0x48, [0x00], 1))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_invalidate(self):
+        self.cache.store(0x50, [0x00], [0x01, 0x02, 0x03])
+        self.cache.store(0x51, [0x00], [0x01])
+
+        self.cache.invalidate(0x50, [0x01])
+        self.assertIsNone(self.cache.lookup(0x50, [0x00], 2))
+        self.assertEqual(self.cache.lookup(0x50, [0x02], 1), [0x03])
+
+        self.cache.invalidate(0x50)
+        self.assertIsNone(self.cache.lookup(0x50, [0x02], 1))
+        self.assertEqual(self.cache.lookup(0x51, [0x00], 1), [0x01])
+
+        self.cache.invalidate()
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_transfers_without_register_drop_the_target(self):
+        self.cache.store(0x50, [0x00], [0x01])
+        self.cache.store(0x50, [], [0x00, 0x10])
+
+        self.assertIsNone(self.cache.lookup(0x50, [0x00], 1))
+        self.assertIsNone(self.cache.lookup(0x50, [], 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import unittest
+
+from supernovacontroller.sequential import RetryPolicy, SupernovaDevice
+from supernovacontroller.sequential.controller import SupernovaTransferController
+from supernovacontroller.errors import UnknownInterfaceError
+from supernovacontroller.sequential.retry import error_codes, issued_by, no_retries
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+# The simulator doesn't acknowledge this address
+ABSENT_ADDRESS = 0x99
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff(self):
+        policy = RetryPolicy(max_attempts=5, backoff=0.01, backoff_factor=2, max_backoff=0.03)
+
+        self.assertEqual([policy.delay(attempt) for attempt in (1, 2, 3, 4)], [0.01, 0.02, 0.03, 0.03])
+        self.assertEqual(RetryPolicy().delay(1), 0.0)
+
+    def test_retryable_responses(self):
+        policy = RetryPolicy(max_attempts=2)
+        nack = {"name": "I2C WRITE", "status": "I2C_NACK_ADDRESS"}
+        i3c_nack = {"name": "I3C TRANSFER", "header": {"result": "I3C_TRANSFER_FAIL"}, "descriptor": {"errors": ["NACK_ERROR"]}}
+
+        self.assertEqual(error_codes(i3c_nack), {"I3C_TRANSFER_FAIL", "NACK_ERROR"})
+        self.assertTrue(policy.should_retry(nack, 1))
+        self.assertTrue(policy.should_retry(i3c_nack, 1))
+        self.assertFalse(policy.should_retry(nack, 2))
+        self.assertFalse(policy.should_retry({"name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}, 1))
+        self.assertFalse(RetryPolicy(retry_on=["I2C_BUSY"]).should_retry(nack, 1))
+
+class TestRetryOutcomes(unittest.TestCase):
+    """
+    Answers the requests of a controller with made up responses.
+    """
+
+    def setUp(self):
+        self.controller = SupernovaTransferController(iter(range(1, 1000)))
+        self.controller.set_retry_policy(RetryPolicy(max_attempts=3))
+        self.sent = []
+
+    def __transfer(self, *statuses, interface="i2c", name="I2C WRITE", field="status"):
+        results = []
+        with issued_by(interface):
+            self.controller.submit(lambda transfer_id: self.sent.append(transfer_id), on_ready=results.extend)
+        for status in statuses:
+            self.controller.handle_response(transfer_id=self.sent[-1], response={"name": name, field: status})
+
+        return results[0][field]
+
+    def test_outcomes(self):
+        self.assertEqual(self.__transfer("I2C_NACK_ADDRESS", "NO_TRANSFER_ERROR"), "NO_TRANSFER_ERROR")
+        self.assertEqual(self.__transfer("I2C_NACK_ADDRESS", "I2C_NACK_BYTE", "I2C_NACK_ADDRESS"), "I2C_NACK_ADDRESS")
+        self.assertEqual(self.__transfer("I2C_BUSY", "I2C_DATA_LENGTH_ERROR"), "I2C_DATA_LENGTH_ERROR")
+
+        self.assertEqual(self.controller.retry_stats(), {"i2c": {"retries": 4, "recovered": 1, "exhausted": 1, "failed": 1}})
+
+    def test_no_retries(self):
+        with no_retries():
+            self.assertEqual(self.__transfer("I2C_NACK_ADDRESS"), "I2C_NACK_ADDRESS")
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.controller.retry_stats(), {})
+
+    def test_policies_are_kept_per_interface_name(self):
+        self.controller.set_retry_policy(None)
+        self.controller.set_retry_policy(RetryPolicy(max_attempts=2), "i3c.controller")
+        self.controller.set_retry_policy(RetryPolicy(max_attempts=1), "i3c.target")
+
+        self.assertEqual(self.__transfer("NACK_ERROR", "NACK_ERROR", interface="i3c.controller", name="I3C TRANSFER"), "NACK_ERROR")
+        self.assertEqual(self.__transfer("NACK_ERROR", interface="i3c.target", name="I3C TRANSFER"), "NACK_ERROR")
+
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(self.controller.retry_stats()["i3c.controller"], {"retries": 1, "recovered": 0, "exhausted": 1, "failed": 0})
+        self.assertEqual(self.controller.retry_stats()["i3c.target"]["retries"], 0)
+
+    def test_policy_follows_the_interface_not_the_command(self):
+        self.controller.set_retry_policy(None)
+        self.controller.set_retry_policy(RetryPolicy(max_attempts=2), "i2c")
+
+        # Named after the three interfaces sharing the voltage, but submitted by the I2C one
+        self.assertEqual(self.__transfer("I2C_BUSY", "SYS_NO_ERROR", name="SET I2C-SPI-UART BUS VOLTAGE", field="result"), "SYS_NO_ERROR")
+        self.assertEqual(self.__transfer("I2C_BUSY", interface=None), "I2C_BUSY")
+
+        self.assertEqual(len(self.sent), 3)
+
+class TestRetries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        if not self.use_simulator:
+            self.skipTest("For simulator only")
+
+        self.device = SupernovaDevice()
+        self.device.driver = BinhoSupernovaSimulator()
+        self.device.open()
+        self.i2c = self.device.create_interface("i2c")
+        self.i2c.init_bus(3300)
+
+        self.writes = []
+        self.lost_writes = 0
+        i2cWrite = self.device.driver.i2cWrite
+
+        def counted_write(id, address, register, data):
+            self.writes.append(id)
+            if self.lost_writes > 0:
+                # A transient failure, the target doesn't acknowledge the first attempts
+                self.lost_writes -= 1
+                address = ABSENT_ADDRESS
+            return i2cWrite(id, address, register, data)
+
+        self.device.driver.i2cWrite = counted_write
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_no_retries_by_default(self):
+        self.lost_writes = 1
+
+        self.assertEqual(self.i2c.write(0x50, [0x00,0x00], [0x01]), (False, "I2C_NACK_ADDRESS"))
+        self.assertEqual(len(self.writes), 1)
+        self.assertEqual(self.device.retry_stats(), {})
+
+    def test_transient_error_is_recovered(self):
+        self.device.set_retry_policy(RetryPolicy(max_attempts=3))
+        self.lost_writes = 2
+
+        self.assertEqual(self.i2c.write(0x50, [0x00,0x00], [0x01]), (True, None))
+        # Every attempt has its own transfer id
+        self.assertEqual(len(set(self.writes)), 3)
+        self.assertEqual(self.device.retry_stats(), {"i2c": {"retries": 2, "recovered": 1, "exhausted": 0, "failed": 0}})
+
+    def test_retries_are_exhausted(self):
+        self.device.set_retry_policy(RetryPolicy(max_attempts=3, backoff=0.02))
+
+        start = time.perf_counter()
+        result = self.i2c.write(ABSENT_ADDRESS, [0x00,0x00], [0x01])
+
+        self.assertEqual(result, (False, "I2C_NACK_ADDRESS"))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02 + 0.04)
+        self.assertEqual(len(self.writes), 3)
+        self.assertEqual(self.device.retry_stats(), {"i2c": {"retries": 2, "recovered": 0, "exhausted": 1, "failed": 0}})
+
+    def test_policy_per_interface(self):
+        self.device.set_retry_policy(RetryPolicy(max_attempts=3), interface="i3c.controller")
+        self.lost_writes = 1
+
+        self.assertEqual(self.i2c.write(0x50, [0x00,0x00], [0x01]), (False, "I2C_NACK_ADDRESS"))
+
+        self.device.set_retry_policy(RetryPolicy(max_attempts=3), interface="i2c")
+        self.lost_writes = 1
+
+        self.assertEqual(self.i2c.write(0x50, [0x00,0x00], [0x01]), (True, None))
+
+    def test_policy_of_an_unknown_interface(self):
+        with self.assertRaises(UnknownInterfaceError):
+            self.device.set_retry_policy(RetryPolicy(), interface="I2C")
+
+    def test_scan_is_not_retried(self):
+        self.device.set_retry_policy(RetryPolicy(max_attempts=3))
+        probes = []
+        i2cRead = self.device.driver.i2cRead
+        def counted_read(id, address, length):
+            probes.append(address)
+            return i2cRead(id, address, length)
+        self.device.driver.i2cRead = counted_read
+
+        self.assertEqual(self.i2c.scan([ABSENT_ADDRESS, 0x50]), (True, [0x50]))
+        self.assertEqual(probes, [ABSENT_ADDRESS, 0x50])
+
+    def test_retries_inside_a_batch(self):
+        self.device.set_retry_policy(RetryPolicy(max_attempts=2), interface="i2c")
+
+        with self.device.batch() as batch:
+            for value in range(4):
+                batch.add(self.i2c.write, 0x50, [0x00, value], [value])
+            self.lost_writes = 1
+
+        self.assertEqual(batch.results, [(True, None)] * 4)
+        # Only the failing write was sent again
+        self.assertEqual(len(self.writes), 5)
+
+if __name__ == "__main__":
+    unittest.main()
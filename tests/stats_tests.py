@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+
+from supernovacontroller.sequential import SupernovaDevice
+from supernovacontroller.utils.stats import LatencyHistogram
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.record(0.0001)
+        for _ in range(10):
+            histogram.record(0.01)
+
+        stats = histogram.as_dict()
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual(stats["min"], 0.0001)
+        self.assertEqual(stats["max"], 0.01)
+        # Percentiles are the upper bound of their bucket
+        self.assertTrue(0.0001 <= stats["p50"] < 0.0002)
+        self.assertTrue(0.0001 <= stats["p90"] < 0.0002)
+        self.assertEqual(stats["p99"], 0.01)
+        self.assertEqual(sum(count for (_, count) in stats["histogram"]), 100)
+
+    def test_empty(self):
+        stats = LatencyHistogram().as_dict()
+
+        self.assertEqual(stats["count"], 0)
+        self.assertIsNone(stats["p50"])
+        self.assertEqual(stats["histogram"], [])
+
+class TestTransferStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Initializes the testing class. Determines whether to use the simulator or real device
+        based on the "USE_REAL_DEVICE" environment variable. Default is to use the simulator.
+        """
+        cls.use_simulator = not os.getenv("USE_REAL_DEVICE", "False") == "True"
+
+    def setUp(self):
+        self.device = SupernovaDevice(collect_stats=True)
+
+        if self.use_simulator:
+            self.device.driver = BinhoSupernovaSimulator()
+
+        self.device.open()
+        self.i2c = self.device.create_interface("i2c")
+        self.i2c.init_bus(3300)
+
+    def tearDown(self):
+        self.device.close()
+
+    def test_stats_per_interface_and_command(self):
+        self.device.reset_stats()
+
+        for _ in range(10):
+            self.i2c.write(0x50, [0x00,0x00], [0x01])
+            self.i2c.read_from(0x50, [0x00,0x00], 1)
+
+        stats = self.device.stats()
+
+        self.assertEqual(list(stats["interfaces"].keys()), ["I2C"])
+        self.assertEqual(stats["interfaces"]["I2C"]["total"]["count"], 20)
+        self.assertEqual(stats["commands"]["I2C WRITE"]["transit"]["count"], 10)
+        self.assertEqual(stats["commands"]["I2C READ FROM"]["dispatch"]["count"], 10)
+
+        total = stats["interfaces"]["I2C"]["total"]
+        self.assertTrue(total["min"] <= total["p50"] <= total["max"])
+
+    def test_reset_stats(self):
+        self.i2c.write(0x50, [0x00,0x00], [0x01])
+        self.assertNotEqual(self.device.stats()["interfaces"], {})
+
+        self.device.reset_stats()
+
+        self.assertEqual(self.device.stats(), {"interfaces": {}, "commands": {}})
+
+    def test_stats_disabled_by_default(self):
+        device = SupernovaDevice()
+        if self.use_simulator:
+            device.driver = BinhoSupernovaSimulator()
+        device.open()
+
+        i2c = device.create_interface("i2c")
+        i2c.init_bus(3300)
+        i2c.write(0x50, [0x00,0x00], [0x01])
+
+        self.assertEqual(device.stats(), {})
+
+        device.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest import mock
 from unittest.mock import patch
@@ -62,6 +63,107 @@ class TestDeviceSupernovaController(unittest.TestCase):
         with self.assertRaises(DeviceAlreadyMountedError):
             self.device.open()
 
+    def test_close_stops_dispatcher_threads(self):
+        d = SupernovaDevice()
+        if self.use_simulator:
+            d.driver = BinhoSupernovaSimulator()
+        d.open()
+
+        d.close()
+
+        self.assertFalse(d.process_response_thread.is_alive())
+        self.assertFalse(d.process_notifications_thread.is_alive())
+        self.assertLess(d.shutdown_latency, 0.5)
+
+    @patch.object(SupernovaDevice, "getAllConnectedSupernovaDevices", MagicMock(return_value=[
+        {"path": "whatever", "serial_number": "0001"},
+        {"path": "nowhere", "serial_number": "0002"},
+    ]))
+    def test_open_all_devices_reports_every_failure(self):
+        report = SupernovaDevice.openAllConnectedSupernovaDevicesWithReport()
+
+        self.assertEqual(report["opened"], [])
+        self.assertEqual([failure["serial_number"] for failure in report["failed"]], ["0001", "0002"])
+        for failure in report["failed"]:
+            self.assertIsInstance(failure["error"], DeviceOpenError)
+        self.assertGreaterEqual(report["elapsed"], 0)
+
+        with self.assertRaises(DeviceOpenError):
+            SupernovaDevice.openAllConnectedSupernovaDevices()
+
+    def __open_counting_usb_strings(self):
+        d = SupernovaDevice()
+        if self.use_simulator:
+            d.driver = BinhoSupernovaSimulator()
+
+        requests = []
+        getUsbString = d.driver.getUsbString
+        def counting_getUsbString(id, subcommand):
+            requests.append(subcommand)
+            return getUsbString(id, subcommand)
+        d.driver.getUsbString = counting_getUsbString
+
+        return (d, d.open(), requests)
+
+    def test_device_info_is_requested_on_first_access(self):
+        SupernovaDevice.clear_info_cache()
+
+        (d, info, requests) = self.__open_counting_usb_strings()
+        # Only the serial number is requested on open
+        self.assertIsInstance(info, dict)
+        self.assertEqual(len(requests), 1)
+
+        # The hardware version needed by the GPIO interface is requested once, and shared with the information
+        d.create_interface("gpio")
+        self.assertEqual(len(requests), 2)
+        self.assertRegex(info["hw_version"], r"^[A-Za-z0-9]$")
+        self.assertEqual(len(requests), 2)
+
+        self.__validate_device_info(info)
+        self.assertEqual(len(requests), 5)
+        self.assertEqual(json.loads(json.dumps(info)), dict(info))
+
+        d.get_hardware_version()
+        self.assertEqual(len(requests), 6)
+
+        d.close()
+
+    def test_device_info_is_cached_by_serial_number(self):
+        (first, first_info, _) = self.__open_counting_usb_strings()
+        expected = dict(first_info)
+        first.close()
+
+        (second, second_info, requests) = self.__open_counting_usb_strings()
+
+        # Only the serial number is requested to find the cached information
+        self.assertEqual(second_info, expected)
+        self.assertEqual(len(requests), 1)
+
+        second.close()
+
+    def test_clear_info_cache(self):
+        (first, first_info, _) = self.__open_counting_usb_strings()
+        first_info.load()
+        first.close()
+
+        SupernovaDevice.clear_info_cache(first_info["serial_number"])
+        (second, second_info, requests) = self.__open_counting_usb_strings()
+        second_info.load()
+        second.close()
+
+        self.assertEqual(len(requests), 5)
+        self.assertEqual(second_info, first_info)
+
+    def test_device_info_after_close(self):
+        SupernovaDevice.clear_info_cache()
+        (d, info, requests) = self.__open_counting_usb_strings()
+        d.close()
+
+        # Nothing is requested to a closed device
+        self.assertEqual(list(info.keys()), ["serial_number"])
+        self.assertIsNone(info.get("hw_version"))
+        self.assertEqual(len(requests), 1)
+
     def test_create_interface_before_open_throws_error(self):
         d = SupernovaDevice()
         with self.assertRaises(DeviceNotMountedError):
@@ -1,8 +1,8 @@
-import threading
 import unittest
 import os
 from supernovacontroller.sequential import SupernovaDevice
 from supernovacontroller.errors import DeviceOpenError
+from supernovacontroller.errors import TransferTimeoutError
 
 class TestSupernovaControllerIdOverflow(unittest.TestCase):
     @classmethod
@@ -17,29 +17,18 @@ class TestSupernovaControllerIdOverflow(unittest.TestCase):
         if self.use_simulator:
             self.skipTest("For real device only")
 
-        d = SupernovaDevice(start_id=65535)
-        timeout = 3
+        d = SupernovaDevice(start_id=65535, timeout=3)
 
-        device_info = None
-        device_error = None
-        def open_device():
-            nonlocal device_info, device_error
-            try:
-                device_info = d.open()
-            except DeviceOpenError as e:
-                device_error = e
-
-        thread = threading.Thread(target=open_device, daemon=True)
-        thread.start()
-        thread.join(timeout)
-
-        if thread.is_alive():
+        try:
+            device_info = d.open()
+        except DeviceOpenError as e:
+            self.fail(f"Failed to open device: {e}")
+        except TransferTimeoutError:
             self.fail("Transaction ID over 65535 timed out")
-        else:
-            if isinstance(device_error, DeviceOpenError):
-                self.fail(f"Failed to open device: {device_error}")
-            else:
-              self.assertIsNotNone(device_info, "device_info is None")
+        finally:
+            d.close()
+
+        self.assertIsNotNone(device_info, "device_info is None")
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+from supernovacontroller.errors import BackendError, TransferTimeoutError
+from supernovacontroller.sequential import AsyncSupernovaDevice, SupernovaDevice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from binhosimulators import BinhoSupernovaSimulator
+
+class TestTimeouts(unittest.TestCase):
+    """
+    Requests are lost by replacing a method of the driver with one that never sends them.
+    """
+
+    def open_device(self, **kwargs):
+        device = SupernovaDevice(**kwargs)
+        device.driver = BinhoSupernovaSimulator()
+        device.open()
+        self.addCleanup(device.close)
+
+        i2c = device.create_interface("i2c")
+        i2c.init_bus(3300)
+
+        return (device, i2c)
+
+    def lose_writes(self, device):
+        lost = []
+        device.driver.i2cWrite = lambda id, *args: lost.append(id) or {}
+        return lost
+
+    def assert_forgotten(self, device):
+        self.assertEqual(device.controller.request_states, {})
+        self.assertEqual(device.controller.transfer_index, {})
+
+    def test_default_timeout(self):
+        (device, i2c) = self.open_device(timeout=0.2)
+        self.lose_writes(device)
+
+        start = time.perf_counter()
+        with self.assertRaises(TransferTimeoutError) as context:
+            i2c.write(0x50, [0x00,0x00], [0x01])
+
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(context.exception.timeout, 0.2)
+        self.assert_forgotten(device)
+
+    def test_timeout_argument_overrides_default(self):
+        (device, i2c) = self.open_device()
+        self.lose_writes(device)
+
+        with self.assertRaises(TransferTimeoutError):
+            i2c.write(0x50, [0x00,0x00], [0x01], timeout=0.2)
+
+        self.assert_forgotten(device)
+
+    def test_timeout_is_a_backend_error(self):
+        (device, i2c) = self.open_device(timeout=0.2)
+        self.lose_writes(device)
+
+        with self.assertRaises(BackendError):
+            i2c.write(0x50, [0x00,0x00], [0x01])
+
+    def test_late_response_is_ignored(self):
+        (device, i2c) = self.open_device(timeout=0.2)
+        lost = self.lose_writes(device)
+
+        with self.assertRaises(TransferTimeoutError):
+            i2c.write(0x50, [0x00,0x00], [0x01])
+
+        device._push_sdk_response({"id": lost[0], "command": 0x22, "name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}, None)
+
+        # The device keeps working once the requests are sent again
+        del device.driver.i2cWrite
+        self.assertEqual(i2c.write(0x50, [0x00,0x00], [0x01]), (True, None))
+        self.assertEqual(i2c.read_from(0x50, [0x00,0x00], 1), (True, [0x01]))
+
+    def test_batch_timeout(self):
+        (device, i2c) = self.open_device(timeout=0.2)
+        self.lose_writes(device)
+
+        batch = device.batch(window=2)
+        for _ in range(4):
+            batch.add(i2c.write, 0x50, [0x00,0x00], [0x01])
+
+        with self.assertRaises(BackendError) as context:
+            batch.submit()
+
+        self.assertIsInstance(context.exception.original_exception, TransferTimeoutError)
+        self.assert_forgotten(device)
+
+    def test_async_timeout(self):
+        async def write_with_lost_request():
+            device = AsyncSupernovaDevice()
+            device.driver = BinhoSupernovaSimulator()
+            await device.open()
+
+            i2c = await device.create_interface("i2c")
+            await i2c.init_bus(3300)
+            self.lose_writes(device.device)
+
+            try:
+                with self.assertRaises(TransferTimeoutError):
+                    await i2c.write(0x50, [0x00,0x00], [0x01], timeout=0.2)
+                self.assert_forgotten(device.device)
+            finally:
+                await device.close()
+
+        asyncio.run(write_with_lost_request())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from BinhoSupernova.commands.definitions import (
+    COMMANDS_DICTIONARY, I2C_WRITE, I2C_READ, I3C_TRANSFER, I3C_TRIGGER_EXIT_PATTERN, SPI_CONTROLLER_INIT,
+    UART_CONTROLLER_SEND, GPIO_DIGITAL_WRITE,
+)
+from supernovacontroller.sequential.validators import VALIDATORS, ResponseValidator
+
+class TestResponseValidators(unittest.TestCase):
+
+    def test_table_is_keyed_by_command_id(self):
+        for command, validator in VALIDATORS.items():
+            self.assertEqual(validator.command, command)
+            self.assertEqual(validator.name, COMMANDS_DICTIONARY[command]["name"].strip())
+
+    def test_i2c_status(self):
+        validator = VALIDATORS[I2C_WRITE]
+
+        self.assertTrue(validator.is_success({"command": I2C_WRITE, "name": "I2C WRITE", "status": "NO_TRANSFER_ERROR"}))
+        self.assertFalse(validator.is_success({"command": I2C_WRITE, "name": "I2C WRITE", "status": "I2C_NACK_ADDRESS"}))
+        self.assertEqual(validator.errors({"command": I2C_WRITE, "status": "I2C_NACK_ADDRESS"}), ["I2C_NACK_ADDRESS"])
+
+    def test_response_to_another_command_is_not_a_success(self):
+        response = {"command": I2C_READ, "name": "I2C READ", "status": "NO_TRANSFER_ERROR"}
+
+        self.assertFalse(VALIDATORS[I2C_WRITE].is_success(response))
+        self.assertTrue(VALIDATORS[I2C_WRITE].accepts(response))
+
+    def test_responses_without_command_id_are_matched_by_name(self):
+        validator = VALIDATORS[UART_CONTROLLER_SEND]
+
+        self.assertTrue(validator.matches({"name": COMMANDS_DICTIONARY[UART_CONTROLLER_SEND]["name"] + " "}))
+        self.assertFalse(validator.matches({"name": "I2C WRITE"}))
+
+    def test_errors_are_reported_in_order(self):
+        validator = VALIDATORS[GPIO_DIGITAL_WRITE]
+        response = {"command": GPIO_DIGITAL_WRITE, "usb_error": "CMD_FAILED", "manager_error": "GPIO_NO_ERROR",
+                    "driver_error": "GPIO_DRIVER_ERROR"}
+
+        self.assertFalse(validator.is_success(response))
+        self.assertEqual(validator.errors(response), ["CMD_FAILED", "GPIO_DRIVER_ERROR"])
+
+    def test_several_accepted_values(self):
+        validator = VALIDATORS[SPI_CONTROLLER_INIT]
+        response = {"command": SPI_CONTROLLER_INIT, "usb_error": "CMD_SUCCESSFUL",
+                    "manager_error": "SPI_ALREADY_INITIALIZED_ERROR", "driver_error": "SPI_DRIVER_NO_TRANSFER_ERROR"}
+
+        self.assertTrue(validator.is_success(response))
+        self.assertEqual(validator.errors(response), [])
+
+    def test_list_fields(self):
+        validator = VALIDATORS[I3C_TRIGGER_EXIT_PATTERN]
+        response = {"usb_result": "CMD_SUCCESSFUL", "manager_result": "I3C_CONTROLLER_MGR_NO_ERROR",
+                    "driver_result": ["NO_TRANSFER_ERROR"]}
+
+        self.assertTrue(validator.accepts(response))
+        self.assertEqual(validator.errors(response), [])
+
+        response["driver_result"] = ["NACK_ERROR", "TIMEOUT_ERROR"]
+        self.assertFalse(validator.accepts(response))
+        self.assertEqual(validator.errors(response), ["NACK_ERROR", "TIMEOUT_ERROR"])
+
+    def test_nested_fields(self):
+        validator = VALIDATORS[I3C_TRANSFER]
+
+        self.assertTrue(validator.accepts({"header": {"result": "DAA_SUCCESS"}}))
+        self.assertFalse(validator.accepts({"header": {"result": "I3C_TRANSFER_FAIL"}}))
+
+    def test_custom_validator(self):
+        validator = ResponseValidator(I2C_READ, {"status": ("NO_TRANSFER_ERROR", "I2C_NACK_BYTE")})
+
+        self.assertTrue(validator.is_success({"command": I2C_READ, "status": "I2C_NACK_BYTE"}))
+
+if __name__ == "__main__":
+    unittest.main()